@@ -0,0 +1,89 @@
+"""Measure the throughput and the peak memory of the writers exporting the inspection results: the table writers
+(CSV, and FITS through an astropy Table copy) and the chunked, streaming writers (FITS, Parquet, Feather and HDF5).
+Writers whose optional dependencies are not installed are skipped.
+
+Usage: python benchmarks/export_throughput.py [--n-rows N] [--n-flags N] [--chunk-size N] [--repeat N]
+"""
+
+import argparse
+import importlib.util
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from specvizitor.io.inspection_data import (InspectionData, WriterBase, CSVWriter, FITSWriter, StreamingFITSWriter,
+                                            ParquetWriter, FeatherWriter, HDF5Writer)
+
+
+def make_review(n_rows: int, n_flags: int, seed: int = 0) -> InspectionData:
+    """Create inspection results with random redshifts, flags and comments."""
+    rng = np.random.default_rng(seed)
+
+    review = InspectionData.create(np.arange(1, n_rows + 1), flags=[f'flag{i}' for i in range(n_flags)])
+    review.df['starred'] = rng.random(n_rows) < 0.1
+    review.df['z_sviz'] = rng.uniform(0, 10, n_rows)
+    for i in range(n_flags):
+        review.df[f'flag{i}'] = rng.random(n_rows) < 0.2
+
+    words = np.array(['broad', 'emission', 'line', 'contaminated', 'bright', 'star', 'agn'])
+    has_comment = rng.random(n_rows) < 0.3
+    review.df['comment'] = [' '.join(rng.choice(words, 3)) if c else '' for c in has_comment]
+
+    return review
+
+
+def measure(writer: WriterBase, review: InspectionData, filename: pathlib.Path, repeat: int) -> tuple[float, float]:
+    """Return the best time and the peak memory allocated by the writer, in seconds and MB."""
+    times = []
+    for _ in range(repeat):
+        t_start = time.perf_counter()
+        writer.write(review.df, filename)
+        times.append(time.perf_counter() - t_start)
+
+    tracemalloc.start()
+    writer.write(review.df, filename)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return min(times), peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--n-rows', type=int, default=1_000_000)
+    parser.add_argument('--n-flags', type=int, default=5)
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    review = make_review(args.n_rows, args.n_flags)
+    table_size = review.df.memory_usage(index=True, deep=True).sum() / 2 ** 20
+    print(f"Rows: {args.n_rows}, columns: {len(review.df.columns) + 1}, in-memory size: {table_size:.1f} MB\n")
+
+    writers = {
+        'CSV': (CSVWriter(), 'csv', None),
+        'FITS (table copy)': (FITSWriter(), 'fits', None),
+        'FITS (streaming)': (StreamingFITSWriter(args.chunk_size), 'fits', None),
+        'Parquet': (ParquetWriter(args.chunk_size), 'parquet', 'pyarrow'),
+        'Feather': (FeatherWriter(args.chunk_size), 'feather', 'pyarrow'),
+        'HDF5': (HDF5Writer(args.chunk_size), 'h5', 'h5py')
+    }
+
+    print(f"{'writer':<20}{'time, s':>10}{'rows/s':>14}{'peak memory, MB':>18}{'file size, MB':>16}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, (writer, suffix, requires) in writers.items():
+            if requires is not None and importlib.util.find_spec(requires) is None:
+                print(f"{name:<20}{f'skipped ({requires} not installed)':>58}")
+                continue
+
+            filename = pathlib.Path(tmp_dir) / f'review.{suffix}'
+            t, peak = measure(writer, review, filename, args.repeat)
+            size = filename.stat().st_size / 2 ** 20
+            print(f"{name:<20}{t:>10.3f}{args.n_rows / t:>14,.0f}{peak:>18.1f}{size:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""Measure how the time and the peak memory of the io layer grow with the size of the catalogue: reading catalogues
+(`Catalog.read`), looking up catalogue entries by single and composite IDs (`Catalog.get_cat_entry`), accessing columns
+through aliases (`Catalog.get_col`), reading and writing inspection files (`InspectionData.read/write`), updating
+values and locating IDs (`InspectionData.update_value/get_id_loc/validate_id`), and scanning data directories
+(`get_ids_from_dir`).
+
+Operations on single objects are repeated `--n-calls` times for randomly chosen objects, and their time is reported
+per call. The peak memory is measured with tracemalloc in a separate run, so that tracing does not affect the timings.
+
+Usage: python benchmarks/io_scaling.py [--sizes N [N ...]] [--n-files N] [--n-calls N] [--repeat N] [--output FILE]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import pathlib
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+from astropy.table import Table
+
+from specvizitor.config import Config
+from specvizitor.io.catalog import Catalog
+from specvizitor.io.data_dir import get_ids_from_dir
+from specvizitor.io.inspection_data import InspectionData
+
+
+def measure(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Return the best time of `fn` and the peak memory it allocates, in seconds and MB."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t_start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t_start)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return min(times), peak / 2 ** 20
+
+
+def write_catalogue(filename: pathlib.Path, n_rows: int, composite: bool, rng: np.random.Generator):
+    """Write a catalogue with columns named as in external catalogues (`ID`, `RA`, `DEC`, `z_phot_eazy`), which are
+    accessed through the aliases of the default configuration. The composite catalogue has two emission lines per
+    object (`ID_EMLINE`).
+    """
+    ids = np.arange(n_rows) // 2 + 1 if composite else np.arange(1, n_rows + 1)
+    t = Table({'ID': ids, 'RA': rng.uniform(150, 150.2, n_rows), 'DEC': rng.uniform(2, 2.2, n_rows),
+               'z_phot_eazy': rng.uniform(0, 7, n_rows), 'mag_auto': rng.uniform(18, 30, n_rows)})
+    if composite:
+        t['ID_EMLINE'] = np.arange(n_rows) % 2 + 1
+    t.write(filename, overwrite=True)
+
+
+class Results:
+    def __init__(self):
+        self.rows: list[dict] = []
+        print(f"{'operation':<40}{'size':>10}{'time':>18}{'peak memory, MB':>18}")
+
+    def add(self, operation: str, n_rows: int, t: float, peak: float, n_calls: int = 1):
+        """Add a result; `n_rows` is the number of rows of the catalogue (or the number of files in the directory)."""
+        per_call = n_calls > 1
+        t = t / n_calls
+        self.rows.append({'operation': operation, 'n_rows': n_rows, 'time': t, 'per_call': per_call,
+                          'peak_memory_mb': peak})
+
+        t_str = f"{1e6 * t:.1f} us/call" if per_call else f"{t:.3f} s"
+        print(f"{operation:<40}{n_rows:>10}{t_str:>18}{peak:>18.1f}")
+
+
+def run_catalogue(results: Results, n_rows: int, tmp_dir: pathlib.Path, translate: dict, n_calls: int, repeat: int,
+                  rng: np.random.Generator):
+    for composite in (False, True):
+        filename = tmp_dir / f'catalogue_{n_rows}_{int(composite)}.fits'
+        write_catalogue(filename, n_rows, composite, rng)
+        suffix = ' (composite IDs)' if composite else ''
+
+        t, peak = measure(lambda: Catalog.read(str(filename), translate=translate), repeat)
+        results.add(f'Catalog.read{suffix}', n_rows, t, peak)
+
+        cat = Catalog.read(str(filename), translate=translate)
+        ids = cat.get_col('id')[rng.integers(0, n_rows, n_calls)]
+        if composite:
+            ids = [(int(i), int(i2)) for i, i2 in zip(ids, rng.integers(1, 3, n_calls))]
+        else:
+            ids = [int(i) for i in ids]
+
+        t, peak = measure(lambda: [cat.get_cat_entry(obj_id) for obj_id in ids], repeat)
+        results.add(f'Catalog.get_cat_entry{suffix}', n_rows, t, peak, n_calls)
+
+        if not composite:
+            t, peak = measure(lambda: [cat.get_col(cname) for _ in range(n_calls // 4)
+                                       for cname in ('ra', 'dec', 'redshift', 'mag_auto')], repeat)
+            results.add('Catalog.get_col (aliases)', n_rows, t, peak, 4 * (n_calls // 4))
+
+
+def run_inspection_data(results: Results, n_rows: int, tmp_dir: pathlib.Path, n_calls: int, repeat: int,
+                        rng: np.random.Generator):
+    review = InspectionData.create(list(range(1, n_rows + 1)), flags=['is_agn', 'is_star'])
+    review.df['comment'] = np.where(rng.random(n_rows) < 0.1, 'broad emission line', '')
+    filename = tmp_dir / f'review_{n_rows}.csv'
+
+    t, peak = measure(lambda: review.write(filename), repeat)
+    results.add('InspectionData.write (csv)', n_rows, t, peak)
+
+    t, peak = measure(lambda: review.write(filename.with_suffix('.fits'), 'fits'), repeat)
+    results.add('InspectionData.write (fits)', n_rows, t, peak)
+
+    t, peak = measure(lambda: InspectionData.read(filename), repeat)
+    results.add('InspectionData.read', n_rows, t, peak)
+
+    indices = rng.integers(0, n_rows, n_calls)
+    t, peak = measure(lambda: [review.update_value(j, 'z_sviz', 1.5) for j in indices], repeat)
+    results.add('InspectionData.update_value', n_rows, t, peak, n_calls)
+
+    ids = [str(i + 1) for i in indices]  # as typed in the search bar
+    t, peak = measure(lambda: [review.get_id_loc(obj_id) for obj_id in ids], repeat)
+    results.add('InspectionData.get_id_loc', n_rows, t, peak, n_calls)
+
+    t, peak = measure(lambda: [review.validate_id(obj_id) for obj_id in ids], repeat)
+    results.add('InspectionData.validate_id', n_rows, t, peak, n_calls)
+
+
+def run_data_dir(results: Results, n_files: int, tmp_dir: pathlib.Path, id_pattern: str, repeat: int):
+    data_dir = tmp_dir / 'data'
+    data_dir.mkdir()
+    for i in range(n_files // 3):
+        for suffix in ('full', 'stack', '1D'):
+            (data_dir / f'synth_{i + 1:05d}.{suffix}.fits').touch()
+
+    t, peak = measure(lambda: get_ids_from_dir(data_dir, id_pattern=id_pattern), repeat)
+    results.add('get_ids_from_dir', 3 * (n_files // 3), t, peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e4, 1e5, 1e6, 1e7],
+                        help='the numbers of rows in the catalogues (default: 1e4 1e5 1e6 1e7)')
+    parser.add_argument('--n-files', type=float, default=1e5, help='the number of files in the data directory')
+    parser.add_argument('--n-calls', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', type=pathlib.Path, help='write the results to a JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)  # IDs that are not found would be logged for every call
+
+    config = Config.read_default_params('config.yml')
+    rng = np.random.default_rng(0)
+    results = Results()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = pathlib.Path(tmp_dir)
+        for n_rows in map(int, args.sizes):
+            run_catalogue(results, n_rows, tmp_dir, config.catalogue.translate, args.n_calls, args.repeat, rng)
+            run_inspection_data(results, n_rows, tmp_dir, args.n_calls, args.repeat, rng)
+        if args.n_files > 0:
+            run_data_dir(results, int(args.n_files), tmp_dir, config.data.id_pattern, args.repeat)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({'benchmark': 'io_scaling', 'n_calls': args.n_calls, 'repeat': args.repeat,
+                                           'results': results.rows}, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Measure the end-to-end latency of loading objects in the main window, from `MainWindow.load_object` to the end of
+`MainWindow.finalize_loading`, with the default data viewer configuration (`data_widgets.yml`) and the grizli and
+eiger plugins. The objects are taken from a synthetic grizli-like project (see `synthetic_project.py`), which is either
+written to a temporary directory or read from `--project`. With `--mosaic-size`, a widget showing cutouts of a shared
+mosaic is added to the viewer.
+
+The objects are loaded one after another, waiting `--pause` seconds between two objects (as a user looking at each
+object would). The latency includes the grace time of the loader (the time the loader waits for the user to skip the
+object), which is also reported separately. The results are printed and written to a JSON file.
+
+Usage: QT_QPA_PLATFORM=offscreen python benchmarks/object_loading.py [--n-objects N] [--mosaic-size N]
+           [--project DIR] [--warmup N] [--pause S] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from importlib import metadata
+
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pyqtgraph as pg  # noqa: E402
+from qtpy import QtCore, QtWidgets  # noqa: E402
+
+from specvizitor.config import Config, Cache, DataWidgets, SpectralLineData  # noqa: E402
+from specvizitor.config import config as cfg, data_widgets  # noqa: E402
+from specvizitor.io.viewer_data import add_unit_aliases  # noqa: E402
+from specvizitor.main import load_plugins  # noqa: E402
+from specvizitor.utils.params import LocalFile  # noqa: E402
+from specvizitor.widgets.MainWindow import MainWindow  # noqa: E402
+
+from synthetic_project import ProjectOptions, add_project_arguments, get_project_options, make_project  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def create_window(paths: dict[str, pathlib.Path], config_dir: pathlib.Path) -> tuple[MainWindow, list[str]]:
+    """Create the main window with the default configuration, stored in `config_dir` (the local configuration files
+    of the user are left untouched). Return the window and the names of the plugins.
+    """
+    config = Config.read_user_params(LocalFile(str(config_dir), filename='config.yml'), default='config.yml')
+    config.data.dir = str(paths['data'])
+    config.catalogue.filename = str(paths['catalogue'])
+    add_unit_aliases(config.data.enabled_unit_aliases)
+
+    widget_cfg = DataWidgets.read_default_params('data_widgets.yml')
+    if 'mosaic' in paths:
+        config.data.images['mosaic'] = cfg.Image(filename=str(paths['mosaic']))
+        widget_cfg.images['Mosaic'] = data_widgets.Image(
+            data=data_widgets.DataElement(source='mosaic', loader_params={'cutout_size': 100}), tiles=True,
+            position='right', relative_to='Image Cutout')
+
+    plugins = load_plugins(config.plugins)
+    w = MainWindow(config=config, cache=Cache.read_user_params(LocalFile(str(config_dir), filename='cache.yml')),
+                   widget_cfg=widget_cfg, spectral_lines=SpectralLineData.read_default_params('spectral_lines.yml'),
+                   plugins=list(plugins.values()))
+    w.resize(1920, 1080)
+    w.show()
+
+    w.rd.output_path = config_dir / 'review.csv'
+    w.rd.create()
+    w.load_project()
+
+    return w, list(plugins)
+
+
+class LoadingTimer:
+    """Loads objects in the main window and measures the time until the loading is finalized."""
+
+    def __init__(self, app: QtWidgets.QApplication, w: MainWindow, timeout: float = 60):
+        self.app = app
+        self.w = w
+        self.timeout = timeout
+
+        self._t_end: float | None = None
+        # connected after `MainWindow.finalize_loading`, and therefore called after it
+        self.w._data_viewer.object_loaded.connect(self._finalized)
+
+    def _finalized(self):
+        self._t_end = time.perf_counter()
+
+    def wait(self, t: float):
+        t_end = time.perf_counter() + t
+        while time.perf_counter() < t_end:
+            self.app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+
+    def load(self, j: int) -> tuple[float, float]:
+        """Load an object and return the latency and the grace time of the loader, in seconds."""
+        self._t_end = None
+        t_start = time.perf_counter()
+        self.w.load_object(j)
+        t_grace = self.w._data_viewer._worker.t_grace
+
+        while self._t_end is None:
+            if time.perf_counter() - t_start > self.timeout:
+                raise TimeoutError(f"object #{j + 1} not loaded in {self.timeout} s")
+            self.app.processEvents(QtCore.QEventLoop.AllEvents, 1)
+
+        return self._t_end - t_start, t_grace
+
+
+def get_environment() -> dict:
+    versions = {}
+    for package in ('specvizitor', 'numpy', 'astropy', 'pyqtgraph', 'PyQt5'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    return {'python': sys.version.split()[0], 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'qt_platform': os.environ.get('QT_QPA_PLATFORM'), 'packages': versions}
+
+
+def summarize(latencies: np.ndarray) -> dict:
+    return {'mean': float(np.mean(latencies)), 'min': float(np.min(latencies)), 'max': float(np.max(latencies)),
+            **{f'p{p}': float(np.percentile(latencies, p)) for p in PERCENTILES}}
+
+
+def run(paths: dict[str, pathlib.Path], options: ProjectOptions | None, args: argparse.Namespace) -> dict:
+    pg.setConfigOption('imageAxisOrder', 'row-major')
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(['specvizitor'])
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        w, plugins = create_window(paths, pathlib.Path(config_dir))
+        timer = LoadingTimer(app, w, timeout=args.timeout)
+        timer.wait(args.pause)  # let the first object (loaded with the project) load
+
+        n_objects = w.rd.review.n_objects
+        order = [j % n_objects for j in range(args.warmup + args.n_loads)] if args.n_loads else \
+            [j % n_objects for j in range(args.warmup)] + list(range(n_objects))
+
+        samples = []
+        for k, j in enumerate(order):
+            latency, t_grace = timer.load(j)
+            if k >= args.warmup:
+                samples.append({'id': int(w.rd.review.get_id(j)), 'latency': latency, 'grace': t_grace})
+            timer.wait(args.pause)
+
+        widgets = sorted(w._data_viewer.active_widgets)
+        w.close()
+
+    latencies = np.array([s['latency'] for s in samples])
+    return {
+        'benchmark': 'object_loading',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': get_environment(),
+        'project': asdict(options) if options is not None else {'path': str(args.project)},
+        'widgets': widgets,
+        'plugins': plugins,
+        'warmup': args.warmup,
+        'pause': args.pause,
+        'latency': summarize(latencies),
+        'latency_without_grace': summarize(latencies - np.array([s['grace'] for s in samples])),
+        'samples': samples,
+    }
+
+
+def print_results(results: dict):
+    print(f"Objects loaded: {len(results['samples'])} (warm-up: {results['warmup']})")
+    print(f"Widgets: {', '.join(results['widgets'])}\n")
+    print(f"{'latency, ms':<26}{'mean':>8}{'min':>8}" + ''.join(f"{f'p{p}':>8}" for p in PERCENTILES) + f"{'max':>8}")
+    for key, title in (('latency', 'end-to-end'), ('latency_without_grace', 'excluding grace time')):
+        s = results[key]
+        print(f"{title:<26}" + ''.join(f"{1000 * s[k]:>8.1f}" for k in ('mean', 'min') +
+                                       tuple(f'p{p}' for p in PERCENTILES) + ('max',)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--project', type=pathlib.Path,
+                        help='a project written by synthetic_project.py (by default, a new project is written to a '
+                             'temporary directory)')
+    add_project_arguments(parser)
+    parser.add_argument('--n-loads', type=int, default=0,
+                        help='the number of objects to load (by default, each object is loaded once)')
+    parser.add_argument('--warmup', type=int, default=3, help='the number of loads excluded from the statistics')
+    parser.add_argument('--pause', type=float, default=0.5, help='the time between two loads, in seconds')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--output', type=pathlib.Path, default=pathlib.Path('object_loading.json'))
+    args = parser.parse_args()
+
+    if args.project is not None:
+        paths = {'catalogue': args.project / 'catalogue.fits', 'data': args.project / 'data'}
+        if (args.project / 'mosaic.fits').exists():
+            paths['mosaic'] = args.project / 'mosaic.fits'
+        results = run(paths, None, args)
+    else:
+        options = get_project_options(args)
+        with tempfile.TemporaryDirectory() as project_dir:
+            print(f"Writing a synthetic project ({options.n_objects} objects)...")
+            paths = make_project(project_dir, options)
+            results = run(paths, options, args)
+
+    print_results(results)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
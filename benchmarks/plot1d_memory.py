@@ -0,0 +1,101 @@
+"""Measure the memory allocated while preparing a grizli 1D spectrum for display, with read-only views of the table
+columns (the default) and with defensive copies (the behaviour before zero-copy column access).
+
+Usage: python benchmarks/plot1d_memory.py [--n-rows N] [--n-objects N]
+"""
+
+import argparse
+import importlib
+import os
+import pathlib
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+import astropy.units as u
+import numpy as np
+from astropy.io import fits
+from astropy.table import Table
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qtpy import QtWidgets  # noqa: E402
+
+from specvizitor.config import Config, DataWidgets, SpectralLineData  # noqa: E402
+from specvizitor.io.viewer_data import ViewerData  # noqa: E402
+from specvizitor.widgets.Plot1D import Plot1D  # noqa: E402
+
+
+def make_grizli_spec1d(filename: pathlib.Path, n_rows: int, seed: int = 0):
+    """Write a synthetic spectrum with the columns and units of a grizli `1D.fits` file."""
+    rng = np.random.default_rng(seed)
+    wave = np.linspace(30000, 50000, n_rows)
+    counts = u.ct / u.s
+
+    t = Table({
+        'wave': wave * u.AA,
+        'flux': rng.normal(size=n_rows) * counts,
+        'err': np.abs(rng.normal(size=n_rows)) * counts,
+        'npix': rng.integers(1, 100, n_rows),
+        'flat': np.full(n_rows, 1e19) * u.Unit('AA cm2 ct / erg'),
+        'contam': np.abs(rng.normal(size=n_rows)) * counts,
+        'line': rng.normal(size=n_rows) * counts,
+        'cont': rng.normal(size=n_rows) * counts,
+        'pscale': np.ones(n_rows),
+    })
+    fits.HDUList([fits.PrimaryHDU(), fits.table_to_hdu(t)]).writeto(filename, overwrite=True)
+
+
+def measure(widget: Plot1D, plugin, data, meta, n_objects: int) -> tuple[float, float, float]:
+    """Return the memory retained by the display products, the peak allocation and the time per object."""
+    retained, peak, elapsed = 0, 0, 0.
+    for _ in range(n_objects):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+
+        products = widget.prepare_display(plugin.transform_data(widget, data, meta), meta)
+
+        elapsed += time.perf_counter() - t0
+        current, peak_current = tracemalloc.get_traced_memory()
+        retained, peak = retained + current, peak + peak_current
+        tracemalloc.stop()
+        del products
+
+    return retained / n_objects, peak / n_objects, elapsed / n_objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n-rows', type=int, default=100_000, help='the number of rows in the spectrum')
+    parser.add_argument('--n-objects', type=int, default=20, help='the number of objects to average over')
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication([])  # noqa: F841
+
+    cfg = DataWidgets.read_default_params('data_widgets.yml').plots['Spectrum 1D']
+    for cname in ('contam', 'line', 'cont'):
+        cfg.plots.setdefault(cname, type(cfg.plots['flux'])(x='wave', y=cname))
+
+    widget = Plot1D(cfg=cfg, title='Spectrum 1D', appearance=Config.read_default_params('config.yml').appearance,
+                    spectral_lines=SpectralLineData.read_default_params('spectral_lines.yml'))
+    plugin = importlib.import_module('specvizitor.plugins.sviz-grizli').Plugin()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = pathlib.Path(tmp) / 'bench_00001.1D.fits'
+        make_grizli_spec1d(filename, args.n_rows)
+        data, meta = ViewerData().load(str(filename))
+
+    print(f"{len(cfg.plots)} plots, {args.n_rows} rows, {data.as_array().nbytes / 2 ** 20:.2f} MiB table")
+
+    results = {'views': measure(widget, plugin, data, meta, args.n_objects)}
+    widget.get_plot_data = partial(Plot1D.get_plot_data, widget, copy=True)
+    results['copies'] = measure(widget, plugin, data, meta, args.n_objects)
+
+    for mode, (retained, peak, elapsed) in results.items():
+        print(f"{mode:>8}: retained {retained / 2 ** 20:6.2f} MiB, peak {peak / 2 ** 20:6.2f} MiB, "
+              f"{elapsed * 1e3:6.1f} ms per object")
+
+
+if __name__ == '__main__':
+    main()
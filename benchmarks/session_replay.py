@@ -0,0 +1,358 @@
+"""Replay a session recorded in specvizitor (:menuselection:`Tools --> Record Session`) in the main window, headlessly,
+and measure the interactive performance: the latency of each event (navigation between objects, changes of the
+redshift, sliders and color bar levels, view resets) and the time the GUI thread was blocked while handling it.
+
+The main window is created with the configuration of the data viewer saved in the session (the local configuration
+files of the user are left untouched) and a copy of the inspection file, and the events are replayed at the recorded
+times (scaled by `--speed`; with `--speed 0`, each event is replayed as soon as the previous one is handled). The
+data and the catalogue are read from the paths saved in the session, so the session is best replayed on the machine
+where it was recorded.
+
+The latency of an event is measured until its effect is visible: for navigation, until the new object is loaded (or
+until the next navigation event, in which case the load is reported as superseded, as the user skipped the object);
+for smoothing, until the smoothed images are shown; for the other events, until the event is handled. The GUI thread
+is considered blocked when the event loop does not respond for longer than `--stall` milliseconds; the blocking time
+of an event is the total duration of such stalls while the event is pending.
+
+The results are printed and written to a JSON file. With `--baseline`, the results are compared to a previous run
+(e.g. made with another release of specvizitor).
+
+Usage: QT_QPA_PLATFORM=offscreen python benchmarks/session_replay.py SESSION [--inspection-file FILE] [--speed X]
+           [--stall MS] [--settle S] [--timeout S] [--baseline FILE] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+
+import dacite
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pyqtgraph as pg  # noqa: E402
+from qtpy import QtCore, QtWidgets  # noqa: E402
+
+from specvizitor.config import Config, Cache, DataWidgets, SpectralLineData  # noqa: E402
+from specvizitor.io.viewer_data import add_unit_aliases  # noqa: E402
+from specvizitor.main import load_plugins  # noqa: E402
+from specvizitor.utils.params import LocalFile  # noqa: E402
+from specvizitor.utils.session import read_session  # noqa: E402
+from specvizitor.widgets.MainWindow import MainWindow  # noqa: E402
+from specvizitor.widgets.NavigationAction import Direction, NavigationAction  # noqa: E402
+from specvizitor.widgets.ViewerElement import SliderItem  # noqa: E402
+
+from object_loading import PERCENTILES, get_environment, summarize  # noqa: E402
+
+NAVIGATION_EVENTS = ('navigate', 'select')
+
+
+def create_window(header: dict, inspection_file: pathlib.Path, config_dir: pathlib.Path) -> MainWindow:
+    """Create the main window with the configuration saved in the session header, stored in `config_dir`, and open a
+    copy of the inspection file at the object the session started with.
+    """
+    config = dacite.from_dict(data_class=Config, data=header['config'], config=dacite.Config())
+    add_unit_aliases(config.data.enabled_unit_aliases)
+
+    cache = Cache.read_user_params(LocalFile(str(config_dir), filename='cache.yml'))
+    cache.dock_layout = header.get('dock_layout')
+
+    plugins = load_plugins(config.plugins)
+    w = MainWindow(config=config, cache=cache,
+                   widget_cfg=dacite.from_dict(data_class=DataWidgets, data=header['data_widgets'],
+                                               config=dacite.Config()),
+                   spectral_lines=dacite.from_dict(data_class=SpectralLineData, data=header['spectral_lines'],
+                                                   config=dacite.Config()),
+                   plugins=list(plugins.values()))
+    w.resize(*header.get('window_size', (1920, 1080)))
+    w.show()
+
+    review = config_dir / inspection_file.name
+    shutil.copy(inspection_file, review)
+    w.open_file(str(review), cached_index=header.get('object_index'))
+
+    return w
+
+
+class PendingEvent:
+    """An event being replayed: the time it was dispatched and the time the GUI thread was blocked since then."""
+
+    def __init__(self, index: int, event: dict):
+        self.index = index
+        self.event = event
+        self.t_start: float = 0
+        self.t_handled: float = 0
+        self.blocking: float = 0
+        self.longest_stall: float = 0
+
+    def add_stall(self, stall: float):
+        self.blocking += stall
+        self.longest_stall = max(self.longest_stall, stall)
+
+    def to_record(self, t_end: float | None) -> dict:
+        return {'index': self.index, 'type': self.event['type'], 't': self.event['t'],
+                'latency': t_end - self.t_start if t_end is not None else None,
+                'handler': self.t_handled - self.t_start, 'blocking': self.blocking,
+                'longest_stall': self.longest_stall, 'superseded': t_end is None,
+                **{k: self.event[k] for k in ('widget', 'slider') if k in self.event}}
+
+
+class SessionReplayer:
+    """Replays the events of a session in the main window and measures their latency and the blocking time."""
+
+    heartbeat_interval: int = 1  # in milliseconds
+
+    def __init__(self, app: QtWidgets.QApplication, w: MainWindow, stall: float = 0.016, timeout: float = 60):
+        self.app = app
+        self.w = w
+        self.dv = w._data_viewer
+        self.stall = stall
+        self.timeout = timeout
+
+        self._pending: list[PendingEvent] = []
+        self._records: list[dict] = []
+        self._object_loaded: bool = False
+        self._t_tick = time.perf_counter()
+
+        # connected after `MainWindow.finalize_loading`, and therefore called after it
+        self.dv.object_loaded.connect(self._loaded)
+
+        self._heartbeat = QtCore.QTimer()
+        self._heartbeat.setInterval(self.heartbeat_interval)
+        self._heartbeat.timeout.connect(self._tick)
+
+    def _loaded(self):
+        self._object_loaded = True
+
+    def _tick(self):
+        t = time.perf_counter()
+        self._add_stall(t - self._t_tick)
+        self._t_tick = t
+
+    def _add_stall(self, dt: float):
+        if dt > self.stall:
+            for p in self._pending:
+                p.add_stall(dt)
+
+    def _process_events(self):
+        self.app.processEvents(QtCore.QEventLoop.AllEvents, 1)
+
+    def wait(self, t: float):
+        t_end = time.perf_counter() + t
+        while time.perf_counter() < t_end:
+            self._process_events()
+
+    def wait_for_object(self):
+        self._object_loaded = False
+        t_start = time.perf_counter()
+        while not self._object_loaded:
+            if time.perf_counter() - t_start > self.timeout:
+                raise TimeoutError(f"object not loaded in {self.timeout} s")
+            self._process_events()
+
+    def _smoothing_done(self) -> bool:
+        return all(getattr(w, '_smoothing_worker', None) is None for w in self.dv.widgets.values())
+
+    def _is_done(self, p: PendingEvent) -> bool:
+        if p.event['type'] in NAVIGATION_EVENTS:
+            return self._object_loaded
+        if p.event['type'] == 'slider' and p.event.get('slider') == 'smoothing':
+            return self._smoothing_done()
+        return True
+
+    def _update_pending(self):
+        t = time.perf_counter()
+        for p in list(self._pending):
+            if time.perf_counter() - p.t_start > self.timeout:
+                raise TimeoutError(f"event #{p.index + 1} ({p.event['type']}) not completed in {self.timeout} s")
+            if self._is_done(p):
+                self._records.append(p.to_record(t))
+                self._pending.remove(p)
+
+    def _replay_navigate(self, event: dict):
+        self.w.switch_object(NavigationAction(Direction[event['direction'].upper()], event.get('starred_only', False)))
+
+    def _replay_select(self, event: dict):
+        self.w.load_object(event['index'])
+
+    def _replay_redshift(self, event: dict):
+        self.dv._change_redshift(event['n_steps'], event.get('small_step', False))
+
+    def _replay_slider(self, event: dict):
+        self.dv.widgets[event['widget']].sliders[SliderItem[event['slider'].upper()]].set_value(event['value'])
+
+    def _replay_levels(self, event: dict):
+        self.dv.widgets[event['widget']].cbar.setLevels(tuple(event['levels']))
+
+    def _replay_reset_view(self, event: dict):
+        self.dv.reset_view()
+
+    def dispatch(self, index: int, event: dict):
+        handler = getattr(self, f"_replay_{event['type']}", None)
+        if handler is None:
+            print(f"Unknown event skipped: {event}")
+            return
+
+        if event['type'] in NAVIGATION_EVENTS:
+            # the object being loaded is skipped, as the loader discards the outdated data
+            for p in [p for p in self._pending if p.event['type'] in NAVIGATION_EVENTS]:
+                self._records.append(p.to_record(None))
+                self._pending.remove(p)
+            self._object_loaded = False
+
+        p = PendingEvent(index, event)
+        self._pending.append(p)
+
+        p.t_start = time.perf_counter()
+        handler(event)
+        p.t_handled = time.perf_counter()
+
+        self._add_stall(p.t_handled - p.t_start)
+        self._t_tick = p.t_handled  # the handler is accounted for above
+        self._update_pending()
+
+    def replay(self, events: list[dict], speed: float = 1) -> list[dict]:
+        self._records = []
+        self._t_tick = time.perf_counter()
+        self._heartbeat.start()
+
+        t_start = time.perf_counter()
+        for index, event in enumerate(events):
+            while True:
+                self._process_events()
+                self._update_pending()
+                if speed > 0 and time.perf_counter() - t_start >= event['t'] / speed:
+                    break
+                if speed <= 0 and not self._pending:
+                    break
+            self.dispatch(index, event)
+
+        while self._pending:
+            self._process_events()
+            self._update_pending()
+
+        self._heartbeat.stop()
+        return sorted(self._records, key=lambda r: r['index'])
+
+
+def summarize_events(records: list[dict]) -> dict:
+    by_type = defaultdict(list)
+    for r in records:
+        by_type[f"{r['type']}:{r['slider']}" if 'slider' in r else r['type']].append(r)
+
+    summary = {}
+    for event_type, rs in sorted(by_type.items()):
+        completed = [r['latency'] for r in rs if r['latency'] is not None]
+        summary[event_type] = {
+            'count': len(rs),
+            'superseded': len(rs) - len(completed),
+            'latency': summarize(np.array(completed)) if completed else None,
+            'blocking': summarize(np.array([r['blocking'] for r in rs])),
+            'longest_stall': max(r['longest_stall'] for r in rs),
+        }
+    return summary
+
+
+def run(args: argparse.Namespace) -> dict:
+    header, events = read_session(args.session)
+    inspection_file = args.inspection_file or header.get('inspection_file')
+    if inspection_file is None or not pathlib.Path(inspection_file).exists():
+        raise FileNotFoundError(f"Inspection file not found: {inspection_file} (use --inspection-file)")
+
+    pg.setConfigOption('imageAxisOrder', 'row-major')
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(['specvizitor'])
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        w = create_window(header, pathlib.Path(inspection_file), pathlib.Path(config_dir))
+        replayer = SessionReplayer(app, w, stall=args.stall / 1000, timeout=args.timeout)
+        replayer.wait_for_object()
+        replayer.wait(args.settle)
+
+        t_start = time.perf_counter()
+        records = replayer.replay(events, speed=args.speed)
+        duration = time.perf_counter() - t_start
+
+        widgets = sorted(w._data_viewer.active_widgets)
+        w.close()
+
+    return {
+        'benchmark': 'session_replay',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': get_environment(),
+        'session': {'path': str(args.session), 'created': header.get('created'), 'n_events': len(events),
+                    'duration': events[-1]['t'] if events else 0},
+        'widgets': widgets,
+        'speed': args.speed,
+        'stall_threshold': args.stall / 1000,
+        'duration': duration,
+        'summary': summarize_events(records),
+        'events': records,
+    }
+
+
+def _ratio(current: dict | None, previous: dict | None, key: str) -> str:
+    if current is None or previous is None or previous[key] == 0:
+        return f"{'-':>14}"
+    return f"{current[key] / previous[key]:>13.2f}x"
+
+
+def print_results(results: dict, baseline: dict | None = None):
+    print(f"Events replayed: {results['session']['n_events']} in {results['duration']:.1f} s "
+          f"(recorded: {results['session']['duration']:.1f} s)")
+    print(f"Widgets: {', '.join(results['widgets'])}\n")
+
+    stats = ('mean',) + tuple(f'p{p}' for p in PERCENTILES) + ('max',)
+    print(f"{'event':<18}{'count':>6}{'skip':>6}  {'latency, ms':<10}" + ''.join(f"{s:>8}" for s in stats) +
+          f"{'blocked, ms':>13}{'stall':>8}")
+    for event_type, s in results['summary'].items():
+        latency = ''.join(f"{1000 * s['latency'][k]:>8.1f}" for k in stats) if s['latency'] else \
+            ''.join(f"{'-':>8}" for _ in stats)
+        print(f"{event_type:<18}{s['count']:>6}{s['superseded']:>6}  {'':<10}{latency}"
+              f"{1000 * s['blocking']['mean']:>13.1f}{1000 * s['longest_stall']:>8.1f}")
+
+    if baseline is None:
+        return
+
+    print(f"\nCompared to the baseline ({baseline.get('timestamp')}, specvizitor "
+          f"{baseline['environment']['packages'].get('specvizitor')}):")
+    print(f"{'event':<18}{'p50 latency':>14}{'p95 latency':>14}{'mean blocked':>14}")
+    for event_type, s in results['summary'].items():
+        b = baseline['summary'].get(event_type)
+        if b is None:
+            continue
+        cells = (_ratio(s['latency'], b['latency'], 'p50'), _ratio(s['latency'], b['latency'], 'p95'),
+                 _ratio(s['blocking'], b['blocking'], 'mean'))
+        print(f"{event_type:<18}" + ''.join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('session', type=pathlib.Path, help='the recorded session (JSON Lines)')
+    parser.add_argument('--inspection-file', type=pathlib.Path,
+                        help='the inspection file (by default, the file the session was recorded with); the file '
+                             'is copied, so the original is left untouched')
+    parser.add_argument('--speed', type=float, default=1,
+                        help='the replay speed relative to the recording (0: replay the events back-to-back)')
+    parser.add_argument('--stall', type=float, default=16,
+                        help='the minimum time the event loop does not respond to count as blocking, in ms')
+    parser.add_argument('--settle', type=float, default=1,
+                        help='the time to wait after the first object is loaded, in seconds')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--baseline', type=pathlib.Path, help='the results of a previous run to compare to')
+    parser.add_argument('--output', type=pathlib.Path, default=pathlib.Path('session_replay.json'))
+    args = parser.parse_args()
+
+    results = run(args)
+
+    print_results(results, json.loads(args.baseline.read_text()) if args.baseline is not None else None)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""Write a synthetic project resembling grizli products: a catalogue, and for each object a `*.full.fits` file
+(redshift fit, direct image cutouts and emission line maps), a `*.stack.fits` file (2D spectra of several beams) and a
+`*.1D.fits` file (1D spectrum), named as expected by the default data viewer configuration. Optionally, a large mosaic
+with a WCS covering all objects is written as well.
+
+Usage: python benchmarks/synthetic_project.py OUTPUT_DIR [--n-objects N] [--mosaic-size N] [...]
+"""
+
+import argparse
+import dataclasses
+import pathlib
+
+import astropy.units as u
+import numpy as np
+from astropy.io import fits
+from astropy.table import Table
+
+ROOT = 'synth'
+LINES = ['Ha', 'OIII', 'Hb', 'OII', 'SII', 'NeIII', 'HeI', 'SIII']
+RA0, DEC0 = 150.1, 2.2  # the centre of the field
+PIXEL_SCALE = 0.04 / 3600  # the pixel scale of the direct images and of the mosaic, in degrees
+
+
+@dataclasses.dataclass
+class ProjectOptions:
+    n_objects: int = 100
+    n_lines: int = 4            # the number of emission lines (line maps) per object
+    n_beams: int = 3            # the number of 2D spectra (beams) per object
+    cutout_size: int = 80       # the size of the direct image cutouts and line maps
+    spec2d_shape: tuple[int, int] = (64, 1200)
+    n_wave: int = 2000          # the length of the 1D spectra
+    n_zgrid: int = 1000         # the length of the redshift grid
+    mosaic_size: int = 0        # the size of the mosaic (no mosaic if 0)
+    seed: int = 0
+
+
+def get_object_filenames(directory: pathlib.Path, obj_id: int) -> dict[str, pathlib.Path]:
+    stem = f'{ROOT}_{obj_id:05d}'
+    return {suffix: directory / f'{stem}.{suffix}.fits' for suffix in ('full', 'stack', '1D')}
+
+
+def _image_wcs(ra: float, dec: float, size: int) -> fits.Header:
+    h = fits.Header()
+    h['CTYPE1'], h['CTYPE2'] = 'RA---TAN', 'DEC--TAN'
+    h['CRVAL1'], h['CRVAL2'] = ra, dec
+    h['CRPIX1'], h['CRPIX2'] = size / 2 + 0.5, size / 2 + 0.5
+    h['CD1_1'], h['CD2_2'] = -PIXEL_SCALE, PIXEL_SCALE
+    h['CD1_2'], h['CD2_1'] = 0., 0.
+    return h
+
+
+def _source(size: int, amplitude: float, sigma: float) -> np.ndarray:
+    y, x = np.mgrid[:size, :size] - (size - 1) / 2
+    return (amplitude * np.exp(-(x ** 2 + y ** 2) / (2 * sigma ** 2))).astype(np.float32)
+
+
+def write_full(filename: pathlib.Path, row, options: ProjectOptions, rng: np.random.Generator):
+    size = options.cutout_size
+    wcs = _image_wcs(row['ra'], row['dec'], size)
+
+    primary = fits.PrimaryHDU()
+    primary.header['ID'] = row['id']
+    primary.header['REDSHIFT'] = row['redshift']
+    primary.header['NUMLINES'] = options.n_lines
+    primary.header['HASLINES'] = ' '.join(LINES[:options.n_lines])
+
+    zgrid = np.linspace(0, 10, options.n_zgrid)
+    pdf = np.exp(-(zgrid - row['redshift']) ** 2 / (2 * 0.01 ** 2)) + 1e-4
+    zfit = fits.BinTableHDU(Table({'zgrid': zgrid, 'pdf': pdf / (pdf.sum() * (zgrid[1] - zgrid[0])),
+                                   'risk': rng.uniform(0, 1, options.n_zgrid)}), name='ZFIT_STACK')
+    templ = fits.BinTableHDU(Table({'wave': np.linspace(1000, 60000, 4 * options.n_wave),
+                                    'continuum': rng.normal(size=4 * options.n_wave),
+                                    'full': rng.normal(size=4 * options.n_wave)}), name='TEMPL')
+
+    hdus = [primary, zfit, templ]
+    for extname in ('DSCI', 'DWHT', 'DSEG'):
+        data = rng.normal(size=(size, size)).astype(np.float32) + _source(size, 10, 3)
+        hdus.append(fits.ImageHDU(data, header=wcs, name=extname))
+
+    for line in LINES[:options.n_lines]:
+        h = wcs.copy()
+        h['EXTVER'] = line
+        for extname in ('LINE', 'CONT', 'CONTAM', 'LINEWHT'):
+            data = 0.005 * rng.normal(size=(size, size)).astype(np.float32) + _source(size, 0.01, 2)
+            hdus.append(fits.ImageHDU(data, header=h, name=extname))
+
+    fits.HDUList(hdus).writeto(filename, overwrite=True)
+
+
+def write_stack(filename: pathlib.Path, options: ProjectOptions, rng: np.random.Generator):
+    hdus = [fits.PrimaryHDU()]
+    for i in range(options.n_beams):
+        h = fits.Header()
+        h['EXTVER'] = f'F444W,{72 + 36 * i}'
+        h['CRVAL1'], h['CRPIX1'], h['CD1_1'] = 3.8, 1, 1.2 / options.spec2d_shape[1]  # in microns
+        for extname in ('SCI', 'WHT', 'CONTAM', 'MODEL'):
+            data = 0.005 * rng.normal(size=options.spec2d_shape).astype(np.float32)
+            hdus.append(fits.ImageHDU(data, header=h, name=extname))
+        hdus.append(fits.ImageHDU(_source(32, 1, 2), header=h, name='KERNEL'))
+
+    fits.HDUList(hdus).writeto(filename, overwrite=True)
+
+
+def write_spec1d(filename: pathlib.Path, options: ProjectOptions, rng: np.random.Generator):
+    n = options.n_wave
+    counts = u.ct / u.s
+
+    t = Table({
+        'wave': np.linspace(38000, 50000, n) * u.AA,
+        'flux': 0.3 * rng.normal(size=n) * counts,
+        'err': np.abs(0.3 * rng.normal(size=n)) * counts,
+        'contam': np.abs(0.1 * rng.normal(size=n)) * counts,
+        'line': rng.normal(size=n) * counts,
+        'cont': rng.normal(size=n) * counts,
+        'flat': rng.uniform(0.5e19, 1.5e19, n) * u.Unit('AA cm2 ct / erg'),
+        'npix': rng.integers(1, 100, n),
+    })
+    t.write(filename, overwrite=True)
+
+
+def write_mosaic(filename: pathlib.Path, options: ProjectOptions, rng: np.random.Generator):
+    """Write a mosaic of `mosaic_size` x `mosaic_size` pixels row by row, without holding it in memory."""
+    size = options.mosaic_size
+
+    header = fits.PrimaryHDU(np.zeros((0, 0), dtype=np.float32)).header
+    header['NAXIS1'], header['NAXIS2'] = size, size
+    header.update(_image_wcs(RA0, DEC0, size))
+
+    filename.unlink(missing_ok=True)
+    stream = fits.StreamingHDU(filename, header)
+    try:
+        rows = 256
+        for start in range(0, size, rows):
+            data = 0.01 * rng.normal(size=(min(rows, size - start), size)).astype('>f4')
+            stream.write(data)
+    finally:
+        stream.close()
+
+
+def make_catalogue(options: ProjectOptions, rng: np.random.Generator) -> Table:
+    n = options.n_objects
+
+    # objects are scattered over the central part of the mosaic (or of a field of the same size)
+    extent = 0.4 * (options.mosaic_size or 4096) * PIXEL_SCALE
+    cat = Table({
+        'id': np.arange(1, n + 1),
+        'root': [ROOT] * n,
+        'ra': RA0 + rng.uniform(-extent, extent, n) / np.cos(np.deg2rad(DEC0)),
+        'dec': DEC0 + rng.uniform(-extent, extent, n),
+        'redshift': rng.uniform(0.5, 7, n),
+        'X_IMAGE': rng.uniform(100, options.spec2d_shape[1] - 100, n),
+        'Y_IMAGE': np.full(n, options.spec2d_shape[0] / 2),
+    })
+    for line in LINES[:options.n_lines]:
+        cat[f'sn_{line}'] = rng.exponential(5, n)
+
+    return cat
+
+
+def make_project(directory: str | pathlib.Path, options: ProjectOptions) -> dict[str, pathlib.Path]:
+    """Write a synthetic project to a directory.
+    @param directory: the output directory
+    @param options: the parameters of the project
+    @return: the paths to the catalogue, the data directory and the mosaic (if any)
+    """
+    directory = pathlib.Path(directory)
+    data_dir = directory / 'data'
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    rng = np.random.default_rng(options.seed)
+
+    cat = make_catalogue(options, rng)
+    paths = {'catalogue': directory / 'catalogue.fits', 'data': data_dir}
+    cat.write(paths['catalogue'], overwrite=True)
+
+    for row in cat:
+        filenames = get_object_filenames(data_dir, row['id'])
+        write_full(filenames['full'], row, options, rng)
+        write_stack(filenames['stack'], options, rng)
+        write_spec1d(filenames['1D'], options, rng)
+
+    if options.mosaic_size > 0:
+        paths['mosaic'] = directory / 'mosaic.fits'
+        write_mosaic(paths['mosaic'], options, rng)
+
+    return paths
+
+
+def add_project_arguments(parser: argparse.ArgumentParser):
+    defaults = ProjectOptions()
+    parser.add_argument('--n-objects', type=int, default=defaults.n_objects)
+    parser.add_argument('--n-lines', type=int, default=defaults.n_lines, choices=range(0, len(LINES) + 1))
+    parser.add_argument('--n-beams', type=int, default=defaults.n_beams)
+    parser.add_argument('--cutout-size', type=int, default=defaults.cutout_size)
+    parser.add_argument('--spec2d-shape', type=int, nargs=2, default=defaults.spec2d_shape)
+    parser.add_argument('--n-wave', type=int, default=defaults.n_wave)
+    parser.add_argument('--mosaic-size', type=int, default=defaults.mosaic_size, help='no mosaic if 0')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def get_project_options(args: argparse.Namespace) -> ProjectOptions:
+    return ProjectOptions(n_objects=args.n_objects, n_lines=args.n_lines, n_beams=args.n_beams,
+                          cutout_size=args.cutout_size, spec2d_shape=tuple(args.spec2d_shape), n_wave=args.n_wave,
+                          mosaic_size=args.mosaic_size, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('output_dir')
+    add_project_arguments(parser)
+    args = parser.parse_args()
+
+    paths = make_project(args.output_dir, get_project_options(args))
+    for name, path in paths.items():
+        print(f"{name}: {path}")
+
+
+if __name__ == '__main__':
+    main()
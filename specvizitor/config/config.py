@@ -44,6 +44,7 @@ class DataViewer:
     default_screenshot_location: str | None = None
     redshift_step: float = 0.01
     redshift_small_step: float = 0.0005
+    memory_budget: int | None = None  # in MB
 
 
 @dataclass
@@ -13,6 +13,9 @@ class Limits:
 @dataclass
 class ColorBarLimits(Limits):
     type: str = 'minmax'
+    sample_size: int | None = 100000
+    sampling: str = 'random'
+    seed: int = 0
 
 
 @dataclass
@@ -23,6 +26,7 @@ class Slider:
     min_value: float = 0
     max_value: float = 100
     step: float = 1
+    spacing: str = 'linear'
     default_value: float = 0
 
     catalog_name: str | None = None
@@ -105,6 +109,9 @@ class Image(ViewerElement):
     central_axes: ImageCentralAxes = field(default_factory=ImageCentralAxes)
     central_crosshair: bool = False
     show_sources: bool = False
+    pyramid: bool = False
+    tiles: bool = False
+    precision: str = 'native'
 
 
 @dataclass
@@ -1,3 +1,4 @@
+from astropy.io import fits
 from astropy.table import Table
 import numpy as np
 import pandas as pd
@@ -30,6 +31,155 @@ class FITSWriter(WriterBase):
         t.write(filename, overwrite=True)
 
 
+class ChunkedWriterBase(WriterBase):
+    """A writer that streams the table to the file in chunks of `chunk_size` rows, without building an intermediate
+    copy of the whole table. The index levels are written as the first columns (as with `DataFrame.reset_index`).
+    """
+
+    def __init__(self, chunk_size: int = 65536):
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _get_columns(df: pd.DataFrame) -> dict[str, np.ndarray]:
+        columns = {}
+        for i, name in enumerate(df.index.names):
+            columns[name if name is not None else 'index'] = df.index.get_level_values(i).to_numpy()
+        for cname in df.columns:
+            columns[str(cname)] = df[cname].to_numpy()  # a view of the column (no copy for numeric data)
+        return columns
+
+    def _get_chunks(self, n_rows: int):
+        for start in range(0, n_rows, self.chunk_size):
+            yield start, min(start + self.chunk_size, n_rows)
+
+    @staticmethod
+    def _encode(values: np.ndarray) -> np.ndarray:
+        return np.array([str(v).encode() if v is not None and v == v else b'' for v in values], dtype=np.bytes_)
+
+
+class StreamingFITSWriter(ChunkedWriterBase):
+    """Writes a FITS binary table. The header is written first, and the rows are then streamed to the file as FITS
+    records, one chunk at a time.
+    """
+
+    def _get_column_format(self, values: np.ndarray) -> tuple[str, np.dtype]:
+        if values.dtype.kind == 'b':
+            return 'L', np.dtype('i1')
+        if values.dtype.kind in 'iu':
+            return 'K', np.dtype('>i8')
+        if values.dtype.kind == 'f':
+            return 'D', np.dtype('>f8')
+
+        # strings: the width of the column is the length of the longest (UTF-8 encoded) value
+        width = max((self._encode(values[start:stop]).dtype.itemsize
+                     for start, stop in self._get_chunks(len(values))), default=1)
+        width = max(width, 1)
+        return f'{width}A', np.dtype(f'S{width}')
+
+    def _to_records(self, values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        if values.dtype.kind == 'b':
+            return np.where(values, ord('T'), ord('F')).astype(dtype)
+        if dtype.kind == 'S':
+            return self._encode(values).astype(dtype)
+        return values.astype(dtype, copy=False)
+
+    def write(self, df: pd.DataFrame, filename: pathlib.Path):
+        columns = self._get_columns(df)
+        formats = {name: self._get_column_format(values) for name, values in columns.items()}
+
+        coldefs = fits.ColDefs([fits.Column(name=name, format=fmt) for name, (fmt, _) in formats.items()])
+        header = fits.BinTableHDU.from_columns(coldefs, nrows=0).header
+        header['NAXIS2'] = len(df)
+
+        record_dtype = np.dtype([(name, dtype) for name, (_, dtype) in formats.items()])
+
+        pathlib.Path(filename).unlink(missing_ok=True)  # the stream would otherwise be appended to the file
+        stream = fits.StreamingHDU(filename, header)
+        try:
+            for start, stop in self._get_chunks(len(df)):
+                records = np.empty(stop - start, dtype=record_dtype)
+                for name, values in columns.items():
+                    records[name] = self._to_records(values[start:stop], record_dtype[name])
+                stream.write(records.view(np.uint8))
+        finally:
+            stream.close()
+
+
+class ParquetWriter(ChunkedWriterBase):
+    """Writes an Apache Parquet file, one row group per chunk (requires pyarrow)."""
+
+    def _get_batches(self, df: pd.DataFrame):
+        import pyarrow as pa
+
+        columns = self._get_columns(df)
+        for start, stop in list(self._get_chunks(len(df))) or [(0, 0)]:  # an empty table still has a schema
+            yield pa.RecordBatch.from_pydict({name: values[start:stop] for name, values in columns.items()})
+
+    def _open(self, filename: pathlib.Path, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(filename, schema)
+
+    def write(self, df: pd.DataFrame, filename: pathlib.Path):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.error(f"{type(self).__name__} requires pyarrow (pip install pyarrow)")
+            return
+
+        writer = None
+        try:
+            for batch in self._get_batches(df):
+                if writer is None:
+                    writer = self._open(filename, batch.schema)
+                writer.write_batch(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+class FeatherWriter(ParquetWriter):
+    """Writes a Feather (Apache Arrow IPC) file, one record batch per chunk (requires pyarrow)."""
+
+    def _open(self, filename: pathlib.Path, schema):
+        import pyarrow as pa
+        return pa.ipc.new_file(str(filename), schema)
+
+
+class HDF5Writer(ChunkedWriterBase):
+    """Writes an HDF5 file with one dataset per column, filled one chunk at a time (requires h5py)."""
+
+    def write(self, df: pd.DataFrame, filename: pathlib.Path):
+        try:
+            import h5py
+        except ImportError:
+            logger.error(f"{type(self).__name__} requires h5py (pip install h5py)")
+            return
+
+        columns = self._get_columns(df)
+        with h5py.File(filename, 'w') as f:
+            datasets = {}
+            for name, values in columns.items():
+                dtype = values.dtype if values.dtype.kind in 'biuf' else h5py.string_dtype()
+                datasets[name] = f.create_dataset(name, shape=(len(df),), dtype=dtype,
+                                                  chunks=(max(1, min(self.chunk_size, len(df))),))
+
+            for start, stop in self._get_chunks(len(df)):
+                for name, values in columns.items():
+                    chunk = values[start:stop]
+                    if chunk.dtype.kind not in 'biuf':
+                        chunk = self._encode(chunk).astype(object)
+                    datasets[name][start:stop] = chunk
+
+
+WRITERS: dict[str, type[WriterBase]] = {
+    'csv': CSVWriter,
+    'fits': StreamingFITSWriter,
+    'parquet': ParquetWriter,
+    'feather': FeatherWriter,
+    'hdf5': HDF5Writer
+}
+
+
 @dataclass
 class InspectionData:
     df: pd.DataFrame
@@ -112,15 +262,10 @@ class InspectionData:
         @return: None
         """
 
-        writers: dict[str, type[WriterBase]] = {
-            'csv': CSVWriter,
-            'fits': FITSWriter
-        }
-
-        if writers.get(fmt):
-            writers[fmt]().write(self.df, filename)
+        if WRITERS.get(fmt):
+            WRITERS[fmt]().write(self.df, filename)
         else:
-            logger.error(f"Unknown output format: {fmt}")
+            logger.error(f"Unknown output format: {fmt}. Supported formats: {', '.join(WRITERS)}")
 
     @property
     def n_objects(self) -> int | None:
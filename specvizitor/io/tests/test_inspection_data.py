@@ -0,0 +1,79 @@
+from astropy.table import Table
+import numpy as np
+import pandas as pd
+import pytest
+
+from specvizitor.io.inspection_data import (InspectionData, FITSWriter, StreamingFITSWriter, ParquetWriter,
+                                            FeatherWriter, HDF5Writer)
+
+
+def _create_review(n: int = 10) -> InspectionData:
+    review = InspectionData.create(list(range(1, n + 1)), flags=['is_agn'])
+    review.df['starred'] = np.arange(n) % 3 == 0
+    review.df['z_sviz'] = np.linspace(0, 5, n)
+    review.df['comment'] = [f'comment {i}' if i % 2 else '' for i in range(n)]
+    return review
+
+
+def test_streaming_fits_writer(tmp_path):
+    review = _create_review()
+
+    FITSWriter().write(review.df, tmp_path / 'table.fits')
+    StreamingFITSWriter(chunk_size=3).write(review.df, tmp_path / 'stream.fits')
+
+    t1 = Table.read(tmp_path / 'table.fits')
+    t2 = Table.read(tmp_path / 'stream.fits')
+
+    assert t2.colnames == t1.colnames == ['id', 'starred', 'z_sviz', 'comment', 'is_agn']
+    for cname in ('id', 'starred', 'z_sviz', 'is_agn'):
+        assert np.array_equal(t2[cname], t1[cname])
+        assert t2[cname].dtype.kind == t1[cname].dtype.kind
+    assert list(t2['comment'].filled('')) == list(review.df['comment'])
+
+    # non-ASCII characters are written as UTF-8 (the table writer fails to encode them)
+    review.df.loc[2, 'comment'] = 'émission'
+    StreamingFITSWriter().write(review.df, tmp_path / 'stream.fits')
+    assert Table.read(tmp_path / 'stream.fits')['comment'][1] == 'émission'
+
+    # the file is overwritten, not appended to
+    StreamingFITSWriter().write(review.df.iloc[:4], tmp_path / 'stream.fits')
+    assert len(Table.read(tmp_path / 'stream.fits')) == 4
+
+
+def test_streaming_fits_writer_multi_index(tmp_path):
+    review = InspectionData.create([1, 1, 2], ['a', 'b', 'a'])
+    StreamingFITSWriter().write(review.df, tmp_path / 'stream.fits')
+
+    t = Table.read(tmp_path / 'stream.fits')
+    assert list(t['id']) == [1, 1, 2]
+    assert list(t['id2']) == ['a', 'b', 'a']
+
+
+def test_streaming_fits_writer_empty(tmp_path):
+    review = InspectionData.create([], flags=['is_agn'])
+    StreamingFITSWriter().write(review.df, tmp_path / 'stream.fits')
+    assert len(Table.read(tmp_path / 'stream.fits')) == 0
+
+
+@pytest.mark.parametrize('writer, reader', [
+    (ParquetWriter, pd.read_parquet),
+    (FeatherWriter, pd.read_feather)
+])
+def test_arrow_writers(tmp_path, writer, reader):
+    pytest.importorskip('pyarrow')
+    review = _create_review()
+
+    writer(chunk_size=3).write(review.df, tmp_path / 'table')
+    df = reader(tmp_path / 'table').set_index('id')
+    pd.testing.assert_frame_equal(df, review.df, check_dtype=False)
+
+
+def test_hdf5_writer(tmp_path):
+    h5py = pytest.importorskip('h5py')
+    review = _create_review()
+
+    HDF5Writer(chunk_size=3).write(review.df, tmp_path / 'table.h5')
+    with h5py.File(tmp_path / 'table.h5') as f:
+        assert np.array_equal(f['id'][:], review.df.index)
+        assert np.array_equal(f['z_sviz'][:], review.df['z_sviz'])
+        assert [s.decode() for s in f['comment'][:]] == list(review.df['comment'])
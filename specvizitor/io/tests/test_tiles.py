@@ -0,0 +1,94 @@
+import threading
+
+from astropy.io import fits
+import numpy as np
+
+from specvizitor.io.tiles import TiledImageReader
+from specvizitor.io.viewer_data import ViewerData
+
+
+def test_read_window(tmp_path):
+    data = np.arange(300 * 200, dtype=float).reshape(300, 200)
+    filename = str(tmp_path / "image.fits")
+    fits.PrimaryHDU(data).writeto(filename)
+
+    viewer_data = ViewerData()
+    viewer_data.load(filename)
+    loader = viewer_data.open(filename)
+
+    assert np.array_equal(loader.read_window(10, 20, 30, 50), data[30:50, 10:20])
+    assert np.array_equal(loader.read_window(10, 20, 30, 50, step=4), data[30:50:4, 10:20:4])
+    assert loader.read_window(300, 400, 0, 10) is None
+
+    window = loader.read_window(-5, 5, 295, 305)
+    assert window.shape == (10, 10)
+    assert np.isnan(window[:, :5]).all() and np.isnan(window[5:]).all()
+    assert np.array_equal(window[:5, 5:], data[295:, :5])
+
+    assert loader.get_window_origin(create_cutout=True, x0=100, y0=150, cutout_size=10) == (90, 140)
+
+
+def test_tiled_image_reader(tmp_path):
+    data = np.arange(300 * 200, dtype=float).reshape(300, 200)
+    filename = str(tmp_path / "image.fits")
+    fits.PrimaryHDU(data).writeto(filename)
+
+    viewer_data = ViewerData()
+    viewer_data.load(filename)
+    reader = viewer_data.get_tiled_reader(filename, create_cutout=True, x0=100, y0=150)
+    assert isinstance(reader, TiledImageReader)
+    assert viewer_data.get_tiled_reader(filename, create_cutout=True, x0=50, y0=50) is reader
+
+    reader = TiledImageReader(reader.loader, tile_size=64, max_tiles=4)
+    window, (x1, y1) = reader.read(70, 100, 10, 60)
+    assert (x1, y1) == (64, 0)
+    assert np.array_equal(window[:64, :64], data[:64, 64:128])
+    assert reader.n_reads == 1
+
+    reader.read(80, 90, 20, 30)
+    assert reader.n_reads == 1  # cached
+
+    window, (x1, y1) = reader.read(-100, 1000, -100, 1000, step=4)
+    assert (x1, y1) == (0, 0)
+    assert np.array_equal(window[:75, :50], data[::4, ::4])
+    assert np.isnan(window[75:]).all()
+
+    viewer_data.close(filename)
+    assert viewer_data.get_tiled_reader(filename) is None
+
+
+def test_read_pixel(tmp_path):
+    data = np.arange(300 * 200, dtype=float).reshape(300, 200)
+    filename = str(tmp_path / "image.fits")
+    fits.PrimaryHDU(data).writeto(filename)
+
+    viewer_data = ViewerData()
+    viewer_data.load(filename)
+    reader = TiledImageReader(viewer_data.open(filename), tile_size=64)
+
+    assert reader.get_cached_pixel(10, 20) is None
+    assert reader.read_pixel(10, 20) == data[20, 10]
+    assert reader.get_cached_pixel(10, 20) == data[20, 10]
+    assert reader.read_pixel(-1, 20) is None
+
+    # pixels in the cached tiles are available without reading the file
+    reader.read(70, 100, 10, 60)
+    assert reader.get_cached_pixel(100, 50) == data[50, 100]
+    assert reader.get_cached_pixel(100, 70) is None
+
+    # the pixel is not read while the file is in use by another thread
+    locked, release = threading.Event(), threading.Event()
+
+    def read():
+        with reader.loader._lock:
+            locked.set()
+            release.wait()
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    locked.wait()
+    assert reader.read_pixel(10, 20, blocking=False) == data[20, 10]  # cached
+    assert reader.read_pixel(11, 20, blocking=False) is None
+    release.set()
+    thread.join()
+    assert reader.read_pixel(11, 20, blocking=False) == data[20, 11]
@@ -0,0 +1,93 @@
+import os
+import threading
+
+from astropy.io import fits
+import numpy as np
+from PIL import Image
+
+from specvizitor.io.viewer_data import PILLoader, ViewerData
+
+
+def test_pil_loader(monkeypatch, tmp_path):
+    monkeypatch.setattr(PILLoader, "cache_dir", tmp_path / "cache")
+
+    rgb = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+    filename = str(tmp_path / "image.png")
+    Image.fromarray(rgb).save(filename)
+
+    viewer_data = ViewerData()
+    data, _ = viewer_data.load(filename)
+    assert np.array_equal(data, rgb[::-1])
+    assert isinstance(data, np.memmap)
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 1
+
+    data, _ = viewer_data.load(filename, create_cutout=True, x0=40, y0=30, cutout_size=10)
+    assert np.array_equal(data, rgb[::-1][20:40, 30:50])
+    assert np.shares_memory(data, viewer_data.load(filename)[0])
+
+    # the decoded image is reused when the file is re-opened
+    monkeypatch.setattr(Image.Image, "load", lambda *args: (_ for _ in ()).throw(AssertionError("decoded")))
+    viewer_data.reopen(filename)
+    assert np.array_equal(viewer_data.load(filename)[0], rgb[::-1])
+
+
+def test_pil_loader_cache(monkeypatch, tmp_path):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(PILLoader, "cache_dir", cache_dir)
+
+    rgb = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+    filenames = [str(tmp_path / f"image{i}.png") for i in range(4)]
+    for filename in filenames:
+        Image.fromarray(rgb).save(filename)
+
+    def cache_file(i):
+        return cache_dir / f"{'-'.join(PILLoader._get_cache_key(filenames[i]))}.npy"
+
+    # the image decoded from the previous version of a file is removed
+    viewer_data = ViewerData()
+    viewer_data.load(filenames[0])
+    Image.fromarray(rgb[::-1]).save(filenames[0])
+    viewer_data.reopen(filenames[0])
+    assert np.array_equal(viewer_data.load(filenames[0])[0], rgb)
+    assert list(cache_dir.glob("*.npy")) == [cache_file(0)]
+
+    # the least recently used images are removed when the cache is full
+    monkeypatch.setattr(PILLoader, "cache_size", 3 * cache_file(0).stat().st_size)
+    for i in (1, 2):
+        viewer_data.load(filenames[i])
+    for i in range(3):
+        os.utime(cache_file(i), ns=(i, i))
+
+    viewer_data.reopen(filenames[0])  # marks the image as used
+    viewer_data.load(filenames[3])
+    assert set(cache_dir.glob("*.npy")) == {cache_file(i) for i in (0, 2, 3)}
+
+
+def test_fits_loader_held_data(tmp_path):
+    filename = str(tmp_path / "image.fits")
+    fits.HDUList([fits.PrimaryHDU()] + [fits.ImageHDU(np.zeros((10, 10)), name=f"SCI{i}") for i in range(3)]) \
+        .writeto(filename)
+
+    viewer_data = ViewerData()
+    loader = viewer_data.open(filename, memmap=False)
+    n_read = list.__len__(loader._dataset)
+    assert loader.held_data == [None]
+    assert list.__len__(loader._dataset) == n_read  # accounting for the memory does not read the file
+
+    data, _ = viewer_data.load(filename, extname="SCI1")
+    assert len(loader.held_data) == 2  # the data loaded last and the data of the HDU
+
+    # while the file is being read by the loader thread, only the data loaded last is counted
+    locked, release = threading.Event(), threading.Event()
+
+    def read():
+        with loader._lock:
+            locked.set()
+            release.wait()
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    locked.wait()
+    assert len(loader.held_data) == 1
+    release.set()
+    thread.join()
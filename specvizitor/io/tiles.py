@@ -0,0 +1,149 @@
+import numpy as np
+
+import logging
+import math
+
+from ..utils.lru_cache import LRUCache
+from ..utils.precision import to_display_precision
+
+
+__all__ = [
+    "TiledImageReader"
+]
+
+logger = logging.getLogger(__name__)
+
+
+class TiledImageReader:
+    """Read windows of a (large) image on demand. Windows are assembled from square tiles read through the loader,
+    and the most recently used tiles are kept in a bounded cache, so that memory usage does not exceed
+    `max_tiles` x `tile_size`^2 pixels however large the image is. Zoomed-out windows are read from tiles that
+    take every `step`-th pixel of the image, where `step` is a power of two.
+    """
+
+    def __init__(self, loader, tile_size: int = 512, max_tiles: int = 64, precision: str = 'native',
+                 max_pixels: int = 1024, **loader_params):
+        """
+        @param loader: the loader of the image, supporting windowed reads (see `BaseLoader.read_window`)
+        @param tile_size: the size of tiles in (decimated) pixels
+        @param max_tiles: the maximum number of tiles kept in memory
+        @param max_pixels: the maximum number of single pixel values kept in memory (see `read_pixel`)
+        @param precision: the precision of tiles (see `to_display_precision`)
+        @param loader_params: the parameters selecting the image (e.g. the FITS extension)
+        """
+        self.loader = loader
+        self.tile_size = tile_size
+        self.precision = precision
+        self.loader_params = loader_params
+
+        self._tiles = LRUCache(maxsize=max_tiles)
+        self._pixels = LRUCache(maxsize=max_pixels)  # pixel values at the precision of the file
+        self._shape: tuple[int, int] | None = None
+        self.n_reads = 0  # the number of tiles read so far
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the cached tiles."""
+        return sum(tile.nbytes for tile in self._tiles.values() if tile is not None)
+
+    @property
+    def last_used(self) -> float:
+        return self._tiles.last_used
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        if self._shape is None:
+            self._shape = self.loader.get_image_shape(**self.loader_params)
+        return self._shape
+
+    def get_origin(self, **loader_params) -> tuple[int, int]:
+        """Return the position of the data loaded with given parameters (e.g. an image cutout) in the full image."""
+        return self.loader.get_window_origin(**loader_params)
+
+    def _get_tile(self, step: int, tx: int, ty: int) -> np.ndarray | None:
+        key = (step, tx, ty)
+        if key in self._tiles:
+            return self._tiles.get(key)
+
+        span = self.tile_size * step
+        tile = self.loader.read_window(tx * span, (tx + 1) * span, ty * span, (ty + 1) * span, step=step,
+                                       **self.loader_params)
+        if tile is not None:
+            tile = to_display_precision(tile, self.precision)
+        self.n_reads += 1
+        self._tiles.put(key, tile)
+
+        return tile
+
+    def read(self, x1: float, x2: float, y1: float, y2: float,
+             step: int = 1) -> tuple[np.ndarray | None, tuple[int, int]]:
+        """Read the tiles covering a window of the image.
+        @param x1, x2, y1, y2: the window, in the pixel coordinates of the full image
+        @param step: take every `step`-th pixel
+        @return: the assembled tiles and the position of their first pixel in the full image
+        """
+        ny, nx = self.shape
+        span = self.tile_size * step
+
+        tx1, tx2 = max(0, math.floor(x1 / span)), min(math.ceil(nx / span), math.ceil(x2 / span))
+        ty1, ty2 = max(0, math.floor(y1 / span)), min(math.ceil(ny / span), math.ceil(y2 / span))
+        if tx1 >= tx2 or ty1 >= ty2:
+            return None, (0, 0)
+
+        window = None
+        for ty in range(ty1, ty2):
+            for tx in range(tx1, tx2):
+                tile = self._get_tile(step, tx, ty)
+                if tile is None:
+                    continue
+
+                if window is None:
+                    fill_value = np.nan if np.issubdtype(tile.dtype, np.floating) else 0
+                    shape = ((ty2 - ty1) * self.tile_size, (tx2 - tx1) * self.tile_size) + tile.shape[2:]
+                    window = np.full(shape, fill_value, dtype=tile.dtype)
+
+                i, j = (ty - ty1) * self.tile_size, (tx - tx1) * self.tile_size
+                window[i:i + self.tile_size, j:j + self.tile_size] = tile
+
+        logger.debug(f"Image window read (tiles: {(tx2 - tx1) * (ty2 - ty1)}, step: {step}, "
+                     f"tiles read so far: {self.n_reads})")
+
+        return window, (tx1 * span, ty1 * span)
+
+    def get_cached_pixel(self, x: int, y: int):
+        """Return the value of a pixel at the precision of the file if it is available without reading the file (i.e.
+        it has been read before, or it is in a cached tile of the native precision), otherwise None.
+        """
+        value = self._pixels.get((x, y))
+        if value is not None or self.precision != 'native' or self._shape is None:
+            return value
+
+        ny, nx = self._shape
+        if not (0 <= x < nx and 0 <= y < ny):
+            return None
+
+        tile = self._tiles.get((1, x // self.tile_size, y // self.tile_size))
+        return None if tile is None else tile[y % self.tile_size, x % self.tile_size]
+
+    def read_pixel(self, x: int, y: int, blocking: bool = True):
+        """Read a single pixel of the image at the precision of the file. The most recently read values are cached.
+        @param x, y: the pixel coordinates in the full image
+        @param blocking: if False, return None rather than wait if the file is being read by another thread
+        @return: the pixel value, or None if the pixel is outside the image
+        """
+        value = self.get_cached_pixel(x, y)
+        if value is not None:
+            return value
+
+        window = self.loader.read_window(x, x + 1, y, y + 1, blocking=blocking, **self.loader_params)
+        if window is None:
+            return None
+
+        value = window[0, 0]
+        self._pixels.put((x, y), value)
+        return value
+
+    def clear(self):
+        self._tiles.clear()
+        self._pixels.clear()
+        self._shape = None
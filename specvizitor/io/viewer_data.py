@@ -9,13 +9,24 @@ import rasterio
 
 import abc
 from collections import OrderedDict
+from functools import partial
+import hashlib
 import logging
+import math
+import os
 import pathlib
 from string import Formatter
+import threading
+import time
 from typing import Any
 import warnings
 
+from ..config import CACHE_DIR
 from .catalog import Catalog
+from .tiles import TiledImageReader
+from ..utils.disk_cache import prune_cache, touch
+from ..utils.memory import MemoryItem, get_nbytes
+from ..utils.timing import timer
 from ..utils.widgets import FileBrowser
 
 
@@ -32,10 +43,13 @@ __all__ = [
 Image.MAX_IMAGE_PIXELS = None  # ignore warnings when loading large images
 logger = logging.getLogger(__name__)
 
+CUTOUT_PARAMS: tuple[str, ...] = ('create_cutout', 'x0', 'y0', 'cutout_size')
+
 
 class BaseLoader(abc.ABC):
     name: str
     extensions: tuple[str, ...] = ()
+    supports_windows: bool = False  # whether the loader can read windows of the full image (see `read_window`)
 
     def __init__(self):
         self._dataset = None
@@ -43,10 +57,16 @@ class BaseLoader(abc.ABC):
 
         self._last_kwargs: dict | None = None
         self.last_data: tuple[Any, Any] | None = None
+        self.last_used: float = time.monotonic()
+
+        # windows can be read from the GUI thread while the loader thread is loading data
+        self._lock = threading.RLock()
 
     def open(self, filename: str, **kwargs):
-        self._open(filename, **kwargs)
+        with self._lock:
+            self._open(filename, **kwargs)
         self._last_kwargs = kwargs
+        self.last_used = time.monotonic()
 
     @abc.abstractmethod
     def _open(self, filename: str, **kwargs):
@@ -58,14 +78,75 @@ class BaseLoader(abc.ABC):
         self.open(filename, **self._last_kwargs)
 
     def load(self, **kwargs) -> tuple[Any, Any]:
-        self.last_data = self._load(**kwargs)
+        with self._lock:
+            self.last_data = self._load(**kwargs)
+        self.last_used = time.monotonic()
         return self.last_data
 
     def _load(self, **kwargs):
         return self._dataset, self._meta
 
     def close(self):
-        self._dataset.close()
+        with self._lock:
+            self._dataset.close()
+
+    @property
+    def held_data(self) -> list:
+        """The data held in memory by the loader (the data loaded last, and any data read from the file)."""
+        return [self.last_data]
+
+    def get_image_shape(self, **kwargs) -> tuple[int, int]:
+        """Return the shape (ny, nx) of the full (uncut) image selected by the loader parameters."""
+        with self._lock:
+            return self._get_image_shape(**kwargs)
+
+    def _get_image_shape(self, **kwargs) -> tuple[int, int]:
+        raise NotImplementedError(f"{type(self).__name__} does not support windowed reads")
+
+    def get_window_origin(self, create_cutout=False, **kwargs) -> tuple[int, int]:
+        """Return the pixel coordinates (x, y) of the first pixel of the loaded data in the full image."""
+        if not create_cutout:
+            return 0, 0
+        (x1, _, y1, _), _ = self.get_cutout_params(self.get_image_shape(**kwargs), **kwargs)
+        return x1, y1
+
+    def read_window(self, x1: int, x2: int, y1: int, y2: int, step: int = 1, blocking: bool = True,
+                    **kwargs) -> np.ndarray | None:
+        """Read a window of the full image, taking every `step`-th pixel along both axes. The window is given in the
+        pixel coordinates of the full image, with the y-axis pointing up (as in image cutouts). Parts of the window
+        outside the image are filled with NaNs (or zeros for non-float data).
+        @param blocking: if False, the window is not read if the file is being read by another thread
+        @return: an array of shape ceil((y2 - y1) / step) x ceil((x2 - x1) / step), or None if the window does not
+        overlap with the image (or if the file is in use and `blocking` is False)
+        """
+        self.last_used = time.monotonic()
+        if not self._lock.acquire(blocking=blocking):
+            return None
+        try:
+            ny, nx = self._get_image_shape(**kwargs)
+
+            out_shape = math.ceil((y2 - y1) / step), math.ceil((x2 - x1) / step)
+            i1, i2 = max(0, math.ceil(-y1 / step)), min(out_shape[0], math.ceil((ny - y1) / step))
+            j1, j2 = max(0, math.ceil(-x1 / step)), min(out_shape[1], math.ceil((nx - x1) / step))
+            if i1 >= i2 or j1 >= j2:
+                return None
+
+            data = self._read_window(x1 + j1 * step, x1 + j2 * step, y1 + i1 * step, y1 + i2 * step, step, **kwargs)
+        finally:
+            self._lock.release()
+
+        if (i1, i2, j1, j2) == (0, out_shape[0], 0, out_shape[1]):
+            return data
+
+        fill_value = np.nan if np.issubdtype(data.dtype, np.floating) else 0
+        window = np.full(out_shape + data.shape[2:], fill_value, dtype=data.dtype)
+        window[i1:i2, j1:j2] = data
+
+        return window
+
+    def _read_window(self, x1: int, x2: int, y1: int, y2: int, step: int, **kwargs) -> np.ndarray:
+        # the window is within the image, except that the upper bounds may exceed the image size by less than `step`
+        raise NotImplementedError(f"{type(self).__name__} does not support windowed reads")
 
     @classmethod
     def validate_extension(cls, filename: str | pathlib.Path) -> bool:
@@ -89,11 +170,27 @@ class BaseLoader(abc.ABC):
 class GenericFITSLoader(BaseLoader):
     name = 'generic_fits'
     extensions = ('.fits', '.fits.gz')
+    supports_windows = True
 
     def _open(self, filename: str, **kwargs):
         self._dataset = fits.open(filename, **kwargs)
 
-    def _load(self, extname: str = None, extver: str = None, extver_index: int = None, create_cutout=False, **kwargs):
+    @property
+    def held_data(self) -> list:
+        # the file is not touched while the loader thread is reading it: if the loader is busy, the HDU data is not
+        # counted until the next call
+        if not self._lock.acquire(blocking=False):
+            return super().held_data
+        try:
+            # only the HDUs that have already been read are inspected (iterating over `HDUList` reads all HDUs), and
+            # their data only if it has been read (on first access; it is memory-mapped, unless the file is compressed
+            # or scaled)
+            return super().held_data + [hdu.__dict__['data'] for hdu in list.__iter__(self._dataset)
+                                        if 'data' in hdu.__dict__]
+        finally:
+            self._lock.release()
+
+    def _get_hdu(self, extname: str = None, extver: str = None, extver_index: int = None, **kwargs):
         hdul = self._dataset
 
         if extname is not None and extver is not None:
@@ -116,6 +213,11 @@ class GenericFITSLoader(BaseLoader):
         except KeyError:
             KeyError(f"Extension `{index}` not found")
 
+        return hdu
+
+    def _load(self, create_cutout=False, **kwargs):
+        hdu = self._get_hdu(**kwargs)
+
         meta = hdu.header
         if meta.get('XTENSION') and meta['XTENSION'] in ('TABLE', 'BINTABLE'):
             data = Table.read(hdu)
@@ -132,23 +234,106 @@ class GenericFITSLoader(BaseLoader):
     def _create_cutout(data, x1, x2, y1, y2):
         return data[y1:y2, x1:x2]
 
+    def _get_image_shape(self, **kwargs) -> tuple[int, int]:
+        return self._get_hdu(**kwargs).shape[-2:]
+
+    def _read_window(self, x1, x2, y1, y2, step, **kwargs) -> np.ndarray:
+        # only the requested rows are read from the file
+        return np.asarray(self._get_hdu(**kwargs).section[y1:y2:step, x1:x2:step])
+
 
 class PILLoader(BaseLoader):
     name = 'pil'
     extensions = ('.png', '.jpg', '.jpeg')
+    supports_windows = True
 
-    def _open(self, filename: pathlib.Path, **kwargs):
-        image = Image.open(filename, **kwargs)
-        image = ImageOps.flip(image)
-        self._dataset, self._meta = np.array(image), image.info
+    # decoded images are stored as memory-mapped arrays, so that each image is only decoded once
+    cache_dir = pathlib.Path(CACHE_DIR) / 'images'
+    cache_size: int = 2 * 2 ** 30  # the least recently used images are removed when the cache exceeds this size
+
+    def _open(self, filename: str, **kwargs):
+        kwargs = {k: v for k, v in kwargs.items() if k not in CUTOUT_PARAMS}
+
+        with Image.open(filename, **kwargs) as image:
+            self._meta = image.info  # only the header is read at this point
+
+            path_key, version_key = self._get_cache_key(filename)
+            cache_file = self.cache_dir / f"{path_key}-{version_key}.npy"
+            if cache_file.exists():
+                touch(cache_file)
+                self._dataset = np.load(cache_file, mmap_mode='r')
+                return
+
+            data = np.asarray(ImageOps.flip(image))
+
+        try:
+            self._save_to_cache(data, cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to cache the decoded image: {e} (filename: {filename})")
+            self._dataset = data
+            return
+
+        self._dataset = np.load(cache_file, mmap_mode='r')
+        logger.debug(f"Decoded image cached (filename: {filename}, cache: {cache_file.name})")
+
+        self._prune_cache(cache_file, path_key)
+
+    @staticmethod
+    def _get_cache_key(filename: str) -> tuple[str, str]:
+        """Get the keys of the file path and of the file version (its size and modification time)."""
+        path = pathlib.Path(filename).resolve()
+        stat = path.stat()
+        return (hashlib.sha1(str(path).encode()).hexdigest(),
+                hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16])
+
+    def _prune_cache(self, cache_file: pathlib.Path, path_key: str):
+        # remove the images decoded from previous versions of the file
+        for stale_file in self.cache_dir.glob(f"{path_key}-*.npy"):
+            if stale_file != cache_file:
+                try:
+                    stale_file.unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"Failed to remove the outdated decoded image: {e} (cache: {stale_file.name})")
+
+        prune_cache(self.cache_dir, '*.npy', self.cache_size, keep=cache_file)
+
+    @staticmethod
+    def _save_to_cache(data: np.ndarray, cache_file: pathlib.Path):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first, so that an interrupted write never leaves a corrupted cache file
+        tmp_file = cache_file.with_name(f"{cache_file.stem}.{os.getpid()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_file, cache_file)
+
+    def _load(self, create_cutout=False, **kwargs):
+        data = self._dataset
+
+        if create_cutout:
+            coords, _ = self.get_cutout_params(data.shape, **kwargs)
+            data = self._create_cutout(data, *coords)
+
+        return data, self._meta
+
+    @staticmethod
+    def _create_cutout(data, x1, x2, y1, y2):
+        return data[y1:y2, x1:x2]  # a view of the memory-mapped image
 
     def close(self):
-        pass
+        self._dataset = None
+
+    def _get_image_shape(self, **kwargs) -> tuple[int, int]:
+        return self._dataset.shape[:2]
+
+    def _read_window(self, x1, x2, y1, y2, step, **kwargs) -> np.ndarray:
+        return self._dataset[y1:y2:step, x1:x2:step]
 
 
 class RasterIOLoader(BaseLoader):
     name = 'rasterio'
     extensions = ('.tif', '.tiff')
+    supports_windows = True
 
     def _open(self, filename: pathlib.Path, **kwargs):
         with warnings.catch_warnings():
@@ -172,10 +357,26 @@ class RasterIOLoader(BaseLoader):
         data = np.flip(data, 0)
         return data
 
+    def _get_image_shape(self, **kwargs) -> tuple[int, int]:
+        return self._dataset.shape
+
+    def _read_window(self, x1, x2, y1, y2, step, **kwargs) -> np.ndarray:
+        out_shape = (self._dataset.count, math.ceil((y2 - y1) / step), math.ceil((x2 - x1) / step))
+        x2, y2 = min(x2, self._dataset.width), min(y2, self._dataset.height)
+
+        # rasterio rows go from top to bottom; decimated windows are resampled by rasterio (nearest neighbour)
+        data = self._dataset.read(window=rasterio.windows.Window(x1, self._dataset.height - y2, x2 - x1, y2 - y1),
+                                  out_shape=out_shape)
+        data = np.moveaxis(data, 0, -1)
+        data = np.flip(data, 0)
+        return data
+
 
 class ViewerData:
     def __init__(self):
         self._loaders: dict[str, BaseLoader] = {}
+        self._tiled_readers: dict[tuple, TiledImageReader] = {}
+        self._lock = threading.Lock()  # the loaders are opened in the loader thread and accounted for in the GUI thread
         self._loader_constructors: OrderedDict[str, type(BaseLoader)] = OrderedDict(
             [(loader.name, loader) for loader in (GenericFITSLoader, RasterIOLoader, PILLoader)]
         )
@@ -206,7 +407,8 @@ class ViewerData:
             logger.error(f"{type(loader).__name__}: {e} (filename: {filename})")
             return None
 
-        self._loaders[filename] = loader
+        with self._lock:
+            self._loaders[filename] = loader
         logger.debug(f"Database connection opened (filename: {filename})")
 
         return loader
@@ -219,6 +421,12 @@ class ViewerData:
 
         loader.reopen(filename)
 
+        # the file might have changed since the tiles were read
+        with self._lock:
+            tiled_readers = [reader for key, reader in self._tiled_readers.items() if key[0] == filename]
+        for reader in tiled_readers:
+            reader.clear()
+
     def open_image(self, filename: str, loader: str, wcs_source: str | None = None, **kwargs):
         self.open(filename, loader=loader, **kwargs)
         if wcs_source:
@@ -226,7 +434,9 @@ class ViewerData:
 
     def load(self, filename: str, allowed_dtypes=None, silent: bool = False, lazy: bool = False, **kwargs):
         if not self._loaders.get(filename):
-            if not self.open(filename, **kwargs):
+            with timer.span('open'):
+                loader = self.open(filename, **kwargs)
+            if not loader:
                 return None, None
 
         loader = self._loaders.get(filename)
@@ -234,7 +444,8 @@ class ViewerData:
             return loader.last_data
 
         try:
-            data, meta = loader.load(**kwargs)
+            with timer.span('read'):
+                data, meta = loader.load(**kwargs)
         except Exception as e:
             if not silent:
                 logger.error(f"{type(loader).__name__}: {e} (filename: {filename})")
@@ -247,14 +458,61 @@ class ViewerData:
         logger.debug(f"Data loaded (filename: {filename})")
         return data, meta
 
+    @staticmethod
+    def get_data_key(filename: str, **loader_params) -> tuple:
+        """Return a hashable key that identifies the data loaded from `filename` with given loader parameters (i.e. the
+        file, the HDU and the cutout).
+        """
+        return (filename,) + tuple(sorted((k, str(v)) for k, v in loader_params.items()))
+
+    def get_tiled_reader(self, filename: str, precision: str = 'native', **loader_params) -> TiledImageReader | None:
+        """Return a reader of windows of the full image selected by the loader parameters. Readers (and their tile
+        caches) are shared by all data loaded from the same image at the same precision, e.g. by all cutouts of a
+        mosaic.
+        """
+        loader = self._loaders.get(filename)
+        if loader is None or not loader.supports_windows:
+            return None
+
+        image_params = {k: v for k, v in loader_params.items() if k not in CUTOUT_PARAMS}
+        key = self.get_data_key(filename, **image_params) + (precision,)
+        with self._lock:
+            if key not in self._tiled_readers:
+                self._tiled_readers[key] = TiledImageReader(loader, precision=precision, **image_params)
+            return self._tiled_readers[key]
+
+    def memory_items(self, seen: set[int], in_use: set[str] = frozenset()) -> list[MemoryItem]:
+        """Report the memory held by the loaders and by the tile caches of the tiled readers.
+        @param seen: the IDs of objects that have already been counted (see `get_nbytes`)
+        @param in_use: the files used by the widgets; other files are idle and can be closed to release memory
+        """
+        with self._lock:
+            loaders, tiled_readers = list(self._loaders.items()), list(self._tiled_readers.items())
+
+        items = []
+        for filename, loader in loaders:
+            release = None if filename in in_use else partial(self.close, filename)
+            items.append(MemoryItem(kind='loader', name=filename, nbytes=get_nbytes(loader.held_data, seen),
+                                    last_used=loader.last_used, release=release))
+        for key, reader in tiled_readers:
+            items.append(MemoryItem(kind='cache', name=f'tiles ({key[0]})', nbytes=get_nbytes(reader, seen),
+                                    last_used=reader.last_used, release=reader.clear))
+        return items
+
     def close(self, filename: str):
-        if not self._loaders.get(filename):
-            return
-        self._loaders.pop(filename).close()
+        with self._lock:
+            if not self._loaders.get(filename):
+                return
+            for key in [key for key in self._tiled_readers if key[0] == filename]:
+                self._tiled_readers.pop(key)
+            loader = self._loaders.pop(filename)
+        loader.close()
         logger.debug(f"Database connection closed (filename: {filename})")
 
     def close_all(self):
-        for filename in list(self._loaders):
+        with self._lock:
+            filenames = list(self._loaders)
+        for filename in filenames:
             self.close(filename)
 
     @staticmethod
@@ -4,6 +4,7 @@ from qtpy import QtCore, QtWidgets
 import argparse
 import importlib
 import logging
+import pathlib
 import sys
 
 from . import ORGANIZATION, APPLICATION
@@ -11,17 +12,85 @@ from .config.appearance import setup_appearance
 from .config import Cache, Config, DataWidgets, SpectralLineData
 from .config import CACHE_DIR, CONFIG_DIR
 from .io.viewer_data import add_unit_aliases
+from .plugins.plugin_core import PluginCore
 from .utils.params import LocalFile
+from .utils.profiling import profiler
 
 from .widgets.MainWindow import MainWindow
 
 logger = logging.getLogger(__name__)
 
 
+def load_plugins(plugin_names: list[str]) -> dict[str, PluginCore]:
+    """ "Discover" and "register" plugins.
+    @param plugin_names: the names of the plugins
+    @return: the plugins that have been found, mapped to their names
+    """
+    plugins = {}
+    for plugin_name in plugin_names:
+        try:
+            plugins[plugin_name] = importlib.import_module("specvizitor.plugins." + plugin_name).Plugin()
+        except ModuleNotFoundError:
+            logger.warning(f'Plugin not found: {plugin_name}')
+    return plugins
+
+
+def _parse_size(size: str) -> tuple[int, int]:
+    try:
+        width, height = (int(s) for s in size.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {size} (expected WIDTHxHEIGHT, e.g. 1920x1080)")
+    return width, height
+
+
+def _export_screenshots(args, config: Config, local_files: dict[str, LocalFile]) -> int:
+    from .screenshots import ScreenshotOptions, ViewerSetup, get_object_ids, export_screenshots
+
+    ids = get_object_ids(config, catalogue=args.catalogue, ids=args.ids, subset=args.subset)
+    if ids is None:
+        return 1
+
+    output_dir = args.output_dir
+    if output_dir is None:
+        output_dir = config.data_viewer.default_screenshot_location or '.'
+
+    options = ScreenshotOptions(output_dir=str(pathlib.Path(output_dir).resolve()),
+                                catalogue=args.catalogue, width=args.size[0], height=args.size[1],
+                                timeout=args.timeout, log_level=logging.getLogger().level)
+    setup = ViewerSetup(config=config,
+                        widget_cfg=DataWidgets.read_user_params(local_files['widgets'], default='data_widgets.yml'),
+                        spectral_lines=SpectralLineData.read_user_params(local_files['lines'],
+                                                                         default='spectral_lines.yml'),
+                        dock_layout=Cache.read_user_params(local_files['cache']).dock_layout)
+    n_failed = export_screenshots(ids, setup, options, n_jobs=args.jobs, overwrite=args.overwrite)
+
+    return 1 if n_failed else 0
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('-v', '--verbosity', action='count', default=0)
     parser.add_argument('--purge', action='store_true')
+    parser.add_argument('--profile', type=int, nargs='?', const=1, default=0, metavar='N',
+                        help='profile the first N object loads (default: 1) and write the profiles to the cache '
+                             'directory')
+
+    subparsers = parser.add_subparsers(dest='command')
+    screenshots = subparsers.add_parser('screenshots', help='render objects to PNG images without opening the GUI',
+                                        description='Render objects to PNG images using the data viewer configuration '
+                                                    'and layout. Images that already exist are skipped, so an '
+                                                    'interrupted export can be resumed by running the same command.')
+    screenshots.add_argument('ids', nargs='*', help='the IDs of the objects (by default, all objects in the catalogue)')
+    screenshots.add_argument('-s', '--subset', help='a subset file listing the IDs of the objects')
+    screenshots.add_argument('-c', '--catalogue', help='the catalogue (by default, the catalogue used in the GUI)')
+    screenshots.add_argument('-o', '--output-dir', help='the output directory (by default, the default screenshot '
+                                                        'location)')
+    screenshots.add_argument('-j', '--jobs', type=int, default=None,
+                             help='the number of worker processes (by default, the number of CPUs)')
+    screenshots.add_argument('--size', type=_parse_size, default=(1920, 1080), help='the image size (default: 1920x1080)')
+    screenshots.add_argument('--timeout', type=float, default=60,
+                             help='the maximum time to load an object, in seconds (default: 60)')
+    screenshots.add_argument('--overwrite', action='store_true', help='render objects even if their images exist')
 
     args = parser.parse_args()
 
@@ -54,22 +123,22 @@ def main():
 
     config = Config.read_user_params(local_files['config'], default='config.yml')
 
+    if args.command == 'screenshots':
+        sys.exit(_export_screenshots(args, config, local_files))
+
     # register unit aliases
     add_unit_aliases(config.data.enabled_unit_aliases)
 
     # "discover" and "register" plugins
-    plugins = []
-    undiscovered_plugins = []
-    for plugin_name in config.plugins:
-        try:
-            plugins.append(importlib.import_module("specvizitor.plugins." + plugin_name).Plugin())
-        except ModuleNotFoundError:
-            logger.warning(f'Plugin not found: {plugin_name}')
-            undiscovered_plugins.append(plugin_name)
+    plugins = load_plugins(config.plugins)
 
-    config.plugins = [plugin_name for plugin_name in config.plugins if plugin_name not in undiscovered_plugins]
+    config.plugins = list(plugins)
     config.save()
 
+    if args.profile > 0:
+        profiler.request(args.profile)
+        logger.info(f"Profiling {args.profile} object load(s) (profiles are written to {profiler.output_dir})")
+
     exit_code = MainWindow.EXIT_CODE_REBOOT
     while exit_code == MainWindow.EXIT_CODE_REBOOT:
         # start the application
@@ -87,7 +156,7 @@ def main():
                             widget_cfg=DataWidgets.read_user_params(local_files['widgets'], default='data_widgets.yml'),
                             spectral_lines=SpectralLineData.read_user_params(local_files['lines'],
                                                                              default='spectral_lines.yml'),
-                            plugins=plugins)
+                            plugins=list(plugins.values()))
         window.show()
 
         exit_code = app.exec_()
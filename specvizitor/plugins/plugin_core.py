@@ -8,6 +8,11 @@ from specvizitor.widgets.ViewerElement import ViewerElement
 
 
 class PluginCore(ABC):
+    @property
+    def name(self) -> str:
+        """The name of the plugin (the name of its module)."""
+        return type(self).__module__.rsplit('.', 1)[-1]
+
     @abstractmethod
     def override_widget_configs(self, widgets: dict[str, ViewerElement]):
         pass
@@ -20,6 +25,12 @@ class PluginCore(ABC):
     def update_active_widgets(self, widgets: dict[str, ViewerElement], cat_entry: Catalog | None = None):
         pass
 
+    def transform_data(self, widget: ViewerElement, data, meta, cat_entry: Catalog | None = None):
+        """Transform the data loaded to a widget before it is prepared for display. This method is called from the
+        loader thread, so it must neither modify the widget nor the input data (return a new object instead).
+        """
+        return data
+
     @staticmethod
     def get_dock_stack(docks: dict[str, Dock]) -> StackedWidget | None:
         """Locate a stack of docks, if exists. If multiple stacked are found, return the largest stack.
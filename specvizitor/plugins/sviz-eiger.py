@@ -94,8 +94,10 @@ class Plugin(PluginCore):
         for spec_2d in spec_2d_arr:
             pen = pg.mkPen(color, width=2, style=QtCore.Qt.DashLine)
 
-            spec_2d.register_item(pg.PlotCurveItem([x0 - dx, x0 + dx], [y0, y0], pen=pen))
-            spec_2d.register_item(pg.PlotCurveItem([x0, x0], [y0 - dy, y0 + dy], pen=pen))
+            marker_x = spec_2d.acquire_item('emline_marker_x', pg.PlotCurveItem)
+            marker_x.setData([x0 - dx, x0 + dx], [y0, y0], pen=pen)
+            marker_y = spec_2d.acquire_item('emline_marker_y', pg.PlotCurveItem)
+            marker_y.setData([x0, x0], [y0 - dy, y0 + dy], pen=pen)
 
             if zoom:
                 yrange = (0., float(spec_2d.data.shape[0]))
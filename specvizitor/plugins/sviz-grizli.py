@@ -1,3 +1,4 @@
+from astropy.table import Table
 import astropy.units as u
 import numpy as np
 import pyqtgraph as pg
@@ -111,9 +112,10 @@ class Plugin(PluginCore):
         if spec_1d is not None and z_pdf is not None:
             self.add_current_redshift_to_z_pdf(spec_1d, z_pdf)
 
-        if spec_1d is not None:
-            self.convert_spec1d_flux_unit_to_physical(spec_1d)
-            spec_1d.setup_view(cat_entry)
+    def transform_data(self, widget: ViewerElement, data, meta, cat_entry: Catalog | None = None):
+        if widget.title == "Spectrum 1D" and isinstance(widget, Plot1D) and isinstance(data, Table):
+            return self.convert_spec1d_flux_unit_to_physical(widget, data)
+        return data
 
     @staticmethod
     def transform_spec2d(spec_2d: Image2D, spec_1d: Plot1D):
@@ -145,42 +147,41 @@ class Plugin(PluginCore):
 
     @staticmethod
     def add_current_redshift_to_z_pdf(spec_1d: Plot1D, z_pdf: Plot1D):
-        line = pg.InfiniteLine(spec_1d.redshift_slider.value, pen='m')
-        spec_1d.redshift_slider.value_changed[float].connect(lambda z: line.setPos(z))
-        z_pdf.register_item(line)
+        def create_line():
+            line = pg.InfiniteLine(pen='m')
+            spec_1d.redshift_slider.value_changed[float].connect(line.setPos)
+            return line
+
+        z_pdf.acquire_item('current_redshift', create_line).setPos(spec_1d.redshift_slider.value)
 
     @staticmethod
-    def convert_spec1d_flux_unit_to_physical(spec_1d: Plot1D):
+    def convert_spec1d_flux_unit_to_physical(spec_1d: Plot1D, data: Table) -> Table:
         err_msg = "Flux unit conversion skipped: "
 
-        flux = spec_1d.get_plot_data("flux", ignore_missing=True)
+        flux = spec_1d.get_plot_data("flux", ignore_missing=True, data=data)
         if flux is None:
             logger.debug(f"{err_msg}Column not found: `flux`")
-            return
+            return data
 
         if not flux.unit or not flux.unit.is_equivalent(u.Unit('ct / s')):
             logger.debug(f"{err_msg}Expected `ct/s` but found `{flux.unit}` (widget: {spec_1d.title})")
-            return
+            return data
 
-        flat = spec_1d.get_plot_data("flat", ignore_missing=True)
+        flat = spec_1d.get_plot_data("flat", ignore_missing=True, data=data)
         if flat is None:
             logger.debug(f"{err_msg}Column not found: `flat`")
-            return
+            return data
 
         flat = flat.to('1e19 AA cm2 ct / erg')
         with np.errstate(divide='ignore'):
             scale = 1 / flat
         scale[scale == np.inf] = np.nan
 
-        y_unit = (flux * scale).unit
-        spec_1d._axes.y.unit = y_unit
-
-        for label, plot_data_item in spec_1d.plot_data_items.items():
-            x_data, _ = plot_data_item.getData()
-
-            y_data = spec_1d.get_plot_data(spec_1d.cfg.plots[label].y)
-            y_data *= scale
-            y_data = spec_1d.apply_ydata_transform(y_data)
+        data = Table(data, copy=False)  # replace columns in a new table, leaving the loaded data intact
+        for line_plot in spec_1d.cfg.plots.values():
+            y_data = spec_1d.get_plot_data(line_plot.y, ignore_missing=True, data=data)
+            if y_data is None or not y_data.unit or not y_data.unit.is_equivalent(flux.unit):
+                continue
+            data[line_plot.y] = y_data * scale
 
-            spec_1d.data[label] = y_data * y_unit  # replace the original data
-            plot_data_item.setData(x=x_data, y=y_data)
+        return data
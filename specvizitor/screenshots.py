@@ -0,0 +1,226 @@
+import pyqtgraph as pg
+from qtpy import QtCore, QtWidgets
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import logging
+import math
+import multiprocessing
+import os
+import pathlib
+import time
+
+from .config.appearance import setup_appearance
+from .config import Config, DataWidgets, SpectralLineData
+from .io.catalog import Catalog
+from .io.inspection_data import InspectionData
+from .io.viewer_data import add_unit_aliases
+from .main import load_plugins
+from .widgets.DataViewer import DataViewer
+
+__all__ = [
+    "ScreenshotOptions",
+    "ViewerSetup",
+    "ScreenshotRenderer",
+    "get_object_ids",
+    "get_screenshot_path",
+    "export_screenshots"
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScreenshotOptions:
+    output_dir: str
+    catalogue: str | None = None      # overrides the catalogue of the configuration
+    width: int = 1920
+    height: int = 1080
+    timeout: float = 60               # the maximum time to load an object, in seconds
+    log_level: int = logging.WARNING
+
+
+def get_screenshot_path(output_dir: str | pathlib.Path, obj_id) -> pathlib.Path:
+    return pathlib.Path(output_dir) / f'ID{obj_id}.png'
+
+
+def _read_catalogue(config: Config, filename: str | None = None) -> Catalog | None:
+    filename = filename if filename is not None else config.catalogue.filename
+    if not filename:
+        logger.error("Catalogue not specified")
+        return None
+    return Catalog.read(filename, translate=config.catalogue.translate)
+
+
+def _create_review(cat: Catalog) -> InspectionData:
+    return InspectionData.create(*[list(cat.get_col(ind)) for ind in cat.indices])
+
+
+def get_object_ids(config: Config, catalogue: str | None = None, ids: list[str] | None = None,
+                   subset: str | None = None) -> list | None:
+    """Return the IDs of the objects to render: the given IDs, the IDs listed in a subset file, or all objects in the
+    catalogue. IDs not found in the catalogue are skipped.
+    """
+    cat = _read_catalogue(config, catalogue)
+    if cat is None:
+        return None
+    review = _create_review(cat)
+
+    if subset is not None:
+        subset_cat = Catalog.read(subset, translate=config.catalogue.translate)
+        if subset_cat is None:
+            return None
+        ids = list(subset_cat.get_col('id'))
+    elif not ids:
+        ids = list(review.ids)
+
+    ids = [review.get_id(review.get_id_loc(obj_id)) for obj_id in ids if review.validate_id(obj_id)]
+    return list(dict.fromkeys(ids))  # drop duplicates, keeping the order
+
+
+@dataclass(frozen=True)
+class ViewerSetup:
+    """The configuration of the data viewer, read once by the parent process and sent to the renderers (the renderers
+    do not read the local configuration files, which are rewritten when read).
+    """
+    config: Config
+    widget_cfg: DataWidgets
+    spectral_lines: SpectralLineData
+    dock_layout: dict | None = None
+
+
+class ScreenshotRenderer:
+    """Renders the data viewer to images without showing it on screen, using the configuration, the widget layout and
+    the plugins of the application. A renderer needs a QApplication, so only one renderer can exist per process.
+    """
+
+    def __init__(self, setup: ViewerSetup, options: ScreenshotOptions):
+        self.options = options
+        config = setup.config
+
+        pg.setConfigOption('imageAxisOrder', 'row-major')
+        self.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(['specvizitor'])
+
+        add_unit_aliases(config.data.enabled_unit_aliases)
+        setup_appearance(cfg=config.appearance)
+
+        self.cat = _read_catalogue(config, options.catalogue)
+        if self.cat is None:
+            raise RuntimeError("Failed to load the catalogue")
+        self.review = _create_review(self.cat)
+
+        self.viewer = DataViewer(config.data_viewer, config.data, setup.widget_cfg, config.appearance,
+                                 spectral_lines=setup.spectral_lines,
+                                 plugins=list(load_plugins(config.plugins).values()), interactive=False)
+        if setup.dock_layout:
+            self.viewer.update_dock_layout(setup.dock_layout)
+
+        self.viewer.receive_catalog(self.cat)
+        self.viewer.resize(options.width, options.height)
+        self.viewer.show()
+        self.viewer.load_project()
+
+        self._loaded: bool = False
+        self.viewer.object_loaded.connect(self._object_loaded)
+
+    def _object_loaded(self):
+        self._loaded = True
+
+    def render(self, obj_id) -> str | None:
+        """Render an object to `get_screenshot_path(output_dir, obj_id)`.
+        @param obj_id: the ID of the object
+        @return: an error message, or None if the object has been rendered
+        """
+        try:
+            j = self.review.get_id_loc(obj_id)
+        except KeyError:
+            return "object not found in the catalogue"
+        cat_entry = self.cat.get_cat_entry(self.review.get_id(j, full=True))
+
+        self._loaded = False
+        self.viewer.load_object(j, self.review, cat_entry)
+
+        t_start = time.perf_counter()
+        while not self._loaded:
+            if time.perf_counter() - t_start > self.options.timeout:
+                self.viewer.abort_loading()
+                return f"loading time exceeded {self.options.timeout} s"
+            self.app.processEvents(QtCore.QEventLoop.AllEvents, 50)
+        self.app.processEvents()  # apply the pending updates of the widgets
+
+        # write to a temporary file first, so that an interrupted export does not leave incomplete images behind
+        path = get_screenshot_path(self.options.output_dir, obj_id)
+        tmp_path = path.with_name(path.stem + '.tmp.png')
+        if not self.viewer.grab().save(str(tmp_path), 'PNG'):
+            return f"failed to write {tmp_path}"
+        os.replace(tmp_path, path)
+
+        return None
+
+
+_renderer: ScreenshotRenderer | None = None  # the renderer of a worker process
+
+
+def _init_worker(setup: ViewerSetup, options: ScreenshotOptions):
+    global _renderer
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=options.log_level)
+
+    _renderer = ScreenshotRenderer(setup, options)
+
+
+def _render_chunk(ids: list) -> list[tuple[object, str | None]]:
+    return [(obj_id, _renderer.render(obj_id)) for obj_id in ids]
+
+
+def export_screenshots(ids: list, setup: ViewerSetup, options: ScreenshotOptions, n_jobs: int | None = None,
+                       overwrite: bool = False) -> int:
+    """Render objects to images in parallel, each worker process running its own (offscreen) QApplication. Images
+    that already exist are skipped unless `overwrite` is True, so an interrupted export can be resumed by running it
+    again.
+    @param ids: the IDs of the objects to render
+    @param setup: the configuration of the data viewer
+    @param options: the rendering options
+    @param n_jobs: the number of worker processes (by default, the number of CPUs)
+    @param overwrite: render objects even if their images exist
+    @return: the number of objects that could not be rendered
+    """
+    pathlib.Path(options.output_dir).mkdir(parents=True, exist_ok=True)
+
+    todo = [obj_id for obj_id in ids if overwrite or not get_screenshot_path(options.output_dir, obj_id).exists()]
+    logger.info(f"Exporting screenshots (objects: {len(ids)}, already rendered: {len(ids) - len(todo)}, "
+                f"output directory: {options.output_dir})")
+    if not todo:
+        return 0
+
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(todo)))
+
+    # small chunks balance the load between the workers, while amortizing the cost of inter-process communication
+    chunk_size = max(1, min(25, math.ceil(len(todo) / (4 * n_jobs))))
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+
+    n_done, n_failed = 0, 0
+    t_start = time.perf_counter()
+
+    # Qt does not support forking a process, so the workers are spawned
+    pool = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker, initargs=(setup, options))
+    try:
+        futures = [pool.submit(_render_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for obj_id, error in future.result():
+                n_done += 1
+                if error is not None:
+                    n_failed += 1
+                    logger.error(f"Failed to render the object (ID: {obj_id}): {error}")
+            logger.info(f"Screenshots exported: {n_done}/{len(todo)} "
+                        f"({n_done / (time.perf_counter() - t_start):.2f} objects/s)")
+    except BrokenProcessPool:
+        logger.error("A worker process terminated abruptly (see the messages above)")
+        return len(todo) - n_done + n_failed
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return n_failed
@@ -0,0 +1,62 @@
+import logging
+import os
+import pathlib
+
+
+__all__ = [
+    "touch",
+    "prune_cache"
+]
+
+logger = logging.getLogger(__name__)
+
+
+def touch(path: pathlib.Path):
+    """Mark a cached file as used. The modification time is updated rather than relying on the access time, which
+    most file systems do not update on every read.
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_cache(directory: pathlib.Path, pattern: str, max_nbytes: int, keep: pathlib.Path | None = None) -> int:
+    """Delete the least recently used files (see `touch`) matching `pattern` in a cache directory, until their total
+    size does not exceed `max_nbytes`.
+    @param directory: the cache directory
+    @param pattern: the glob pattern of the cached files
+    @param max_nbytes: the maximum size of the cache
+    @param keep: a file that is never deleted (e.g. the one that has just been added)
+    @return: the total size of the remaining files
+    """
+    files = []
+    for path in directory.glob(pattern):
+        if path == keep:
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue  # deleted by another thread or process
+        files.append((stat.st_mtime_ns, stat.st_size, path))
+
+    nbytes = sum(size for _, size, _ in files)
+    if keep is not None:
+        try:
+            nbytes += keep.stat().st_size
+        except OSError:
+            pass
+    if nbytes <= max_nbytes:
+        return nbytes
+
+    for _, size, path in sorted(files, key=lambda f: f[0]):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to remove the cached file: {e} (file: {path.name})")
+            continue
+        nbytes -= size
+        if nbytes <= max_nbytes:
+            break
+
+    return nbytes
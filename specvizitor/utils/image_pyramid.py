@@ -0,0 +1,101 @@
+import numpy as np
+
+import logging
+import math
+
+
+__all__ = [
+    "block_mean",
+    "ImagePyramid"
+]
+
+logger = logging.getLogger(__name__)
+
+
+def block_mean(data: np.ndarray, factor: int = 2) -> np.ndarray:
+    """Downsample an image by averaging blocks of `factor` x `factor` pixels, ignoring NaNs. Blocks at the image edges
+    are averaged over the available pixels, and blocks with no finite pixels are set to NaN.
+    @param data: the input image (2D, or 3D with colour channels along the last axis)
+    @param factor: the block size
+    @return: the downsampled image of shape ceil(ny / factor) x ceil(nx / factor)
+    """
+
+    ny, nx = data.shape[:2]
+    ny_out, nx_out = math.ceil(ny / factor), math.ceil(nx / factor)
+
+    if np.issubdtype(data.dtype, np.floating):
+        dtype = np.dtype(data.dtype.type)  # native byte order (FITS data is big-endian)
+    else:
+        dtype = np.float32 if data.dtype.itemsize <= 2 else np.float64
+
+    padded = np.full((ny_out * factor, nx_out * factor) + data.shape[2:], np.nan, dtype=dtype)
+    padded[:ny, :nx] = data
+
+    blocks = padded.reshape((ny_out, factor, nx_out, factor) + data.shape[2:])
+    finite = np.isfinite(blocks)
+    counts = finite.sum(axis=(1, 3))
+    sums = np.where(finite, blocks, 0).sum(axis=(1, 3), dtype=dtype)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = sums / counts
+
+    if not np.issubdtype(data.dtype, np.floating):
+        result = np.round(result)
+        if np.issubdtype(data.dtype, np.integer):
+            info = np.iinfo(data.dtype)
+            result = np.clip(np.nan_to_num(result), info.min, info.max)
+        result = result.astype(data.dtype)
+
+    return result
+
+
+class ImagePyramid:
+    """A sequence of images downsampled by successive factors of two, from the original image (level 0) down to the
+    level whose largest side does not exceed `min_size` pixels. Levels are computed on first access.
+    """
+
+    def __init__(self, data: np.ndarray, min_size: int = 256, max_levels: int | None = None):
+        """
+        @param data: the original image
+        @param min_size: the image is not downsampled any further once its largest side is below this size
+        @param max_levels: the maximum number of levels, including the original image. If None, the number of levels
+        is only limited by `min_size`
+        """
+        self._levels: list[np.ndarray] = [data]
+
+        n_levels = 1
+        size = max(data.shape[:2])
+        while size > min_size and (max_levels is None or n_levels < max_levels):
+            size = math.ceil(size / 2)
+            n_levels += 1
+        self.n_levels = n_levels
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._levels[0]
+
+    @property
+    def levels(self) -> list[np.ndarray]:
+        """The levels that have been computed so far."""
+        return self._levels
+
+    def level(self, k: int) -> np.ndarray:
+        k = min(max(k, 0), self.n_levels - 1)
+        while len(self._levels) <= k:
+            self._levels.append(block_mean(self._levels[-1]))
+            logger.debug(f"Image pyramid level computed (level: {len(self._levels) - 1}, "
+                         f"shape: {self._levels[-1].shape[:2]})")
+        return self._levels[k]
+
+    def build(self) -> "ImagePyramid":
+        """Compute all levels."""
+        self.level(self.n_levels - 1)
+        return self
+
+    def level_for_scale(self, scale: float) -> int:
+        """Return the coarsest level that still has at least one pixel per screen pixel.
+        @param scale: the number of original image pixels per screen pixel
+        """
+        if not scale or not np.isfinite(scale) or scale < 2:
+            return 0
+        return min(int(math.floor(math.log2(scale))), self.n_levels - 1)
@@ -0,0 +1,118 @@
+from astropy.visualization import ZScaleInterval
+import numpy as np
+
+from dataclasses import dataclass
+import logging
+
+
+__all__ = [
+    "ImageStats",
+    "sample_image",
+    "compute_image_stats",
+    "sample_histogram",
+    "histogram_from_sample"
+]
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_METHODS: tuple[str, ...] = ('random', 'stride')
+
+
+@dataclass(frozen=True)
+class ImageStats:
+    min: float
+    max: float
+    n_finite: int
+    n_nonzero: int
+    n_sampled: int
+    zscale: tuple[float, float] | None = None
+
+    @property
+    def has_defined_levels(self) -> bool:
+        return self.n_finite > 0 and self.n_nonzero > 0
+
+
+def sample_image(data: np.ndarray, sample_size: int | None = 100_000, method: str = 'random',
+                 seed: int = 0) -> np.ndarray:
+    """Draw a bounded sample of pixels from an image. Only the sample is copied, so the cost does not depend on the
+    size of the image.
+    @param data: the image (2D, or 3D with colour channels along the last axis)
+    @param sample_size: the maximum number of pixels in the sample. If None, the whole image is used
+    @param method: `random` (uniform sampling with replacement) or `stride` (a regular grid of pixels)
+    @param seed: the seed of the random number generator, so that the same image always yields the same sample
+    @return: a flat array of sampled values
+    """
+
+    n_pixels = data.shape[0] * data.shape[1] if data.ndim > 1 else data.size
+    if sample_size is None or n_pixels <= sample_size:
+        return data.ravel()
+
+    if method not in SAMPLING_METHODS:
+        logger.error(f"Unknown sampling method: `{method}`. Supported methods: {', '.join(SAMPLING_METHODS)}")
+        method = 'random'
+
+    if method == 'stride' or data.ndim == 1:
+        stride = int(np.ceil(np.sqrt(n_pixels / sample_size))) if data.ndim > 1 else int(np.ceil(n_pixels / sample_size))
+        return data[(slice(None, None, stride),) * min(data.ndim, 2)].ravel()
+
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, data.shape[0], sample_size)
+    cols = rng.integers(0, data.shape[1], sample_size)
+
+    return data[rows, cols].ravel()
+
+
+def compute_image_stats(data: np.ndarray, sample_size: int | None = 100_000, method: str = 'random', seed: int = 0,
+                        zscale: bool = False) -> ImageStats:
+    """Compute the minimum, maximum and the number of finite and non-zero pixels of an image (and optionally its zscale
+    limits) in a single pass over a bounded sample of pixels.
+    @param data: the input image
+    @param sample_size: see `sample_image`
+    @param method: see `sample_image`
+    @param seed: see `sample_image`
+    @param zscale: if True, calculate the zscale limits of the sample
+    @return: the image statistics
+    """
+
+    sample = sample_image(data, sample_size=sample_size, method=method, seed=seed)
+    values = sample[np.isfinite(sample)]
+
+    if values.size == 0:
+        return ImageStats(min=np.nan, max=np.nan, n_finite=0, n_nonzero=0, n_sampled=sample.size)
+
+    zscale_limits = None
+    if zscale:
+        zscale_limits = tuple(float(v) for v in ZScaleInterval().get_limits(values))
+
+    return ImageStats(min=float(values.min()), max=float(values.max()), n_finite=values.size,
+                      n_nonzero=int(np.count_nonzero(values)), n_sampled=sample.size, zscale=zscale_limits)
+
+
+def sample_histogram(data: np.ndarray, sample_size: int | None = 40_000, seed: int = 0) -> np.ndarray | None:
+    """Draw a sample of pixels from which the histogram of an image can be computed for any range and bins (see
+    `histogram_from_sample`).
+    @param data: the input image
+    @param sample_size: see `sample_image`
+    @param seed: see `sample_image`
+    @return: the sorted finite values of the sample, or None for RGB(A) images
+    """
+    if data.ndim > 2:
+        return None
+
+    sample = sample_image(data, sample_size=sample_size, method='random', seed=seed)
+    return np.sort(sample[np.isfinite(sample)].astype(float, copy=False))
+
+
+def histogram_from_sample(sample: np.ndarray, bins) -> tuple[np.ndarray, np.ndarray]:
+    """Compute a histogram from a sorted sample in O(n_bins log n_sample) time, as `np.histogram(sample, bins)`.
+    @param sample: the sorted sample (see `sample_histogram`)
+    @param bins: the bin edges
+    @return: the left bin edges and the counts
+    """
+    bins = np.asarray(bins, dtype=float)
+
+    # as in `np.histogram`, all bins but the last (which includes its right edge) are half-open
+    indices = np.searchsorted(sample, bins, side='left')
+    indices[-1] = np.searchsorted(sample, bins[-1], side='right')
+
+    return bins[:-1], np.diff(indices)
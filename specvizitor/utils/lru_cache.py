@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+import threading
+import time
+from typing import Any, Callable
+
+
+__all__ = [
+    "LRUCache"
+]
+
+
+class LRUCache:
+    """A bounded mapping that discards the least recently used entries once `maxsize` is exceeded, or once the entries
+    take more than `max_nbytes` bytes (the entry used last is kept regardless of its size). The cache can be used from
+    several threads.
+    """
+
+    def __init__(self, maxsize: int = 128, max_nbytes: int | None = None, sizeof: Callable[[Any], int] | None = None):
+        """
+        @param maxsize: the maximum number of entries
+        @param max_nbytes: the maximum size of the entries in bytes (None: no limit)
+        @param sizeof: returns the size of an entry in bytes (required if `max_nbytes` is set)
+        """
+        if max_nbytes is not None and sizeof is None:
+            raise ValueError("`sizeof` is required to limit the size of the cache")
+
+        self.maxsize = maxsize
+        self.max_nbytes = max_nbytes
+        self._sizeof = sizeof
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._nbytes: int = 0
+        self.last_used: float = 0  # `time.monotonic()` at the last hit or insertion
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                return default
+
+            self._data.move_to_end(key)
+        self.last_used = time.monotonic()
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        size = self._sizeof(value) if self.max_nbytes is not None else 0
+        with self._lock:
+            self._nbytes += size - self._sizes.pop(key, 0)
+            self._sizes[key] = size
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize or \
+                    (self.max_nbytes is not None and self._nbytes > self.max_nbytes and len(self._data) > 1):
+                old_key, _ = self._data.popitem(last=False)
+                self._nbytes -= self._sizes.pop(old_key)
+        self.last_used = time.monotonic()
+
+    def values(self) -> list[Any]:
+        with self._lock:
+            return list(self._data.values())
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            self._nbytes -= self._sizes.pop(key, 0)
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._nbytes = 0
@@ -0,0 +1,202 @@
+from astropy.table import Table
+import numpy as np
+
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import singledispatch
+import logging
+import mmap
+import threading
+from typing import Any, Callable, Iterable
+
+from .image_pyramid import ImagePyramid
+from .lru_cache import LRUCache
+
+
+__all__ = [
+    "MemoryItem",
+    "MemoryAccountant",
+    "get_nbytes",
+    "accountant"
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MemoryItem:
+    """The memory held by a widget, a loader or a cache."""
+    kind: str                   # 'widget', 'loader' or 'cache'
+    name: str
+    nbytes: int
+    last_used: float = 0        # `time.monotonic()` at the last use, for the eviction order
+    release: Callable[[], None] | None = field(default=None, compare=False)  # evicts the cache/closes the handle
+
+
+@singledispatch
+def _referents(obj) -> Iterable[Any]:
+    """Return the objects holding memory referred to by `obj`."""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return (getattr(obj, f.name) for f in fields(obj))
+    return ()
+
+
+@_referents.register(dict)
+def _(obj):
+    return list(obj.values())
+
+
+@_referents.register(list)
+@_referents.register(tuple)
+@_referents.register(set)
+@_referents.register(frozenset)
+def _(obj):
+    return list(obj)
+
+
+@_referents.register
+def _(obj: Table):
+    return list(obj.columns.values())
+
+
+@_referents.register
+def _(obj: LRUCache):
+    return obj.values()
+
+
+@_referents.register
+def _(obj: ImagePyramid):
+    return list(obj.levels)
+
+
+def _get_array_nbytes(arr: np.ndarray, seen: set[int]) -> int:
+    # views are counted as the memory of the array they were taken from, which is counted once
+    base = arr
+    while isinstance(base, np.ndarray) and base.base is not None:
+        if isinstance(base, np.memmap):
+            return 0
+        base = base.base
+    if isinstance(base, (np.memmap, mmap.mmap)):
+        return 0  # memory-mapped files are paged in and out by the OS
+
+    if id(base) in seen:
+        return 0
+    seen.add(id(base))
+
+    return base.nbytes if isinstance(base, np.ndarray) else arr.nbytes
+
+
+def get_nbytes(obj, seen: set[int] | None = None) -> int:
+    """Return the number of bytes held by numpy arrays referred to by an object (arrays, tables, containers,
+    dataclasses, caches and other objects reporting their size with `nbytes`). Memory-mapped arrays are not counted.
+    @param obj: the object
+    @param seen: the IDs of objects that have already been counted (updated in place), so that memory shared by
+    several objects is counted once
+    """
+    if seen is None:
+        seen = set()
+
+    if obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+        return 0
+    if isinstance(obj, np.ndarray):
+        return _get_array_nbytes(obj, seen)
+
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if hasattr(obj, 'sizeInBytes'):  # QImage
+        return obj.sizeInBytes()
+    if isinstance(getattr(obj, 'nbytes', None), int):
+        return obj.nbytes
+
+    return sum(get_nbytes(o, seen) for o in _referents(obj))
+
+
+class MemoryAccountant:
+    """Accounts for the memory held by widgets, loaders and caches, and enforces a memory budget. The memory is
+    reported by providers, which are called in the order they were added, sharing the set of objects already counted
+    (memory shared by several items is attributed to the item reported first).
+
+    When the budget is exceeded, items that can be released (caches and idle file handles) are released in the
+    least recently used order until the memory in use fits the budget. Nothing is released while the accountant is
+    busy (see `is_busy`).
+    """
+
+    def __init__(self, budget: int | None = None):
+        """
+        @param budget: the memory budget in bytes (None: no budget)
+        """
+        self.budget = budget
+        self._providers: list[Callable[[set[int]], list[MemoryItem]]] = []
+        # tells whether data is being loaded, in which case the files being read would be considered idle
+        self.is_busy: Callable[[], bool] | None = None
+        self._over_budget: bool = False
+        self._lock = threading.Lock()
+
+    def add_provider(self, provider: Callable[[set[int]], list[MemoryItem]]):
+        """Add a function reporting memory items. The function takes the set of objects already counted (see
+        `get_nbytes`).
+        """
+        self._providers.append(provider)
+
+    def remove_provider(self, provider: Callable[[set[int]], list[MemoryItem]]):
+        if provider in self._providers:
+            self._providers.remove(provider)
+
+    def usage(self) -> list[MemoryItem]:
+        seen = set()
+        items = []
+        for provider in list(self._providers):
+            try:
+                items.extend(provider(seen))
+            except Exception as e:
+                logger.error(f"Failed to account for memory: {e}")
+        return items
+
+    @property
+    def busy(self) -> bool:
+        return self.is_busy is not None and self.is_busy()
+
+    @property
+    def total(self) -> int:
+        return sum(item.nbytes for item in self.usage())
+
+    def enforce(self) -> list[MemoryItem]:
+        """Release caches and idle handles in the least recently used order until the memory in use fits the budget.
+        @return: the released items
+        """
+        if self.budget is None or self.busy:
+            return []
+
+        with self._lock:
+            items = self.usage()
+            total = sum(item.nbytes for item in items)
+            if total <= self.budget:
+                self._over_budget = False
+                return []
+
+            released = []
+            for item in sorted((item for item in items if item.release is not None and item.nbytes > 0),
+                               key=lambda item: item.last_used):
+                if total <= self.budget:
+                    break
+                try:
+                    item.release()
+                except Exception as e:
+                    logger.error(f"Failed to release memory: {e} ({item.kind}: {item.name})")
+                    continue
+                total -= item.nbytes
+                released.append(item)
+
+        if released:
+            logger.info(f"Memory budget exceeded: {len(released)} item(s) released "
+                        f"({sum(item.nbytes for item in released) / 2 ** 20:.1f} MB)")
+        if total > self.budget and not self._over_budget:
+            logger.warning(f"Memory in use ({total / 2 ** 20:.1f} MB) exceeds the budget "
+                           f"({self.budget / 2 ** 20:.1f} MB) after releasing all caches and idle handles")
+        self._over_budget = total > self.budget  # warn once until the memory fits the budget again
+
+        return released
+
+
+accountant = MemoryAccountant()  # the memory accountant of the application
@@ -0,0 +1,34 @@
+import numpy as np
+
+import logging
+
+
+__all__ = [
+    "DISPLAY_PRECISIONS",
+    "to_display_precision"
+]
+
+logger = logging.getLogger(__name__)
+
+DISPLAY_PRECISIONS: tuple[str, ...] = ('native', 'float32')
+
+
+def to_display_precision(data: np.ndarray, precision: str = 'native') -> np.ndarray:
+    """Convert an image to the precision used for display. With `float32`, floating-point data is converted to
+    single precision (in native byte order), halving the memory used by 64-bit images and by everything derived from
+    them; integer data (e.g. 8-bit RGB images) is kept as is.
+    @param data: the image
+    @param precision: `native` (keep the data type of the file) or `float32`
+    @return: the converted image, or the input image if no conversion is needed
+    """
+    if precision not in DISPLAY_PRECISIONS:
+        logger.error(f"Unknown display precision: `{precision}`. Supported values: {', '.join(DISPLAY_PRECISIONS)}")
+        return data
+
+    if precision == 'native' or not np.issubdtype(data.dtype, np.floating):
+        return data
+
+    if data.dtype == np.dtype(np.float32):  # already single precision in native byte order
+        return data
+
+    return data.astype(np.float32)
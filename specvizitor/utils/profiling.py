@@ -0,0 +1,174 @@
+import cProfile
+import pstats
+
+from contextlib import contextmanager, nullcontext
+import logging
+import pathlib
+import re
+import sys
+import threading
+import time
+
+from ..config import CACHE_DIR
+
+
+__all__ = [
+    "ProfileSession",
+    "LoadProfiler",
+    "profiler"
+]
+
+logger = logging.getLogger(__name__)
+
+# since Python 3.12, cProfile uses `sys.monitoring`, which is process-wide: a profile enabled in one thread sees all
+# threads, and only one profile can be enabled at a time
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class ProfileSession:
+    """The profiles of the threads taking part in loading an object."""
+
+    def __init__(self):
+        self._profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get_stats(self) -> pstats.Stats | None:
+        """Merge the profiles of the threads."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+
+class LoadProfiler:
+    """Profiles object loads with cProfile, from `MainWindow.load_object` to the end of `MainWindow.finalize_loading`.
+    The GUI thread is profiled between `begin_load` and `end_load`. Before Python 3.12, cProfile only profiles the
+    thread it is enabled in, therefore loader threads are profiled separately with `profile_thread`; since Python 3.12,
+    the profile of the GUI thread covers all threads and `profile_thread` does nothing. The profiles of a load are
+    merged and written to a pstats file named after the object ID.
+
+    Loads that are aborted (e.g. when the user switches to another object before the object is loaded) are not
+    counted: their profiles are discarded and the next load is profiled instead.
+    """
+
+    def __init__(self, output_dir: str | pathlib.Path | None = None):
+        """
+        @param output_dir: the directory the profiles are written to (by default, `CACHE_DIR/profiles`)
+        """
+        self.output_dir = pathlib.Path(output_dir) if output_dir is not None else pathlib.Path(CACHE_DIR) / 'profiles'
+
+        self._remaining: int | None = 0  # the number of loads left to profile (None: until stopped)
+        self._session: ProfileSession | None = None
+        self._gui_profile: cProfile.Profile | None = None
+
+    @property
+    def active(self) -> bool:
+        """Whether the next loads are profiled."""
+        return self._remaining is None or self._remaining > 0
+
+    @property
+    def session(self) -> ProfileSession | None:
+        """The session of the current load (None if the load is not profiled)."""
+        return self._session
+
+    def request(self, n: int | None = 1):
+        """Profile the next loads.
+        @param n: the number of loads to profile (None: profile all loads until `stop` is called)
+        """
+        self._remaining = n
+
+    def stop(self):
+        """Stop profiling, discarding the profile of the current load."""
+        self._remaining = 0
+        self._discard()
+
+    def begin_load(self):
+        """Start profiling a load in the GUI thread (if requested)."""
+        self._discard()  # the previous load was aborted
+        if not self.active:
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # another profiler is active
+            logger.error(f"Failed to profile the load: {e}")
+            return
+
+        self._session = ProfileSession()
+        self._gui_profile = profile
+
+    def end_load(self, obj_id) -> pathlib.Path | None:
+        """Stop profiling a load and write the profile.
+        @param obj_id: the ID of the loaded object
+        @return: the path to the profile (None if the load was not profiled)
+        """
+        if self._session is None:
+            return None
+
+        self._gui_profile.disable()
+        self._session.add(self._gui_profile)
+        session = self._session
+        self._session, self._gui_profile = None, None
+
+        if self._remaining is not None:
+            self._remaining -= 1
+
+        filename = self.output_dir / f"load_{self._format_id(obj_id)}_{time.strftime('%Y%m%d-%H%M%S')}.prof"
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            session.get_stats().dump_stats(filename)
+        except OSError as e:
+            logger.error(f"Failed to write the profile: {e}")
+            return None
+
+        logger.info(f"Profile written to {filename}")
+        return filename
+
+    def profile_thread(self, session: ProfileSession | None):
+        """Return a context manager profiling the current thread as part of a load (a no-op if `session` is None).
+        @param session: the session of the load, taken from `session` in the GUI thread when the load is started
+        """
+        if session is None or PROFILES_ALL_THREADS:
+            return nullcontext()
+        return self._profile_thread(session)
+
+    @staticmethod
+    @contextmanager
+    def _profile_thread(session: ProfileSession):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # another profiler is active; the thread is not profiled, but the load goes on
+            logger.warning(f"Failed to profile the loader thread: {e}")
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            profile.disable()
+            session.add(profile)
+
+    def _discard(self):
+        if self._gui_profile is not None:
+            self._gui_profile.disable()
+        self._session, self._gui_profile = None, None
+
+    @staticmethod
+    def _format_id(obj_id) -> str:
+        if isinstance(obj_id, tuple):
+            obj_id = '_'.join(str(i) for i in obj_id)
+        return re.sub(r'[^\w.-]', '_', str(obj_id))
+
+
+profiler = LoadProfiler()  # the profiler of the application
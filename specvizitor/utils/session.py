@@ -0,0 +1,128 @@
+from contextlib import nullcontext
+import json
+import logging
+import pathlib
+import time
+from typing import Any, TextIO
+
+from ..config import CACHE_DIR
+
+
+__all__ = [
+    "SessionRecorder",
+    "read_session",
+    "recorder"
+]
+
+logger = logging.getLogger(__name__)
+
+SESSION_FORMAT_VERSION = 1
+
+_NULL_EVENT = nullcontext()
+
+
+class _EventContext:
+    __slots__ = ('_recorder', '_event')
+
+    def __init__(self, recorder: 'SessionRecorder', event: dict | None):
+        self._recorder = recorder
+        self._event = event
+
+    def __enter__(self):
+        if self._event is not None and self._recorder._depth == 0:
+            self._recorder._write(self._event)
+        self._recorder._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._recorder._depth -= 1
+        return False
+
+
+class SessionRecorder:
+    """Records the interaction of the user with the GUI (navigation between objects, changes of the redshift, slider
+    and color bar levels, view resets) to a file in the JSON Lines format, so that the session can be replayed later.
+    The first line of the file describes the session (e.g. the configuration of the data viewer); each of the next
+    lines describes an event, with the time since the start of the recording (`t`, in seconds).
+
+    Events are recorded where user input is handled, with `event`. Changes made while handling an event (e.g. by
+    linked widgets) or by the application itself (with `suppress`, or asynchronously, e.g. once a smoothed image is
+    ready, in which case widgets only record the changes made with the mouse or the keyboard) are not recorded, as
+    they are reproduced by replaying the events. Events are recorded from the GUI thread only.
+    """
+
+    def __init__(self):
+        self._file: TextIO | None = None
+        self._t_start: float = 0
+        self._depth: int = 0  # the number of events being handled
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def default_filename(self) -> pathlib.Path:
+        return pathlib.Path(CACHE_DIR) / 'sessions' / f"session_{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+
+    def start(self, filename: str | pathlib.Path, header: dict[str, Any] | None = None):
+        """Start recording a session.
+        @param filename: the output file
+        @param header: the description of the session
+        """
+        self.stop()
+
+        header = json.dumps({'version': SESSION_FORMAT_VERSION, 'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                             **(header or {})})
+
+        filename = pathlib.Path(filename)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(filename, 'w')
+        self._file.write(header + '\n')
+        self._t_start = time.perf_counter()
+        self._depth = 0
+        logger.info(f"Session recording started (filename: {filename})")
+
+    def stop(self):
+        if self._file is None:
+            return
+        self._file.close()
+        logger.info(f"Session recording stopped (filename: {self._file.name})")
+        self._file = None
+
+    def event(self, event_type: str, **fields):
+        """Return a context manager recording an event when entered, unless another event is being handled.
+        @param event_type: the type of the event
+        @param fields: the parameters of the event (JSON-serializable)
+        """
+        if self._file is None:
+            return _NULL_EVENT
+        return _EventContext(self, {'type': event_type, **fields})
+
+    def suppress(self):
+        """Return a context manager in which events are not recorded (e.g. when the application resets the view)."""
+        if self._file is None:
+            return _NULL_EVENT
+        return _EventContext(self, None)
+
+    def _write(self, event: dict):
+        self._file.write(json.dumps({'t': round(time.perf_counter() - self._t_start, 4), **event}) + '\n')
+        self._file.flush()
+
+
+def read_session(filename: str | pathlib.Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Read a recorded session.
+    @return: the description of the session and the events
+    """
+    with open(filename) as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines:
+        raise ValueError(f"Empty session file: {filename}")
+
+    header, events = lines[0], lines[1:]
+    if header.get('version') != SESSION_FORMAT_VERSION:
+        raise ValueError(f"Unsupported session format version: {header.get('version')}")
+
+    return header, events
+
+
+recorder = SessionRecorder()  # the session recorder of the application
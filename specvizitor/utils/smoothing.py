@@ -0,0 +1,117 @@
+import numpy as np
+from scipy import fft
+
+import logging
+import threading
+
+
+__all__ = [
+    "FFTGaussianSmoother"
+]
+
+logger = logging.getLogger(__name__)
+
+
+class FFTGaussianSmoother:
+    """Gaussian smoothing of an image with NaN interpolation, equivalent to
+    `convolve_fft(data, Gaussian2DKernel(sigma), preserve_nan=True)`. The forward FFTs of the image (with NaNs set to
+    zero) and of its weights (the NaN mask) are computed once and reused, so that smoothing with a new sigma only
+    requires a multiplication by the Gaussian transfer function and two inverse FFTs. Single-precision images are
+    smoothed in single precision, which halves the memory used by the cached transforms.
+    """
+
+    AXES = (0, 1)  # the image axes (the last axis of RGB(A) images holds colour channels)
+
+    def __init__(self, data: np.ndarray, max_sigma: float = 0):
+        """
+        @param data: the input image
+        @param max_sigma: the largest sigma expected, used to pad the image once for all smaller kernels
+        """
+        self.data = data
+        self.max_sigma = max_sigma
+
+        self._nan_mask = None
+        self._pad: int | None = None
+        self._fft_shape: tuple[int, int] | None = None
+        self._data_fft: np.ndarray | None = None
+        self._weights_fft: np.ndarray | None = None
+
+        self._lock = threading.Lock()
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The floating-point type used for smoothing."""
+        return np.dtype(np.float32 if self.data.dtype == np.dtype(np.float32) else np.float64)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the cached transforms and the NaN mask (not including the input image)."""
+        return sum(arr.nbytes for arr in (self._nan_mask, self._data_fft, self._weights_fft) if arr is not None)
+
+    def _compute_fft(self, pad: int):
+        data = np.asarray(self.data, dtype=self.dtype)
+        if self._nan_mask is None:
+            self._nan_mask = np.isnan(data)
+
+        ny, nx = data.shape[:2]
+        fft_shape = (fft.next_fast_len(ny + 2 * pad, real=True), fft.next_fast_len(nx + 2 * pad, real=True))
+
+        # as in `convolve_fft(..., boundary='fill')`, the padding is filled with zeros that count as valid pixels
+        padded_data = np.zeros(fft_shape + data.shape[2:], dtype=self.dtype)
+        padded_data[pad:pad + ny, pad:pad + nx] = np.where(self._nan_mask, 0, data)
+
+        padded_weights = np.ones(fft_shape + data.shape[2:], dtype=self.dtype)
+        padded_weights[pad:pad + ny, pad:pad + nx] = ~self._nan_mask
+
+        self._data_fft = fft.rfft2(padded_data, axes=self.AXES)
+        self._weights_fft = fft.rfft2(padded_weights, axes=self.AXES)
+        self._pad, self._fft_shape = pad, fft_shape
+
+        logger.debug(f"Image FFT computed (shape: {fft_shape})")
+
+    @staticmethod
+    def _kernel_radius(sigma: float) -> int:
+        # same size as `Gaussian2DKernel(sigma)`: 8 sigma rounded up to the nearest odd integer
+        size = int(np.ceil(8 * sigma))
+        return size // 2
+
+    def _transfer_function(self, sigma: float) -> np.ndarray:
+        # the kernel is separable, so its Fourier transform is an outer product of the transforms of 1D kernels
+        x = np.arange(1, self._kernel_radius(sigma) + 1)
+        k = np.exp(-x ** 2 / (2 * sigma ** 2))
+        k0 = 1 / (1 + 2 * k.sum())  # normalize the kernel
+        k *= k0
+
+        def dft(freq):
+            return k0 + 2 * np.cos(2 * np.pi * np.outer(freq, x)) @ k
+
+        g = np.outer(dft(fft.fftfreq(self._fft_shape[0])), dft(fft.rfftfreq(self._fft_shape[1])))
+        return g.reshape(g.shape + (1,) * (self._data_fft.ndim - 2)).astype(self.dtype)
+
+    def smooth(self, sigma: float) -> np.ndarray:
+        if sigma <= 0:
+            return self.data
+
+        with self._lock:
+            pad = self._kernel_radius(sigma)
+            if self._pad is None or self._pad < pad:
+                self._compute_fft(max(pad, self._kernel_radius(self.max_sigma)))
+
+            g = self._transfer_function(sigma)
+            smoothed = fft.irfft2(self._data_fft * g, s=self._fft_shape, axes=self.AXES)
+            weights = fft.irfft2(self._weights_fft * g, s=self._fft_shape, axes=self.AXES)
+
+            ny, nx = self.data.shape[:2]
+            crop = (slice(self._pad, self._pad + ny), slice(self._pad, self._pad + nx))
+            smoothed, weights = smoothed[crop], weights[crop]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                smoothed /= weights
+            smoothed[weights < 10 * np.finfo(weights.dtype).eps] = 0
+            smoothed[self._nan_mask] = np.nan  # preserve NaNs
+
+        if np.issubdtype(self.data.dtype, np.integer):
+            info = np.iinfo(self.data.dtype)
+            smoothed = np.clip(np.round(smoothed), info.min, info.max).astype(self.data.dtype)
+
+        return smoothed
@@ -0,0 +1,103 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+import itertools
+
+
+__all__ = [
+    "SkyIndex",
+    "PixelIndex"
+]
+
+
+class SkyIndex:
+    """A KD-tree of sky positions (stored as unit vectors), used to find catalogue sources within a given angular
+    distance in O(log n + k) time.
+    """
+
+    _uids = itertools.count()
+
+    def __init__(self, ra: np.ndarray, dec: np.ndarray):
+        """
+        @param ra: right ascension of the sources, in degrees
+        @param dec: declination of the sources, in degrees
+        """
+        self.uid = next(self._uids)  # identifies the index in caches of derived data
+        self.ra = np.asarray(ra, dtype=float)
+        self.dec = np.asarray(dec, dtype=float)
+
+        self._tree = cKDTree(self._to_xyz(self.ra, self.dec))
+
+    def __len__(self):
+        return self._tree.n
+
+    @property
+    def nbytes(self) -> int:
+        return self.ra.nbytes + self.dec.nbytes + self._tree.data.nbytes + self._tree.indices.nbytes
+
+    @staticmethod
+    def _to_xyz(ra, dec) -> np.ndarray:
+        ra, dec = np.radians(np.asarray(ra, dtype=float)), np.radians(np.asarray(dec, dtype=float))
+        return np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=-1)
+
+    def query_cone(self, ra: float, dec: float, radius: float) -> np.ndarray:
+        """Find the sources within `radius` degrees from (`ra`, `dec`).
+        @return: the indices of the sources
+        """
+        chord = 2 * np.sin(np.radians(min(radius, 180)) / 2)
+        return np.array(self._tree.query_ball_point(self._to_xyz(ra, dec), r=chord), dtype=int)
+
+
+class PixelIndex:
+    """A KD-tree of source positions in pixel coordinates, used for hit-testing and for finding the sources within a
+    rectangle.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, ids: np.ndarray):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.ids = np.asarray(ids)
+
+        self._tree = cKDTree(np.stack([self.x, self.y], axis=-1)) if len(self.x) else None
+
+        # the distance to the nearest neighbour of each source, used to decide whether its label is legible
+        self.spacing = np.full(len(self.x), np.inf)
+        if len(self.x) > 1:
+            self.spacing = self._tree.query(np.stack([self.x, self.y], axis=-1), k=2)[0][:, 1]
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = self.x.nbytes + self.y.nbytes + self.ids.nbytes + self.spacing.nbytes
+        if self._tree is not None:
+            nbytes += self._tree.data.nbytes + self._tree.indices.nbytes
+        return nbytes
+
+    def nearest(self, x: float, y: float, max_distance: float) -> int | None:
+        """Find the source closest to (`x`, `y`) within `max_distance` pixels.
+        @return: the index of the source, or None if no source is found
+        """
+        if self._tree is None:
+            return None
+
+        distance, i = self._tree.query((x, y), distance_upper_bound=max_distance)
+        return None if np.isinf(distance) else int(i)
+
+    def query_rect(self, x1: float, y1: float, x2: float, y2: float) -> np.ndarray:
+        """Find the sources within a rectangle.
+        @return: the indices of the sources
+        """
+        if self._tree is None:
+            return np.array([], dtype=int)
+
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+
+        # query the enclosing square (in the Chebyshev metric) and discard the sources outside the rectangle
+        r = max(x2 - x1, y2 - y1) / 2
+        indices = np.array(self._tree.query_ball_point(((x1 + x2) / 2, (y1 + y2) / 2), r=r, p=np.inf), dtype=int)
+        mask = (self.x[indices] >= x1) & (self.x[indices] <= x2) & (self.y[indices] >= y1) & (self.y[indices] <= y2)
+
+        return indices[mask]
@@ -0,0 +1,31 @@
+import numpy as np
+
+from specvizitor.utils.image_pyramid import ImagePyramid, block_mean
+
+
+def test_block_mean():
+    data = np.arange(5 * 3, dtype=float).reshape(5, 3)
+    data[0, 0] = np.nan
+
+    result = block_mean(data)
+    assert result.shape == (3, 2)
+    assert result[0, 0] == np.mean([1, 3, 4])
+    assert result[2, 1] == data[4, 2]
+
+    assert np.isnan(block_mean(np.full((2, 2), np.nan))).all()
+    assert block_mean(np.full((4, 4), 7, dtype=np.uint8)).dtype == np.uint8
+
+
+def test_image_pyramid():
+    pyramid = ImagePyramid(np.ones((1000, 600)), min_size=256)
+    assert pyramid.n_levels == 3
+    assert len(pyramid.levels) == 1
+
+    assert pyramid.level(5).shape == (250, 150)
+    assert len(pyramid.levels) == 3
+
+    assert pyramid.level_for_scale(1) == 0
+    assert pyramid.level_for_scale(2.5) == 1
+    assert pyramid.level_for_scale(100) == 2
+
+    assert ImagePyramid(np.ones((1000, 600)), max_levels=1).n_levels == 1
@@ -0,0 +1,52 @@
+import numpy as np
+
+from specvizitor.utils.image_stats import compute_image_stats, sample_image, sample_histogram, histogram_from_sample
+
+
+def test_sample_image():
+    data = np.arange(1000 * 1000, dtype=float).reshape(1000, 1000)
+
+    assert sample_image(data, sample_size=None).size == data.size
+    assert sample_image(data, sample_size=10000, method='random').size == 10000
+    assert sample_image(data, sample_size=10000, method='stride').size <= 10000
+
+    sample1 = sample_image(data, sample_size=100, seed=1)
+    sample2 = sample_image(data, sample_size=100, seed=1)
+    assert np.array_equal(sample1, sample2)
+
+
+def test_compute_image_stats():
+    data = np.zeros((10, 10))
+    data[2, 3] = 5.
+    data[4, 5] = np.nan
+
+    stats = compute_image_stats(data)
+    assert (stats.min, stats.max) == (0., 5.)
+    assert stats.n_finite == 99
+    assert stats.n_nonzero == 1
+    assert stats.has_defined_levels
+
+    stats = compute_image_stats(np.full((10, 10), np.nan), zscale=True)
+    assert not stats.has_defined_levels
+    assert stats.zscale is None
+
+    data = np.random.default_rng(0).normal(size=(500, 500))
+    stats = compute_image_stats(data, sample_size=10000, zscale=True)
+    assert -5 < stats.zscale[0] < -2 and 2 < stats.zscale[1] < 5
+
+
+def test_histogram_from_sample():
+    data = np.random.default_rng(0).normal(size=(100, 100))
+    data[:5] = np.nan
+
+    sample = sample_histogram(data, sample_size=None)
+    assert sample.size == 9500
+    assert np.all(np.diff(sample) >= 0)
+
+    bins = np.linspace(-1, 2, 50)
+    edges, counts = histogram_from_sample(sample, bins)
+    expected_counts, expected_edges = np.histogram(sample, bins)
+    assert np.array_equal(edges, expected_edges[:-1])
+    assert np.array_equal(counts, expected_counts)
+
+    assert sample_histogram(np.zeros((10, 10, 3))) is None
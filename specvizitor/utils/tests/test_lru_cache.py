@@ -0,0 +1,23 @@
+import numpy as np
+
+from specvizitor.utils.lru_cache import LRUCache
+from specvizitor.utils.memory import get_nbytes
+
+
+def test_lru_cache_size_limit():
+    cache = LRUCache(maxsize=16, max_nbytes=2500, sizeof=get_nbytes)
+    for key in 'abc':
+        cache.put(key, np.zeros(1000, dtype=np.uint8))
+    assert 'a' not in cache and len(cache) == 2  # the least recently used entry is discarded
+
+    cache.get('b')
+    cache.put('d', np.zeros(1000, dtype=np.uint8))
+    assert 'c' not in cache and 'b' in cache
+
+    cache.put('e', np.zeros(5000, dtype=np.uint8))  # the entry used last is kept even if it exceeds the limit
+    assert list(cache.values())[0].size == 5000 and len(cache) == 1
+
+    cache.pop('e')
+    cache.put('f', np.zeros(2000, dtype=np.uint8))
+    cache.put('g', np.zeros(400, dtype=np.uint8))
+    assert len(cache) == 2
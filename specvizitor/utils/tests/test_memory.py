@@ -0,0 +1,47 @@
+from astropy.table import Table
+import numpy as np
+
+from specvizitor.utils.image_pyramid import ImagePyramid
+from specvizitor.utils.lru_cache import LRUCache
+from specvizitor.utils.memory import MemoryAccountant, MemoryItem, get_nbytes
+
+
+def test_get_nbytes(tmp_path):
+    data = np.zeros((100, 100))
+    assert get_nbytes(data) == 80000
+    assert get_nbytes([data, data[10:20]]) == 80000  # views are counted as the array they were taken from
+
+    t = Table({'x': np.zeros(10), 'y': np.zeros(10, dtype=np.int32)})
+    assert get_nbytes({'table': t, 'meta': 'text'}) == 120
+
+    pyramid = ImagePyramid(data, min_size=50).build()
+    cache = LRUCache()
+    cache.put(0, pyramid)
+    assert get_nbytes(cache) == 80000 + 20000
+
+    seen = set()
+    assert get_nbytes(data, seen) == 80000 and get_nbytes(pyramid, seen) == 20000  # shared memory is counted once
+
+    np.save(tmp_path / 'data.npy', data)
+    assert get_nbytes(np.load(tmp_path / 'data.npy', mmap_mode='r')[10:20]) == 0
+
+
+def test_enforce_budget():
+    caches = {name: LRUCache() for name in ('a', 'b', 'c')}
+    for name in ('b', 'a', 'c'):  # 'b' is the least recently used cache
+        caches[name].put(0, np.zeros(1000, dtype=np.uint8))
+
+    accountant = MemoryAccountant()
+    accountant.add_provider(lambda seen: [MemoryItem(kind='cache', name=name, nbytes=get_nbytes(cache, seen),
+                                                     last_used=cache.last_used, release=cache.clear)
+                                          for name, cache in caches.items()])
+    assert accountant.total == 3000
+    assert accountant.enforce() == []  # no budget
+
+    accountant.budget = 1500
+    accountant.is_busy = lambda: True  # data is being loaded
+    assert accountant.enforce() == [] and accountant.total == 3000
+
+    accountant.is_busy = None
+    assert [item.name for item in accountant.enforce()] == ['b', 'a']
+    assert accountant.total == 1000 and len(caches['c']) == 1
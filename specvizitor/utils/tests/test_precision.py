@@ -0,0 +1,17 @@
+import numpy as np
+
+from specvizitor.utils.precision import to_display_precision
+
+
+def test_to_display_precision():
+    data = np.arange(12, dtype='>f8').reshape(3, 4)
+    assert to_display_precision(data) is data
+
+    converted = to_display_precision(data, 'float32')
+    assert converted.dtype == np.dtype(np.float32)
+    assert np.array_equal(converted, data)
+
+    assert to_display_precision(converted, 'float32') is converted
+
+    rgb = np.zeros((3, 4, 3), dtype=np.uint8)
+    assert to_display_precision(rgb, 'float32') is rgb
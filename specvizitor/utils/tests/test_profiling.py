@@ -0,0 +1,69 @@
+import cProfile
+import pstats
+import threading
+
+from specvizitor.utils import profiling
+from specvizitor.utils.profiling import LoadProfiler
+
+
+def _work():
+    return sum(i ** 2 for i in range(1000))
+
+
+def test_profile_loads(tmp_path):
+    profiler = LoadProfiler(output_dir=tmp_path)
+    profiler.request(1)
+
+    profiler.begin_load()
+    session = profiler.session
+
+    def loader():
+        with profiler.profile_thread(session):
+            _work()
+
+    thread = threading.Thread(target=loader)
+    thread.start()
+    thread.join()
+
+    filename = profiler.end_load((123, 'a/b'))
+    assert filename.parent == tmp_path and filename.name.startswith('load_123_a_b_')
+    # profiled in the loader thread (before Python 3.12) or by the profile of the main thread (since Python 3.12)
+    assert '_work' in {func[2] for func in pstats.Stats(str(filename)).stats}
+
+    assert not profiler.active
+    profiler.begin_load()
+    assert profiler.session is None and profiler.end_load(123) is None
+
+
+def test_profile_thread_with_active_profiler(tmp_path, monkeypatch):
+    profiler = LoadProfiler(output_dir=tmp_path)
+    profiler.request(1)
+    profiler.begin_load()
+    session = profiler.session
+
+    class BusyProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    # the loader thread cannot be profiled on its own, but the load goes on
+    monkeypatch.setattr(profiling, 'PROFILES_ALL_THREADS', False)
+    monkeypatch.setattr(profiling.cProfile, 'Profile', BusyProfile)
+    result = []
+    with profiler.profile_thread(session):
+        result.append(_work())
+    monkeypatch.undo()
+
+    assert result == [332833500]
+    assert profiler.end_load(1) is not None
+
+
+def test_aborted_loads(tmp_path):
+    profiler = LoadProfiler(output_dir=tmp_path)
+    profiler.request(1)
+
+    profiler.begin_load()
+    profiler.begin_load()  # the first load is aborted
+    assert profiler.active
+
+    profiler.end_load(1)
+    assert not profiler.active and len(list(tmp_path.glob('*.prof'))) == 1
@@ -0,0 +1,32 @@
+import pytest
+
+from specvizitor.utils.session import SessionRecorder, read_session
+
+
+def test_record_session(tmp_path):
+    recorder = SessionRecorder()
+    with recorder.event('navigate', direction='next'):  # not recording
+        pass
+
+    recorder.start(tmp_path / 'session.jsonl', header={'object_index': 3})
+    with recorder.event('navigate', direction='next'):
+        with recorder.event('slider', value=0.5):  # caused by the navigation
+            pass
+    with recorder.suppress():
+        with recorder.event('levels', levels=[0, 1]):  # caused by the application
+            pass
+    with recorder.event('redshift', n_steps=-1):
+        pass
+    recorder.stop()
+
+    header, events = read_session(tmp_path / 'session.jsonl')
+    assert header['object_index'] == 3
+    assert [e['type'] for e in events] == ['navigate', 'redshift']
+    assert events[0]['direction'] == 'next' and events[1]['n_steps'] == -1
+    assert events[0]['t'] <= events[1]['t']
+
+
+def test_read_session_version(tmp_path):
+    (tmp_path / 'session.jsonl').write_text('{"version": 0}\n')
+    with pytest.raises(ValueError):
+        read_session(tmp_path / 'session.jsonl')
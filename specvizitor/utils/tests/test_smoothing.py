@@ -0,0 +1,27 @@
+from astropy.convolution import convolve_fft, Gaussian2DKernel
+import numpy as np
+
+from specvizitor.utils.smoothing import FFTGaussianSmoother
+
+
+def test_fft_gaussian_smoother():
+    data = np.random.default_rng(0).normal(size=(50, 80))
+    data[10:15, 20:30] = np.nan
+
+    smoother = FFTGaussianSmoother(data, max_sigma=1)
+    assert smoother.smooth(0) is data
+
+    for sigma in (0.5, 1, 2.5):
+        expected = convolve_fft(data, Gaussian2DKernel(sigma), preserve_nan=True)
+        assert np.allclose(smoother.smooth(sigma), expected, equal_nan=True)
+
+
+def test_fft_gaussian_smoother_float32():
+    data = np.random.default_rng(0).normal(size=(50, 80)).astype(np.float32)
+    data[10:15, 20:30] = np.nan
+
+    smoothed = FFTGaussianSmoother(data).smooth(1)
+    assert smoothed.dtype == np.float32
+
+    expected = convolve_fft(data.astype(float), Gaussian2DKernel(1), preserve_nan=True)
+    assert np.allclose(smoothed, expected, atol=1e-5, equal_nan=True)
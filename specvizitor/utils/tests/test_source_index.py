@@ -0,0 +1,31 @@
+import numpy as np
+
+from specvizitor.utils.source_index import SkyIndex, PixelIndex
+
+
+def test_sky_index():
+    rng = np.random.default_rng(0)
+    ra, dec = rng.uniform(0, 360, 10000), np.degrees(np.arcsin(rng.uniform(-1, 1, 10000)))
+    sky_index = SkyIndex(ra, dec)
+
+    ra0, dec0, radius = 150., 2., 5.
+    cos_sep = (np.sin(np.radians(dec)) * np.sin(np.radians(dec0)) +
+               np.cos(np.radians(dec)) * np.cos(np.radians(dec0)) * np.cos(np.radians(ra - ra0)))
+    expected = np.flatnonzero(np.degrees(np.arccos(np.clip(cos_sep, -1, 1))) <= radius)
+
+    assert np.array_equal(np.sort(sky_index.query_cone(ra0, dec0, radius)), expected)
+
+
+def test_pixel_index():
+    x, y = np.array([1., 5., 5.5, 20.]), np.array([1., 5., 5., 30.])
+    pixel_index = PixelIndex(x, y, ids=np.array([10, 11, 12, 13]))
+
+    assert pixel_index.nearest(5.4, 5.1, max_distance=1) == 2
+    assert pixel_index.nearest(10, 10, max_distance=1) is None
+    assert np.array_equal(np.sort(pixel_index.query_rect(0, 0, 6, 6)), [0, 1, 2])
+    assert np.array_equal(pixel_index.query_rect(15, 0, 25, 40), [3])
+    assert np.isclose(pixel_index.spacing[1], 0.5)
+
+    empty_index = PixelIndex(np.array([]), np.array([]), ids=np.array([]))
+    assert empty_index.nearest(0, 0, max_distance=1) is None
+    assert empty_index.query_rect(0, 0, 1, 1).size == 0
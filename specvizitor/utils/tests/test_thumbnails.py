@@ -0,0 +1,62 @@
+import numpy as np
+import pyqtgraph as pg
+
+import os
+
+from specvizitor.config.data_widgets import Image
+from specvizitor.utils.thumbnails import ThumbnailCache, hash_config, get_thumbnail_key, image_to_thumbnail
+
+
+def test_thumbnail_key(tmp_path):
+    filename = tmp_path / 'image.fits'
+    filename.write_bytes(b'data')
+
+    cfg_hash = hash_config(Image())
+    assert cfg_hash == hash_config(Image())
+    assert cfg_hash != hash_config(Image(pyramid=True))
+
+    key = get_thumbnail_key(str(filename), {'extname': 'SCI'}, cfg_hash, 160)
+    assert key == get_thumbnail_key(str(filename), {'extname': 'SCI'}, cfg_hash, 160)
+    assert key != get_thumbnail_key(str(filename), {'extname': 'SCI', 'x0': 10}, cfg_hash, 160)
+
+    os.utime(filename, ns=(0, 0))
+    assert key != get_thumbnail_key(str(filename), {'extname': 'SCI'}, cfg_hash, 160)
+
+    assert get_thumbnail_key(str(tmp_path / 'missing.fits'), {}, cfg_hash, 160) is None
+
+
+def test_thumbnail_cache(tmp_path):
+    data = np.random.default_rng(0).normal(size=(300, 200))
+    lut = pg.colormap.get('viridis').getLookupTable(nPts=256)
+
+    image = image_to_thumbnail(data, (-1, 1), lut, 100)
+    assert (image.width(), image.height()) == (67, 100)
+    assert image_to_thumbnail(np.zeros((30, 1000)), None, lut, 100).height() == 25  # elongated images are stretched
+
+    cache = ThumbnailCache(tmp_path)
+    cache.put('key', image)
+    assert cache.get('key') is image
+
+    cached_image = ThumbnailCache(tmp_path).get('key')  # read from disk
+    assert cached_image.size() == image.size()
+    assert ThumbnailCache(tmp_path).get('other_key') is None
+
+
+def test_thumbnail_cache_size(tmp_path):
+    lut = pg.colormap.get('viridis').getLookupTable(nPts=256)
+    image = image_to_thumbnail(np.random.default_rng(0).normal(size=(50, 50)), (-1, 1), lut, 50)
+
+    cache = ThumbnailCache(tmp_path)
+    cache.put('key0', image)
+    size = (tmp_path / 'key0.png').stat().st_size
+
+    # the least recently used thumbnails are removed once the cache exceeds its size
+    cache = ThumbnailCache(tmp_path, max_disk_size=int(3.5 * size))
+    for i in range(1, 3):
+        cache.put(f'key{i}', image)
+    for i in range(3):
+        os.utime(tmp_path / f'key{i}.png', ns=(i, i))
+    assert cache.get('key0') is not None  # read from disk and marked as used
+
+    cache.put('key3', image)
+    assert sorted(path.stem for path in tmp_path.glob('*.png')) == ['key0', 'key2', 'key3']
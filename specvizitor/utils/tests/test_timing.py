@@ -0,0 +1,90 @@
+import json
+import threading
+
+import pytest
+
+from specvizitor.utils.timing import StageTimer
+
+
+def test_disabled_timer():
+    timer = StageTimer()
+    timer.begin_load()
+
+    assert timer.span('read') is timer.span('open')  # a shared null context
+    with timer.span('read'):
+        pass
+    timer.record('total', 1.)
+    timer.end_load()
+
+    assert timer.spans == []
+    assert timer.stats() == []
+
+
+def test_stage_stats():
+    timer = StageTimer(window=3)
+    timer.enabled = True
+
+    for i in range(5):
+        timer.begin_load()
+        timer.record('read', 0.1 * i, widget='Spectrum 1D')
+        timer.record('read', 0.1 * i, widget='Spectrum 2D')
+        timer.record('total', 1.)
+        timer.end_load()
+
+    stats = {s.stage: s for s in timer.stats()}
+    assert stats['read'].count == 3  # the most recent loads
+    assert stats['read'].last == pytest.approx(0.8)  # summed over the widgets
+    assert stats['read'].p50 == pytest.approx(0.6)
+    assert stats['total'].p95 == pytest.approx(1.)
+
+
+def test_spans_of_threads(tmp_path):
+    timer = StageTimer()
+    timer.enabled = True
+
+    load = timer.begin_load()
+
+    def loader():
+        timer.bind(load)
+        with timer.span('debounce'):
+            pass
+        with timer.attribute('Image Cutout'):
+            with timer.span('read'):
+                pass
+
+    def unbound():
+        with timer.span('read'):
+            pass
+
+    for target in (loader, unbound):
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+
+    with timer.span('reset_view'):
+        pass
+    timer.end_load()
+
+    spans = {s.stage: s for s in timer.spans}
+    assert len(timer.spans) == 3
+    assert all(s.load == load for s in spans.values())
+    assert spans['read'].widget == 'Image Cutout'
+    assert spans['debounce'].widget is None
+
+    timer.export(tmp_path / 'timings.jsonl')
+    lines = (tmp_path / 'timings.jsonl').read_text().splitlines()
+    assert [json.loads(line)['stage'] for line in lines] == ['debounce', 'read', 'reset_view']
+
+
+def test_aborted_loads():
+    timer = StageTimer()
+    timer.enabled = True
+
+    timer.begin_load()
+    timer.record('read', 1.)
+    timer.begin_load()  # the first load is aborted
+    timer.record('read', 2.)
+    timer.end_load()
+
+    stats = timer.stats()
+    assert len(stats) == 1 and stats[0].count == 1 and stats[0].last == 2.
@@ -0,0 +1,219 @@
+import numpy as np
+from qtpy import QtCore, QtGui
+
+from dataclasses import asdict, is_dataclass
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+
+from .disk_cache import prune_cache, touch
+from .lru_cache import LRUCache
+
+
+__all__ = [
+    "ThumbnailCache",
+    "hash_config",
+    "get_thumbnail_key",
+    "image_to_thumbnail",
+    "plot_to_thumbnail"
+]
+
+logger = logging.getLogger(__name__)
+
+
+def hash_config(cfg) -> str:
+    """Return a short hash of a (dataclass) configuration, which changes whenever any of its parameters changes."""
+    if is_dataclass(cfg):
+        cfg = asdict(cfg)
+    return hashlib.sha1(json.dumps(cfg, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def get_thumbnail_key(filename: str, loader_params: dict, cfg_hash: str, size: int) -> str | None:
+    """Return the key of a thumbnail in the cache, or None if the file does not exist. The key depends on the
+    modification time of the file, so that thumbnails of modified files are rendered again.
+    @param filename: the file the data is loaded from
+    @param loader_params: the parameters selecting the data in the file (e.g. the position of a cutout)
+    @param cfg_hash: the hash of the widget configuration (see `hash_config`)
+    @param size: the size of the thumbnail
+    """
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+    except OSError:
+        return None
+
+    params = sorted((k, str(v)) for k, v in loader_params.items())
+    return hashlib.sha1(json.dumps([str(filename), mtime, params, cfg_hash, size]).encode()).hexdigest()
+
+
+class ThumbnailCache:
+    """Thumbnails stored as PNG files in a directory, the most recently used of which are also kept in memory. When
+    the files exceed `max_disk_size`, the least recently used ones are removed. The cache can be used from several
+    threads.
+    """
+
+    def __init__(self, directory: str | pathlib.Path, max_memory_items: int = 512, max_disk_size: int = 256 * 2 ** 20):
+        self.directory = pathlib.Path(directory)
+        self.max_disk_size = max_disk_size
+        self._memory = LRUCache(maxsize=max_memory_items)
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()  # held while the directory is scanned, which might take a while
+        self._disk_nbytes: int | None = None  # the size of the files, counted when the first thumbnail is saved
+
+    def _get_path(self, key: str) -> pathlib.Path:
+        return self.directory / f'{key}.png'
+
+    def get_from_memory(self, key: str) -> QtGui.QImage | None:
+        with self._lock:
+            return self._memory.get(key)
+
+    def get(self, key: str) -> QtGui.QImage | None:
+        image = self.get_from_memory(key)
+        if image is not None:
+            return image
+
+        path = self._get_path(key)
+        if not path.exists():
+            return None
+
+        image = QtGui.QImage(str(path))
+        if image.isNull():
+            return None
+        touch(path)
+
+        with self._lock:
+            self._memory.put(key, image)
+        return image
+
+    def put(self, key: str, image: QtGui.QImage):
+        with self._lock:
+            self._memory.put(key, image)
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file first, so that other threads never read an incomplete thumbnail
+            path = self._get_path(key)
+            tmp_path = path.with_name(f'{path.stem}.{threading.get_ident()}.tmp')
+            if not image.save(str(tmp_path), 'PNG'):
+                return
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"Failed to save the thumbnail to the cache: {e}")
+            return
+
+        with self._disk_lock:
+            if self._disk_nbytes is None:
+                self._disk_nbytes = prune_cache(self.directory, '*.png', self.max_disk_size, keep=path)
+                return
+
+            self._disk_nbytes += size
+            if self._disk_nbytes > self.max_disk_size:
+                # remove more thumbnails than necessary, so that the directory is not scanned on every call
+                self._disk_nbytes = prune_cache(self.directory, '*.png', int(0.9 * self.max_disk_size), keep=path)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the thumbnails kept in memory."""
+        with self._lock:
+            return sum(image.sizeInBytes() for image in self._memory.values())
+
+    @property
+    def last_used(self) -> float:
+        return self._memory.last_used
+
+    def clear_memory(self):
+        """Remove the thumbnails from memory (they are still cached on disk)."""
+        with self._lock:
+            self._memory.clear()
+
+    def clear(self):
+        self.clear_memory()
+        for path in self.directory.glob('*.png'):
+            path.unlink(missing_ok=True)
+        with self._disk_lock:
+            self._disk_nbytes = None
+
+
+def _to_qimage(rgb: np.ndarray) -> QtGui.QImage:
+    rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+    height, width = rgb.shape[:2]
+    image = QtGui.QImage(rgb.data, width, height, 3 * width, QtGui.QImage.Format_RGB888)
+    return image.copy()  # detach from the buffer of the array
+
+
+def image_to_thumbnail(data: np.ndarray, levels: tuple[float, float] | None, lut: np.ndarray,
+                       size: int) -> QtGui.QImage | None:
+    """Render an image to a thumbnail (None if the image is empty).
+    @param data: the image (2D, or RGB(A) with colour channels along the last axis)
+    @param levels: the values mapped to the ends of the lookup table (ignored for RGB images)
+    @param lut: the lookup table (256 x 3 array of 8-bit colours)
+    @param size: the maximum width and height of the thumbnail
+    """
+    if data.shape[0] == 0 or data.shape[1] == 0:
+        return None
+
+    # decimate the image before scaling it smoothly, so that the cost does not depend on the size of the image
+    stride = max(1, min(data.shape[0], data.shape[1]) // (2 * size))
+    data = data[::stride, ::stride]
+    data = data[::-1]  # the first row is displayed at the bottom of the viewer
+
+    if data.ndim == 3:
+        rgb = data[..., :3]
+    else:
+        data = np.asarray(data, dtype=np.float32)
+        l1, l2 = levels if levels is not None else (np.nanmin(data), np.nanmax(data))
+        scale = 255 / (l2 - l1) if l2 > l1 else 0
+        with np.errstate(invalid='ignore'):
+            indices = np.clip((data - l1) * scale, 0, 255)
+        indices = np.nan_to_num(indices, nan=0).astype(np.uint8)
+        rgb = lut[indices]
+
+    # keep the aspect ratio, unless the image is so elongated (e.g. a 2D spectrum) that it would be a thin strip
+    height, width = rgb.shape[:2]
+    if width >= height:
+        size_x, size_y = size, max(round(size * height / width), size // 4)
+    else:
+        size_x, size_y = max(round(size * width / height), size // 4), size
+
+    return _to_qimage(rgb).scaled(size_x, size_y, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation)
+
+
+def plot_to_thumbnail(curves: list[tuple[np.ndarray, np.ndarray, QtGui.QColor]], size: int,
+                      background: QtGui.QColor) -> QtGui.QImage:
+    """Render line plots to a thumbnail, `size` pixels wide and half as high.
+    @param curves: the x and y data of each plot and its colour
+    @param size: the width of the thumbnail
+    @param background: the background colour
+    """
+    width, height = size, size // 2
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB888)
+    image.fill(background)
+
+    finite = []
+    for x, y, color in curves:
+        mask = np.isfinite(x) & np.isfinite(y)
+        if np.any(mask):
+            finite.append((x[mask], y[mask], color))
+    if not finite:
+        return image
+
+    x_min, x_max = min(np.min(x) for x, _, _ in finite), max(np.max(x) for x, _, _ in finite)
+    y_min, y_max = min(np.min(y) for _, y, _ in finite), max(np.max(y) for _, y, _ in finite)
+    x_scale = (width - 1) / (x_max - x_min) if x_max > x_min else 0
+    y_scale = (height - 1) / (y_max - y_min) if y_max > y_min else 0
+
+    painter = QtGui.QPainter(image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    for x, y, color in finite:
+        # thin the curve to a few points per pixel
+        stride = max(1, len(x) // (4 * width))
+        px = (x[::stride] - x_min) * x_scale
+        py = (height - 1) - (y[::stride] - y_min) * y_scale
+        painter.setPen(QtGui.QPen(color, 1))
+        painter.drawPolyline(QtGui.QPolygonF([QtCore.QPointF(a, b) for a, b in zip(px, py)]))
+    painter.end()
+
+    return image
@@ -0,0 +1,186 @@
+import numpy as np
+
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict
+import json
+import pathlib
+import threading
+import time
+
+
+__all__ = [
+    "Span",
+    "StageStats",
+    "StageTimer",
+    "timer"
+]
+
+_NULL_SPAN = nullcontext()
+
+
+@dataclass(frozen=True)
+class Span:
+    """The time spent in a stage of loading an object."""
+    load: int                   # identifies the object load
+    stage: str
+    start: float                # `time.perf_counter()` at the start of the stage
+    duration: float             # in seconds
+    widget: str | None = None
+    thread: str | None = None
+
+
+@dataclass(frozen=True)
+class StageStats:
+    """Statistics of the time spent in a stage per object load, over the most recent loads (in seconds)."""
+    stage: str
+    count: int
+    last: float
+    p50: float
+    p95: float
+
+
+class _SpanContext:
+    __slots__ = ('_timer', '_stage', '_widget', '_start', '_previous_widget')
+
+    def __init__(self, timer: 'StageTimer', stage: str | None, widget: str | None):
+        self._timer = timer
+        self._stage = stage
+        self._widget = widget
+
+    def __enter__(self):
+        local = self._timer._local
+        self._previous_widget = getattr(local, 'widget', None)
+        if self._widget is not None:
+            local.widget = self._widget  # spans nested in this span are attributed to the same widget
+        else:
+            self._widget = self._previous_widget
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._stage is not None:
+            self._timer.record(self._stage, time.perf_counter() - self._start, widget=self._widget, start=self._start)
+        self._timer._local.widget = self._previous_widget
+        return False
+
+
+class StageTimer:
+    """Collects the time spent in each stage of loading objects. Stages are timed with `span`, which is a no-op
+    (returning a shared null context) unless the timer is enabled. Spans can be recorded from any thread; each thread
+    attributes its spans to the object load bound to it with `begin_load` or `bind`. Spans recorded by threads not
+    bound to a load (e.g. threads rendering thumbnails) are ignored.
+
+    When a load ends (`end_load`), the time spent in each stage is summed over the spans of the load and added to
+    rolling windows, from which the statistics of the stages are computed.
+    """
+
+    def __init__(self, window: int = 200, max_spans: int = 100000):
+        """
+        @param window: the number of most recent loads the statistics are computed over
+        @param max_spans: the maximum number of spans kept for export
+        """
+        self.enabled: bool = False
+        self.window = window
+
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._durations: dict[str, deque[float]] = {}
+        self._pending: dict[int, dict[str, float]] = {}  # the time spent in the stages of loads that have not ended
+
+        self._load: int = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def load_id(self) -> int | None:
+        """The ID of the load bound to the current thread."""
+        return getattr(self._local, 'load', None)
+
+    def begin_load(self) -> int:
+        """Start a new object load, and bind it to the current thread.
+        @return: the ID of the load
+        """
+        with self._lock:
+            self._load += 1
+            self._local.load = self._load
+            return self._load
+
+    def bind(self, load: int):
+        """Attribute the spans recorded by the current thread to a load (e.g. in a loader thread)."""
+        self._local.load = load
+
+    def span(self, stage: str, widget: str | None = None):
+        """Return a context manager timing a stage.
+        @param stage: the name of the stage
+        @param widget: the widget the stage is run for (by default, the widget of the enclosing span, if any)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _SpanContext(self, stage, widget)
+
+    def attribute(self, widget: str):
+        """Return a context manager attributing the spans recorded in it to a widget (without timing a stage)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _SpanContext(self, None, widget)
+
+    def record(self, stage: str, duration: float, widget: str | None = None, start: float | None = None):
+        """Record the time spent in a stage (ignored if the timer is disabled)."""
+        load = self.load_id
+        if not self.enabled or load is None:
+            return
+
+        if start is None:
+            start = time.perf_counter() - duration
+        span = Span(load=load, stage=stage, start=start, duration=duration, widget=widget,
+                    thread=threading.current_thread().name)
+        with self._lock:
+            self._spans.append(span)
+            stages = self._pending.setdefault(span.load, {})
+            stages[stage] = stages.get(stage, 0.) + duration
+
+    def end_load(self, load: int | None = None):
+        """End a load, adding the time spent in each of its stages to the statistics."""
+        load = load if load is not None else self.load_id
+        if load is None:
+            return
+
+        with self._lock:
+            stages = self._pending.pop(load, None)
+            # loads that were aborted never end: drop them
+            for old_load in [k for k in self._pending if k < load]:
+                self._pending.pop(old_load)
+            if not stages:
+                return
+            for stage, duration in stages.items():
+                self._durations.setdefault(stage, deque(maxlen=self.window)).append(duration)
+
+    def stats(self) -> list[StageStats]:
+        with self._lock:
+            durations = {stage: list(d) for stage, d in self._durations.items()}
+
+        stats = []
+        for stage, d in durations.items():
+            p50, p95 = np.percentile(d, (50, 95))
+            stats.append(StageStats(stage=stage, count=len(d), last=d[-1], p50=float(p50), p95=float(p95)))
+        return stats
+
+    @property
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._durations = {}
+            self._pending = {}
+
+    def export(self, filename: str | pathlib.Path):
+        """Write the spans to a file in the JSON Lines format (one span per line)."""
+        with open(filename, 'w') as f:
+            for span in self.spans:
+                f.write(json.dumps(asdict(span)) + '\n')
+
+
+timer = StageTimer()  # the timer of the application
@@ -1,14 +1,94 @@
 import pyqtgraph as pg
-from pgcolorbar.colorlegend import ColorLegendItem
+from pgcolorbar.colorlegend import ColorLegendItem, NoFiniteDataError
+from qtpy import QtCore
 import numpy as np
 
+from ..image_stats import histogram_from_sample
+from ..session import recorder
 from .MyViewBox import MyViewBox
 
 
+class _LevelsViewBox(MyViewBox):
+    """A view box keeping track of whether its range is being changed with the mouse."""
+
+    def __init__(self, *args, **kwargs):
+        self.mouse_input: bool = False
+        super().__init__(*args, **kwargs)
+
+    def mouseDragEvent(self, ev, axis=None):
+        self.mouse_input = True
+        try:
+            super().mouseDragEvent(ev, axis)
+        finally:
+            self.mouse_input = False
+
+    def wheelEvent(self, ev, axis=None):
+        self.mouse_input = True
+        try:
+            super().wheelEvent(ev, axis)
+        finally:
+            self.mouse_input = False
+
+
 class ColorBar(ColorLegendItem):
+    """A color legend whose histogram spans the current levels. The histogram is computed from a sorted sample of the
+    image (see `set_histogram_sample`), so that it can be recomputed cheaply whenever the levels change, and it is
+    redrawn at most once per `histogram_update_interval` milliseconds while the levels are being dragged.
+    """
+
+    histogram_update_interval: int = 50
+
     def __init__(self, *args, **kwargs):
-        pg.ViewBox = MyViewBox
+        self.session_fields: dict | None = None  # identifies the color bar in recorded sessions (see `SessionRecorder`)
+        self._hist_sample: np.ndarray | None = None
+        self._hist_update_timer: QtCore.QTimer | None = None
+        self._hist_update_pending: bool = False
+        self._mouse_input: bool = False
+
+        pg.ViewBox = _LevelsViewBox
         super().__init__(*args, **kwargs)
+        pg.ViewBox = MyViewBox
+
+        self._hist_update_timer = QtCore.QTimer(self)
+        self._hist_update_timer.setSingleShot(True)
+        self._hist_update_timer.setInterval(self.histogram_update_interval)
+        self._hist_update_timer.timeout.connect(self._flush_histogram_update)
+
+        self.sigLevelsChanged.connect(self.request_histogram_update)
+
+    @property
+    def mouse_input(self) -> bool:
+        """Whether the levels are being changed with the mouse (as opposed to programmatically)."""
+        return self._mouse_input or self.overlayViewBox.mouse_input
+
+    @QtCore.Slot()
+    def _updateImageLevels(self):
+        if self.session_fields is None or not self.mouse_input:
+            super()._updateImageLevels()
+            return
+        with recorder.event('levels', levels=[float(v) for v in self.getLevels()], **self.session_fields):
+            super()._updateImageLevels()
+
+    def mouseClickEvent(self, mouseClickEvent):
+        self._mouse_input = True
+        try:
+            super().mouseClickEvent(mouseClickEvent)
+        finally:
+            self._mouse_input = False
+
+    @QtCore.Slot(object)
+    def _onEdgeLineChanged(self, lineItem):
+        self._mouse_input = True
+        try:
+            super()._onEdgeLineChanged(lineItem)
+        finally:
+            self._mouse_input = False
+
+    def set_histogram_sample(self, sample: np.ndarray | None):
+        """Set the sorted sample of the image used to compute the histogram (see `sample_histogram`). If None, the
+        histogram is computed from the image itself.
+        """
+        self._hist_sample = sample
 
     def _calcHistogramRange(self, imgArr, step='auto', targetImageSize=200):
         if imgArr is None or imgArr.size == 0 or np.all(~np.isfinite(imgArr)):
@@ -17,3 +97,50 @@ class ColorBar(ColorLegendItem):
         mn, mx = self.getLevels()
 
         return mn, mx
+
+    def _updateHistogram(self):
+        if self._hist_sample is None:
+            super()._updateHistogram()
+            return
+
+        if not self._histogramIsVisible or self._imageItem is None or self._imageItem.image is None \
+                or self._hist_sample.size == 0:
+            self.histPlotDataItem.setData([])
+            self.histPlotDataItem.clear()
+            return
+
+        try:
+            bins = self._calcHistogramBins(self.getLevels(), forIntegers=self._imageItemHasIntegerData(self._imageItem))
+        except NoFiniteDataError:
+            self.histPlotDataItem.setData([])
+            self.histPlotDataItem.clear()
+            return
+
+        histogram = histogram_from_sample(self._hist_sample, bins)
+        self.histPlotDataItem.setData(*histogram)
+
+        # as in `ColorLegendItem`, discard outliers when setting the histogram height
+        hist_y_range = np.percentile(histogram[1], (self.histHeightPercentile,))[0]
+        self.histViewBox.setRange(xRange=(-hist_y_range, 0), padding=None)
+
+    @QtCore.Slot()
+    def request_histogram_update(self):
+        """Redraw the histogram, unless it has been redrawn less than `histogram_update_interval` ago, in which case
+        the redraw is postponed until the end of the interval.
+        """
+        if self._hist_update_timer is None:
+            return
+
+        if self._hist_update_timer.isActive():
+            self._hist_update_pending = True
+            return
+
+        self._updateHistogram()
+        self._hist_update_timer.start()
+
+    @QtCore.Slot()
+    def _flush_histogram_update(self):
+        if self._hist_update_pending:
+            self._hist_update_pending = False
+            self._updateHistogram()
+            self._hist_update_timer.start()
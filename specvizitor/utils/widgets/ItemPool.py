@@ -0,0 +1,72 @@
+import pyqtgraph as pg
+from qtpy import QtWidgets
+
+from typing import Callable, Hashable
+
+
+__all__ = [
+    "ItemPool"
+]
+
+
+class ItemPool:
+    """Graphics items kept in a plot across object switches. Instead of creating new items for every object, callers
+    acquire items by key (e.g. `central_axis_x` or `('plot', 'flux')`) and update their data in place. Releasing the
+    items hides them, so that switching objects does not add or remove items from the scene.
+    """
+
+    def __init__(self, plot_item: pg.PlotItem):
+        self.plot_item = plot_item
+
+        self._free: dict[Hashable, list[QtWidgets.QGraphicsItem]] = {}
+        self._used: dict[Hashable, list[QtWidgets.QGraphicsItem]] = {}
+        self._items: set[QtWidgets.QGraphicsItem] = set()
+
+    def __len__(self):
+        return len(self._items)
+
+    def acquire(self, key: Hashable, factory: Callable[[], QtWidgets.QGraphicsItem],
+                **kwargs) -> QtWidgets.QGraphicsItem:
+        """Return a visible item stored under `key`, creating one if all such items are in use.
+        @param key: identifies items of the same kind and role, that can replace each other
+        @param factory: creates a new item
+        @param kwargs: the parameters of `PlotItem.addItem` for a new item
+        @return: the item
+        """
+        free = self._free.get(key)
+        if free:
+            item = free.pop()
+            name = item.name() if hasattr(item, 'name') else None
+            if name and self.plot_item.legend is not None:
+                self.plot_item.legend.addItem(item, name)
+        else:
+            item = factory()
+            self.plot_item.addItem(item, **kwargs)
+            self._items.add(item)
+
+        item.setVisible(True)
+        self._used.setdefault(key, []).append(item)
+
+        return item
+
+    def is_pooled(self, item: QtWidgets.QGraphicsItem) -> bool:
+        return item in self._items
+
+    def release_all(self):
+        """Hide all items in use and make them available for reuse."""
+        for key, items in self._used.items():
+            for item in items:
+                item.setVisible(False)
+                if self.plot_item.legend is not None:
+                    self.plot_item.legend.removeItem(item)
+            self._free.setdefault(key, []).extend(items)
+        self._used = {}
+
+    def clear(self):
+        """Remove all items from the plot."""
+        self.release_all()
+        for items in self._free.values():
+            for item in items:
+                self.plot_item.removeItem(item)
+        self._free = {}
+        self._items = set()
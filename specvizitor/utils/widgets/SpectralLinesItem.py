@@ -0,0 +1,114 @@
+from qtpy import QtCore, QtGui
+import numpy as np
+import pyqtgraph as pg
+
+
+__all__ = [
+    "SpectralLinesItem"
+]
+
+
+class SpectralLinesItem(pg.GraphicsObject):
+    """A set of vertical lines with rotated labels, drawn as a single graphics item. All lines are painted as one path
+    spanning the current view; labels are only drawn for lines inside the view, skipping those that would overlap
+    with the previous label at the current zoom level.
+    """
+
+    LABEL_OFFSET: float = 0.03  # the offset of labels from the top of the view, as a fraction of the view height
+
+    def __init__(self, pen=None, color=None):
+        """
+        @param pen: the pen used to draw the lines
+        @param color: the color of labels
+        """
+        super().__init__()
+
+        self._pen = pg.mkPen(pen)
+        self._color = pg.mkColor(color) if color is not None else self._pen.color()
+
+        self._names: list[str] = []
+        self._positions = np.array([])
+        self._order = np.array([], dtype=int)  # indices sorting the lines by position
+
+        self._bounding_rect: QtCore.QRectF | None = None
+
+    def set_lines(self, names: list[str], positions: np.ndarray | None = None):
+        self._names = list(names)
+        self.set_positions(np.zeros(len(self._names)) if positions is None else positions)
+
+    def set_positions(self, positions: np.ndarray):
+        positions = np.asarray(positions, dtype=float)
+        if positions.shape != (len(self._names),):
+            raise ValueError(f"Expected {len(self._names)} line positions, got {positions.shape}")
+
+        self._positions = positions
+        self._order = np.argsort(positions, kind='stable')
+        self.update()
+
+    def viewTransformChanged(self):
+        # the item spans the view, so its bounding rect changes with the view range
+        self.prepareGeometryChange()
+        self._bounding_rect = None
+        super().viewTransformChanged()
+
+    def boundingRect(self) -> QtCore.QRectF:
+        if self._bounding_rect is None:
+            view_rect = self.viewRect()
+            self._bounding_rect = QtCore.QRectF() if view_rect is None else view_rect
+        return self._bounding_rect
+
+    def _visible_lines(self, view_rect: QtCore.QRectF) -> np.ndarray:
+        positions = self._positions[self._order]
+        i1 = np.searchsorted(positions, view_rect.left(), side='left')
+        i2 = np.searchsorted(positions, view_rect.right(), side='right')
+        return self._order[i1:i2]
+
+    def _label_positions(self, tr: QtGui.QTransform, visible: np.ndarray,
+                         min_spacing: float) -> list[tuple[float, int]]:
+        """Get the device x-coordinates of the labels to draw, skipping those closer than `min_spacing` to the
+        previous label.
+        """
+        label_x = sorted((tr.map(QtCore.QPointF(self._positions[i], 0)).x(), i) for i in visible)
+        labels = []
+        last_x = -np.inf
+        for x, i in label_x:
+            if x - last_x < min_spacing:
+                continue  # declutter: skip labels overlapping with the previous one
+            last_x = x
+            labels.append((x, i))
+        return labels
+
+    def paint(self, p: QtGui.QPainter, *args):
+        view_rect = self.boundingRect()
+        if view_rect.isEmpty() or self._positions.size == 0:
+            return
+
+        visible = self._visible_lines(view_rect)
+        if visible.size == 0:
+            return
+
+        path = QtGui.QPainterPath()
+        y1, y2 = view_rect.top(), view_rect.bottom()
+        for x in self._positions[visible]:
+            path.moveTo(x, y1)
+            path.lineTo(x, y2)
+
+        p.setPen(self._pen)
+        p.drawPath(path)
+
+        # draw labels in device coordinates, so that the text is not scaled with the view
+        tr = p.transform()
+        device_rect = tr.mapRect(view_rect)
+        label_y = device_rect.top() + self.LABEL_OFFSET * device_rect.height()
+
+        p.resetTransform()
+        p.setPen(pg.mkPen(self._color))
+        metrics = QtGui.QFontMetricsF(p.font())
+        min_spacing = metrics.height()
+
+        for x, i in self._label_positions(tr, visible, min_spacing):
+            p.save()
+            p.translate(x, label_y)
+            p.rotate(90)
+            p.drawText(QtCore.QPointF(0, -metrics.descent()), self._names[i])
+            p.restore()
@@ -1,22 +1,26 @@
 from .AbstractWidget import AbstractWidget
 from .ColorBar import ColorBar
 from .FileBrowser import FileBrowser
+from .ItemPool import ItemPool
 from .ParamTable import ParamTable
 from .Section import Section
 from .MyQLineEdit import MyQLineEdit
 from .MyQTextEdit import MyQTextEdit
 from .MyTextItem import MyTextItem
 from .MyViewBox import MyViewBox
+from .SpectralLinesItem import SpectralLinesItem
 
 
 __all__ = [
     "AbstractWidget",
     "ColorBar",
     "FileBrowser",
+    "ItemPool",
     "ParamTable",
     "Section",
     "MyQLineEdit",
     "MyQTextEdit",
     "MyTextItem",
-    "MyViewBox"
+    "MyViewBox",
+    "SpectralLinesItem"
 ]
@@ -13,13 +13,16 @@ from ..io.catalog import Catalog
 from ..io.inspection_data import InspectionData
 from ..io.viewer_data import ViewerData
 from ..plugins.plugin_core import PluginCore
+from ..utils.memory import MemoryItem
+from ..utils.session import recorder
+from ..utils.timing import timer
 from ..utils.widgets import AbstractWidget
 
 from .ViewerElement import ViewerElement, LinkableItem, SliderItem
 from .Image2D import Image2D
 from .Plot1D import Plot1D
 from .SmartSlider import SmartSlider
-from .ViewerDataLoader import ViewerDataLoader
+from .ViewerDataLoader import ViewerDataLoader, ObjectBundle, WidgetData
 from .ItemLinker import ItemLinker, XAxisLinker, YAxisLinker, SliderLinker, ColorBarLinker
 
 logger = logging.getLogger(__name__)
@@ -49,6 +52,7 @@ class DataViewer(AbstractWidget):
                  appearance: config.Appearance,
                  spectral_lines: SpectralLineData,
                  plugins: list[PluginCore],
+                 interactive: bool = True,
                  parent=None):
 
         self._global_cfg = global_cfg
@@ -59,17 +63,18 @@ class DataViewer(AbstractWidget):
         self._plugins = plugins
 
         self._zen_mode_activated: bool = False
+        self._interactive = interactive  # if False, objects are loaded without waiting for the user to skip them
 
         self._data = ViewerData()
         self.open_images()
 
-        self._widget_links: dict[LinkableItem, dict] = {item: dict() for item in LinkableItem}
         self._widget_linkers: dict[LinkableItem, ItemLinker] = dict()
         self._create_widget_linkers()
 
         self._cat: Catalog | None = None
 
         self._worker: ViewerDataLoader | None = None
+        self._generation: int = 0  # identifies the latest loading request
         self._lock: bool = False
         self._t_worker_start = None
         self._t_old_worker_start = None
@@ -125,6 +130,9 @@ class DataViewer(AbstractWidget):
         for plugin in self._plugins:
             plugin.override_widget_configs(self.widgets)
 
+        for linker in self._widget_linkers.values():
+            linker.build(self.widgets)
+
     def _delete_widget(self, wt: str):
         self._unlink_widget(wt)
         self._disconnect_widget(wt)
@@ -169,21 +177,17 @@ class DataViewer(AbstractWidget):
             LinkableItem.S_REDSHIFT: SliderLinker(SliderItem.REDSHIFT)
         }
 
-    def _link_widget(self, wt: str):
-        w0 = self.widgets[wt]
+    @property
+    def _widget_links(self) -> dict[LinkableItem, dict]:
+        return {linked_item: linker.links for linked_item, linker in self._widget_linkers.items()}
 
-        for w in self.active_widgets.values():
-            for linked_item, linker in self._widget_linkers.items():
-                linker.link(w0, w, self._widget_links[linked_item])
-                linker.link(w, w0, self._widget_links[linked_item])
+    def _link_widget(self, wt: str):
+        for linker in self._widget_linkers.values():
+            linker.attach(self.widgets[wt])
 
     def _unlink_widget(self, wt: str):
-        w0 = self.widgets[wt]
-
-        for w in self.widgets.values():
-            for linked_item, linker in self._widget_linkers.items():
-                linker.unlink(w0, w, self._widget_links[linked_item])
-                linker.unlink(w, w0, self._widget_links[linked_item])
+        for linker in self._widget_linkers.values():
+            linker.detach(self.widgets[wt])
 
     def _close_dock(self, dt: str, dock: Dock | None = None):
         if dock is None:
@@ -281,6 +285,25 @@ class DataViewer(AbstractWidget):
             self._data.open_image(filename=img_cfg.filename, loader=img_cfg.loader, wcs_source=img_cfg.wcs_source,
                                   **img_cfg.loader_params)
 
+    def memory_items(self, seen: set[int]) -> list[MemoryItem]:
+        """Report the memory held by the widgets, the loaders and the caches of the data viewer. Files that are not
+        used by any widget are idle and can be closed to release memory.
+        """
+        items = []
+        for w in self.widgets.values():
+            items.extend(w.memory_items(seen))
+
+        in_use = {str(w.data_path) for w in self.widgets.values() if w.data_path is not None}
+        items.extend(self._data.memory_items(seen, in_use=in_use))
+        items.extend(Image2D.class_memory_items(seen))
+
+        return items
+
+    @property
+    def loading(self) -> bool:
+        """Whether the loader thread is running."""
+        return self._worker is not None and self._worker.isRunning()
+
     @QtCore.Slot()
     def load_project(self):
         self._lock = True
@@ -296,9 +319,11 @@ class DataViewer(AbstractWidget):
         t_grace = self._get_t_grace()
         self._t_old_worker_start = self._t_worker_start
 
-        self._worker = ViewerDataLoader(self.widgets, j, review, self._data, self._data_cfg, cat_entry, t_grace=t_grace)
+        self._generation += 1
+        self._worker = ViewerDataLoader(self.widgets, j, review, self._data, self._data_cfg, cat_entry,
+                                        plugins=self._plugins, t_grace=t_grace, generation=self._generation)
         self.loading_aborted.connect(self._worker.abort)
-        self._worker.finished.connect(self.finalize_loading)
+        self._worker.bundle_loaded.connect(self.finalize_loading)
         self._worker.start()
 
         if self._lock:
@@ -306,27 +331,45 @@ class DataViewer(AbstractWidget):
 
     @QtCore.Slot()
     def abort_loading(self):
-        if self._worker and self._worker.isRunning():
-            self._worker.finished.disconnect(self.finalize_loading)
-
+        self._generation += 1  # discard the data that has already been loaded
         self.loading_aborted.emit()
 
     def _get_t_grace(self):
+        if not self._interactive:
+            return 0
         dt = 1000 if self._t_old_worker_start is None else self._t_worker_start - self._t_old_worker_start
         t_grace = 0.35 if 0.10 < dt < 0.35 else 0.10
         return t_grace
 
-    @QtCore.Slot()
-    def finalize_loading(self):
-        j, review, cat_entry = self._worker.j, self._worker.review, self._worker.cat_entry
-
-        self.data_loaded.emit(j, review, cat_entry, self._cat)
-
-        for plugin in self._plugins:
-            plugin.update_active_widgets(self.active_widgets, cat_entry=cat_entry)
-            plugin.update_docks(self.docks, cat_entry=cat_entry)
+    @QtCore.Slot(object)
+    def finalize_loading(self, bundle: ObjectBundle):
+        if bundle.generation != self._generation:
+            self._worker.discard(bundle)
+            logger.debug(f"Outdated object data discarded (index: {bundle.j})")
+            return
 
-        self.reset_view()
+        # apply the data to all widgets in one pass, so that the viewer is repainted only once. The view is reset by
+        # the application, so the resulting changes of the sliders and levels are not recorded as user events
+        self.setUpdatesEnabled(False)
+        with recorder.suppress():
+            try:
+                for wt, w in self.widgets.items():
+                    d = bundle.widget_data.get(wt, WidgetData())
+                    with timer.span('set_data', widget=wt):
+                        w.set_data(d.data, d.meta, d.data_path, d.data_key, d.products)
+
+                self.data_loaded.emit(bundle.j, bundle.review, bundle.cat_entry, self._cat)
+
+                for plugin in self._plugins:
+                    with timer.span(f'{plugin.name}.update_active_widgets'):
+                        plugin.update_active_widgets(self.active_widgets, cat_entry=bundle.cat_entry)
+                    with timer.span(f'{plugin.name}.update_docks'):
+                        plugin.update_docks(self.docks, cat_entry=bundle.cat_entry)
+
+                with timer.span('reset_view'):
+                    self.reset_view()
+            finally:
+                self.setUpdatesEnabled(True)
 
         self._lock = False
         self.object_loaded.emit()
@@ -357,7 +400,8 @@ class DataViewer(AbstractWidget):
 
     @QtCore.Slot()
     def reset_view(self):
-        self.view_reset.emit(self._widget_links)
+        with recorder.event('reset_view'):
+            self.view_reset.emit(self._widget_links)
 
     @QtCore.Slot()
     def request_redshift(self):
@@ -380,7 +424,8 @@ class DataViewer(AbstractWidget):
         step = self._global_cfg.redshift_small_step if small_step else self._global_cfg.redshift_step
         dz = n_steps * step * (1 + z)
 
-        self.redshift_changed.emit(z + dz)
+        with recorder.event('redshift', n_steps=n_steps, small_step=small_step):
+            self.redshift_changed.emit(z + dz)
         self.redshift_changed.disconnect()
 
     @QtCore.Slot()
@@ -413,4 +458,7 @@ class DataViewer(AbstractWidget):
 
     @QtCore.Slot()
     def free_resources(self):
+        for w in self.widgets.values():
+            if isinstance(w, Image2D):
+                w.cancel_window_reads()  # the windows are read from the files being closed
         self._data.close_all()
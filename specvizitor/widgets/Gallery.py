@@ -0,0 +1,413 @@
+import numpy as np
+import pyqtgraph as pg
+from astropy.units import Quantity
+from qtpy import QtWidgets, QtCore, QtGui
+
+from dataclasses import dataclass
+import logging
+import pathlib
+import threading
+
+from ..config import config
+from ..config import CACHE_DIR
+from ..io.catalog import Catalog
+from ..io.inspection_data import InspectionData
+from ..io.viewer_data import ViewerData
+from ..plugins.plugin_core import PluginCore
+from ..utils.image_stats import compute_image_stats
+from ..utils.memory import MemoryItem
+from ..utils.thumbnails import ThumbnailCache, hash_config, get_thumbnail_key, image_to_thumbnail, plot_to_thumbnail
+from ..utils.widgets import AbstractWidget
+
+from .ViewerElement import ViewerElement
+from .Image2D import Image2D
+from .Plot1D import Plot1D
+from .ViewerDataLoader import DataLocator
+
+
+__all__ = [
+    "ThumbnailRequest",
+    "ThumbnailRenderer",
+    "GalleryModel",
+    "Gallery"
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ThumbnailRequest:
+    generation: int
+    obj_id: str | int
+    cat_entry: Catalog | None
+    widget: ViewerElement
+    cfg_hash: str
+    size: int
+
+
+class ThumbnailRenderer:
+    """Renders thumbnails of the data of a widget, reading the data the same way as the data viewer. Thumbnails are
+    looked up in the cache before the data is read. A renderer can be used from several threads: the shared images
+    (e.g. mosaics) are opened once and read by all threads, while the files of each object are opened for the
+    thumbnail only.
+    """
+
+    def __init__(self, data_sources: config.DataSources, cache: ThumbnailCache,
+                 plugins: list[PluginCore] | None = None):
+        self.data_sources = data_sources
+        self.cache = cache
+        self.plugins: list[PluginCore] = plugins if plugins is not None else []
+
+        self._shared_data = ViewerData()
+        self._locator = DataLocator(self._shared_data, data_sources)
+        self._images_opened: bool = False
+        self._images_lock = threading.Lock()
+
+        self._lut = pg.colormap.get('viridis').getLookupTable(nPts=256)
+        self._background = pg.mkColor(pg.getConfigOption('background'))
+        self._foreground = pg.mkColor(pg.getConfigOption('foreground'))
+
+    def _open_images(self):
+        # the shared images are opened the same way as in the data viewer (see `DataViewer.open_images`)
+        with self._images_lock:
+            if self._images_opened:
+                return
+            for img_cfg in self.data_sources.images.values():
+                self._shared_data.open_image(filename=img_cfg.filename, loader=img_cfg.loader,
+                                             wcs_source=img_cfg.wcs_source, **img_cfg.loader_params)
+            self._images_opened = True
+
+    def close_images(self):
+        """Close the shared images, which are opened again when needed. No thumbnails must be rendered meanwhile."""
+        with self._images_lock:
+            self._shared_data.close_all()
+            self._locator = DataLocator(self._shared_data, self.data_sources)
+            self._images_opened = False
+
+    def memory_items(self, seen: set[int]) -> list[MemoryItem]:
+        # the shared images might be read by the rendering threads at any time, so they are not closed to free memory
+        in_use = {str(img_cfg.filename) for img_cfg in self.data_sources.images.values()}
+        in_use |= {str(img_cfg.wcs_source) for img_cfg in self.data_sources.images.values() if img_cfg.wcs_source}
+        return self._shared_data.memory_items(seen, in_use=in_use)
+
+    def render(self, request: ThumbnailRequest) -> QtGui.QImage | None:
+        w0 = request.widget
+        shared = bool(w0.cfg.data.source)
+        if shared:
+            self._open_images()
+        viewer_data = self._shared_data if shared else ViewerData()
+        try:
+            location = self._locator.locate(w0.title, w0.cfg, request.obj_id, request.cat_entry)
+            if location is None:
+                return None
+            data_path, loader_params = location
+
+            key = get_thumbnail_key(str(data_path), loader_params, request.cfg_hash, request.size)
+            image = self.cache.get(key) if key is not None else None
+            if image is not None:
+                return image
+
+            data, meta = viewer_data.load(str(data_path), loader=w0.cfg.data.loader,
+                                          allowed_dtypes=w0.allowed_data_types, **loader_params)
+            if data is None:
+                return None
+
+            for plugin in self.plugins:
+                data = plugin.transform_data(w0, data, meta, cat_entry=request.cat_entry)
+
+            image = self._render_data(w0, data, request.size)
+        except Exception as e:
+            logger.error(f"Failed to render the thumbnail: {e} (widget: {w0.title}, ID: {request.obj_id})")
+            return None
+        finally:
+            if not shared:
+                viewer_data.close_all()
+
+        if image is not None and key is not None:
+            self.cache.put(key, image)
+
+        return image
+
+    def _render_data(self, w0: ViewerElement, data, size: int) -> QtGui.QImage | None:
+        if isinstance(w0, Image2D):
+            levels = None
+            if data.ndim == 2:
+                limits_cfg = w0.cfg.color_bar.limits
+                stats = compute_image_stats(data, sample_size=limits_cfg.sample_size, method=limits_cfg.sampling,
+                                            seed=limits_cfg.seed, zscale=limits_cfg.type == 'zscale')
+                default_levels = w0.get_default_levels(stats)
+                if default_levels is not None:
+                    levels = (default_levels.min, default_levels.max)
+            return image_to_thumbnail(data, levels, self._lut, size)
+
+        if isinstance(w0, Plot1D):
+            curves = []
+            for label, line_plot in w0.cfg.plots.items():
+                x_data = w0.get_plot_data(line_plot.x, data=data)
+                y_data = w0.get_plot_data(line_plot.y, data=data)
+                if x_data is None or y_data is None:
+                    continue
+                color = self._foreground if line_plot.color is None else pg.mkColor(line_plot.color)
+                curves.append((self._to_array(x_data), self._to_array(y_data), color))
+            return plot_to_thumbnail(curves, size, self._background)
+
+        return None
+
+    @staticmethod
+    def _to_array(data) -> np.ndarray:
+        if isinstance(data, Quantity):
+            data = data.value
+        return np.asarray(data, dtype=float)
+
+
+class _ThumbnailSignals(QtCore.QObject):
+    rendered = QtCore.Signal(int, object, object)  # generation, object ID, image
+
+
+class _ThumbnailJob(QtCore.QRunnable):
+    def __init__(self, renderer: ThumbnailRenderer, request: ThumbnailRequest, signals: _ThumbnailSignals):
+        super().__init__()
+        self.renderer = renderer
+        self.request = request
+        self.signals = signals
+
+    def run(self):
+        image = self.renderer.render(self.request)
+        self.signals.rendered.emit(self.request.generation, self.request.obj_id, image)
+
+
+class GalleryModel(QtCore.QAbstractListModel):
+    """A list of objects whose rows are added in pages of `page_size` objects as the view is scrolled. The thumbnail
+    of an object is requested when the view first asks for it, i.e. when the object becomes visible.
+    """
+
+    thumbnail_requested = QtCore.Signal(object)  # object ID
+
+    page_size: int = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._ids: list = []
+        self._n_rows: int = 0
+        self._thumbnails: dict = {}  # object IDs mapped to thumbnails (None if a thumbnail could not be rendered)
+        self._requested: set = set()
+
+    def set_ids(self, ids: list):
+        self.beginResetModel()
+        self._ids = ids
+        self._n_rows = min(self.page_size, len(ids))
+        self._thumbnails, self._requested = {}, set()
+        self.endResetModel()
+
+    def clear_thumbnails(self):
+        self._thumbnails, self._requested = {}, set()
+        if self._n_rows:
+            self.dataChanged.emit(self.index(0), self.index(self._n_rows - 1), [QtCore.Qt.DecorationRole])
+
+    def set_thumbnail(self, obj_id, image: QtGui.QImage | None):
+        self._thumbnails[obj_id] = image
+        try:
+            row = self._ids.index(obj_id, 0, self._n_rows)
+        except ValueError:
+            return
+        self.dataChanged.emit(self.index(row), self.index(row), [QtCore.Qt.DecorationRole])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._n_rows
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self._n_rows < len(self._ids)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        n_new = min(self.page_size, len(self._ids) - self._n_rows)
+        if n_new <= 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._n_rows, self._n_rows + n_new - 1)
+        self._n_rows += n_new
+        self.endInsertRows()
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._n_rows:
+            return None
+
+        obj_id = self._ids[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return str(obj_id)
+        if role == QtCore.Qt.UserRole:
+            return obj_id
+        if role == QtCore.Qt.DecorationRole:
+            if obj_id in self._thumbnails:
+                return self._thumbnails[obj_id]
+            if obj_id not in self._requested:
+                self._requested.add(obj_id)
+                self.thumbnail_requested.emit(obj_id)
+        return None
+
+
+class Gallery(AbstractWidget):
+    """Thumbnails of a data widget for the objects under inspection (or for the objects in the subset being
+    inspected). Thumbnails are rendered by a pool of background threads, most recently requested first, and stored in
+    an on-disk cache. Clicking on a thumbnail opens the object in the data viewer.
+    """
+
+    id_selected = QtCore.Signal(str)
+
+    thumbnail_size: int = 160
+
+    def __init__(self, widgets: dict[str, ViewerElement], data_cfg: config.DataSources,
+                 plugins: list[PluginCore] | None = None, parent=None):
+        self._widgets = widgets
+
+        self._review: InspectionData | None = None
+        self._cat: Catalog | None = None
+        self._subset_ids: list | None = None
+
+        self._generation: int = 0
+        self._priority: int = 0
+
+        self._cache = ThumbnailCache(pathlib.Path(CACHE_DIR) / 'thumbnails')
+        self._renderer = ThumbnailRenderer(data_cfg, self._cache, plugins=plugins)
+        self._signals: _ThumbnailSignals | None = None
+
+        self._widget_selector: QtWidgets.QComboBox | None = None
+        self._view: QtWidgets.QListView | None = None
+        self._model: GalleryModel | None = None
+        self._pool: QtCore.QThreadPool | None = None
+
+        super().__init__(parent=parent)
+        self.setEnabled(False)
+
+    def init_ui(self):
+        self._widget_selector = QtWidgets.QComboBox(self)
+        self._widget_selector.setToolTip('The widget shown in the thumbnails')
+
+        self._model = GalleryModel(self)
+
+        self._view = QtWidgets.QListView(self)
+        self._view.setViewMode(QtWidgets.QListView.IconMode)
+        self._view.setResizeMode(QtWidgets.QListView.Adjust)
+        self._view.setMovement(QtWidgets.QListView.Static)
+        self._view.setUniformItemSizes(True)
+        self._view.setIconSize(QtCore.QSize(self.thumbnail_size, self.thumbnail_size))
+        self._view.setGridSize(QtCore.QSize(self.thumbnail_size + 16, self.thumbnail_size + 24))
+        self._view.setModel(self._model)
+
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, QtCore.QThread.idealThreadCount() - 1))
+        self._signals = _ThumbnailSignals(self)
+        self._signals.rendered.connect(self._thumbnail_rendered)
+
+        self._widget_selector.currentTextChanged.connect(self._widget_selected)
+        self._model.thumbnail_requested.connect(self._request_thumbnail)
+        self._view.clicked.connect(self._thumbnail_clicked)
+
+    def set_layout(self):
+        self.setLayout(QtWidgets.QVBoxLayout())
+
+    def populate(self):
+        self.layout().addWidget(self._widget_selector)
+        self.layout().addWidget(self._view)
+
+    def memory_items(self, seen: set[int]) -> list[MemoryItem]:
+        """Report the memory held by the thumbnails kept in memory and by the shared images opened to render them."""
+        items = [MemoryItem(kind='cache', name='thumbnails', nbytes=self._cache.nbytes,
+                            last_used=self._cache.last_used, release=self._cache.clear_memory)]
+        items.extend(self._renderer.memory_items(seen))
+        return items
+
+    @QtCore.Slot(InspectionData)
+    def load_project(self, review: InspectionData):
+        self._review = review
+        self.setEnabled(True)
+        self.update_widget_list()
+        self._update_ids()
+
+    @QtCore.Slot(object)
+    def receive_catalog(self, cat: Catalog | None):
+        self._cat = cat
+        self._reset_thumbnails()
+
+    @QtCore.Slot(str, object)
+    def load_subset(self, subset_path: str, subset: Catalog):
+        self._subset_ids = list(subset.get_col('id'))
+        self._update_ids()
+
+    @QtCore.Slot()
+    def stop_subset_inspection(self):
+        self._subset_ids = None
+        self._update_ids()
+
+    @QtCore.Slot()
+    def update_widget_list(self):
+        current = self._widget_selector.currentText()
+
+        self._widget_selector.blockSignals(True)
+        self._widget_selector.clear()
+        self._widget_selector.addItems(list(self._widgets))
+        self._widget_selector.blockSignals(False)
+
+        if current in self._widgets:
+            self._widget_selector.setCurrentText(current)
+        self._widget_selected()
+
+    def _update_ids(self):
+        if self._review is None:
+            return
+
+        if self._subset_ids is not None:
+            ids = [obj_id for obj_id in self._subset_ids if self._review.validate_id(obj_id)]
+            ids = [self._review.get_id(self._review.get_id_loc(obj_id)) for obj_id in ids]
+        else:
+            ids = [self._review.get_id(j) for j in range(self._review.n_objects)]
+
+        self._generation += 1
+        self._pool.clear()
+        self._model.set_ids(list(dict.fromkeys(ids)))  # drop duplicates (objects with several secondary IDs)
+
+    def _reset_thumbnails(self):
+        self._generation += 1
+        self._pool.clear()
+        self._model.clear_thumbnails()
+
+    @QtCore.Slot()
+    def _widget_selected(self):
+        self._reset_thumbnails()
+
+    @QtCore.Slot(object)
+    def _request_thumbnail(self, obj_id):
+        w0 = self._widgets.get(self._widget_selector.currentText())
+        if w0 is None or self._review is None:
+            return
+
+        full_id = self._review.get_id(self._review.get_id_loc(obj_id), full=True)
+        cat_entry = self._cat.get_cat_entry(full_id) if self._cat is not None else None
+
+        request = ThumbnailRequest(generation=self._generation, obj_id=obj_id, cat_entry=cat_entry, widget=w0,
+                                   cfg_hash=hash_config(w0.cfg), size=self.thumbnail_size)
+
+        # render the most recently requested thumbnails (i.e. those currently in view) first
+        self._priority += 1
+        self._pool.start(_ThumbnailJob(self._renderer, request, self._signals), self._priority)
+
+    @QtCore.Slot(int, object, object)
+    def _thumbnail_rendered(self, generation: int, obj_id, image: QtGui.QImage | None):
+        if generation != self._generation:
+            return  # the widget or the list of objects has changed since the thumbnail was requested
+        self._model.set_thumbnail(obj_id, image)
+
+    @QtCore.Slot(QtCore.QModelIndex)
+    def _thumbnail_clicked(self, index: QtCore.QModelIndex):
+        self.id_selected.emit(str(self._model.data(index, QtCore.Qt.UserRole)))
+
+    @QtCore.Slot()
+    def update_data_sources(self):
+        self.free_resources()
+        self._model.clear_thumbnails()
+
+    @QtCore.Slot()
+    def free_resources(self):
+        self._generation += 1
+        self._pool.clear()
+        self._pool.waitForDone()
+        self._renderer.close_images()
@@ -1,24 +1,30 @@
-from astropy.convolution import convolve_fft, Gaussian2DKernel
 from astropy.coordinates import SkyCoord
-from astropy.visualization import ZScaleInterval
 from astropy.wcs import WCS, FITSFixedWarning
 import numpy as np
 import pyqtgraph as pg
-from qtpy import QtCore, QtGui, QtWidgets
+from qtpy import QtCore, QtGui
 
 from dataclasses import dataclass
 from enum import Enum, auto
 from functools import partial
 import logging
+import math
 import warnings
 
 from ..config import data_widgets
 from ..io.catalog import Catalog
+from ..io.tiles import TiledImageReader
 from ..io.viewer_data import get_wcs
+from ..utils.image_pyramid import ImagePyramid
+from ..utils.image_stats import ImageStats, compute_image_stats, sample_histogram
+from ..utils.lru_cache import LRUCache
+from ..utils.memory import MemoryItem, get_nbytes
 from ..utils.qt_tools import get_qtransform_from_wcs
-from ..utils.widgets import ColorBar, MyTextItem
+from ..utils.smoothing import FFTGaussianSmoother
+from ..utils.source_index import SkyIndex, PixelIndex
+from ..utils.widgets import ColorBar
 
-from .ViewerElement import ViewerElement, LinkableItem
+from .ViewerElement import ViewerElement, DisplayProducts, LinkableItem
 
 
 __all__ = [
@@ -34,6 +40,83 @@ class Image2DLevels:
     max: float = 1
 
 
+@dataclass
+class Image2DProducts(DisplayProducts):
+    levels: Image2DLevels | None = None
+    stats: ImageStats | None = None
+    pyramid: ImagePyramid | None = None
+    histogram_sample: np.ndarray | None = None
+
+
+class SmoothingWorker(QtCore.QThread):
+    def __init__(self, smoother: FFTGaussianSmoother, sigma: float, pyramid: bool = False,
+                 histogram_sample_size: int | None = None):
+        super().__init__(parent=None)
+
+        self.smoother = smoother
+        self.sigma = sigma
+        self.pyramid = pyramid
+        self.histogram_sample_size = histogram_sample_size
+        self.smoothed_data: ImagePyramid | None = None
+        self.histogram_sample: np.ndarray | None = None
+
+    def run(self):
+        try:
+            smoothed_data = self.smoother.smooth(self.sigma)
+            if self.pyramid:
+                self.smoothed_data = ImagePyramid(smoothed_data).build()
+            else:
+                self.smoothed_data = ImagePyramid(smoothed_data, max_levels=1)
+            self.histogram_sample = sample_histogram(smoothed_data, sample_size=self.histogram_sample_size)
+        except Exception as e:
+            logger.error(f"Failed to smooth the image: {e}")
+
+
+class _WindowSignals(QtCore.QObject):
+    read = QtCore.Signal(int, object, object, int)  # request, window, window origin, step
+
+
+class _WindowJob(QtCore.QRunnable):
+    def __init__(self, reader: TiledImageReader, request: int, rect: tuple[float, float, float, float], step: int,
+                 signals: _WindowSignals):
+        super().__init__()
+        self.reader = reader
+        self.request = request
+        self.rect = rect
+        self.step = step
+        self.signals = signals
+
+    def run(self):
+        try:
+            window, origin = self.reader.read(*self.rect, step=self.step)
+        except Exception as e:
+            logger.error(f"Failed to read the image window: {e}")
+            window, origin = None, (0, 0)
+        self.signals.read.emit(self.request, window, origin, self.step)
+
+
+class _PixelSignals(QtCore.QObject):
+    read = QtCore.Signal(int, object)  # request, value
+
+
+class _PixelJob(QtCore.QRunnable):
+    def __init__(self, reader: TiledImageReader, request: int, x: int, y: int, signals: _PixelSignals):
+        super().__init__()
+        self.reader = reader
+        self.request = request
+        self.x, self.y = x, y
+        self.signals = signals
+
+    def run(self):
+        try:
+            # the value is not read while the file is in use: it is requested again when the mouse moves
+            value = self.reader.read_pixel(self.x, self.y, blocking=False)
+        except Exception as e:
+            logger.error(f"Failed to read the pixel value: {e}")
+            value = None
+        self.signals.read.emit(self.request, value)
+
+
 class CentralAxis(Enum):
     X = auto()
     Y = auto()
@@ -43,6 +126,23 @@ class Image2D(ViewerElement):
     allowed_data_types: tuple[type] = (np.ndarray,)
     allowed_cbar_lims: tuple[str] = ('minmax', 'zscale', 'user')
 
+    # image statistics shared by all image widgets, keyed by (file, HDU, cutout) and the sampling parameters
+    _stats_cache = LRUCache(maxsize=1024)
+
+    # downsampled levels of image pyramids, keyed by (file, HDU, cutout) and the display precision
+    _pyramid_cache = LRUCache(maxsize=8)
+
+    # sky indices of catalogues and pixel indices of the sources in each image, shared by all image widgets
+    _sky_indices = LRUCache(maxsize=4)
+    _source_indices = LRUCache(maxsize=256)
+
+    source_size: float = 5  # the size of source markers in image pixels
+    source_label_spacing: float = 40  # the minimum on-screen distance to the nearest source to show a label
+    source_click_tolerance: float = 5  # the maximum on-screen distance from a click to a selected source
+
+    histogram_sample_size: int = 40_000  # the number of pixels sampled to compute the color bar histogram
+    smoothing_cache_size: int = 256 * 2 ** 20  # the maximum memory held by smoothed images of a widget, in bytes
+
     def __init__(self, cfg: data_widgets.Image, **kwargs):
         self.cfg = cfg
 
@@ -52,8 +152,47 @@ class Image2D(ViewerElement):
         self.cbar: ColorBar | None = None
         self._default_levels: Image2DLevels | None = None
 
+        self._smoother: FFTGaussianSmoother | None = None
+        self._smoothing_worker: SmoothingWorker | None = None
+        # recently used sigmas, with the histogram samples
+        self._smoothed_data = LRUCache(maxsize=16, max_nbytes=self.smoothing_cache_size, sizeof=get_nbytes)
+        self._requested_sigma: float = 0
+
+        self._pyramid: ImagePyramid | None = None  # the displayed (possibly smoothed) image
+        self._pyramid_level: int = 0
+
+        self._source_index: PixelIndex | None = None
+        self._sources_item: pg.ScatterPlotItem | None = None
+        self._source_labels: dict[int, pg.TextItem] = {}
+
+        # the full image beyond the loaded data, read on demand when the view extends past the data
+        self._tiled_reader: TiledImageReader | None = None
+        self._window_origin: tuple[int, int] = (0, 0)
+        self._window_item: pg.ImageItem | None = None
+        self._window_step: int = 1
+        self._window_pos: tuple[int, int] = (0, 0)
+        self._window_timer: QtCore.QTimer | None = None
+        self._window_pool: QtCore.QThreadPool | None = None
+        self._window_signals: _WindowSignals | None = None
+        self._window_request: int = 0  # incremented whenever the view range changes
+
+        self._pixel_reader: TiledImageReader | None = None  # reads exact values if the precision is reduced
+        self._pixel_pos: tuple[int, int] | None = None  # the pixel under the mouse cursor
+        self._pixel_timer: QtCore.QTimer | None = None
+        self._pixel_pool: QtCore.QThreadPool | None = None
+        self._pixel_signals: _PixelSignals | None = None
+        self._pixel_request: int = 0  # incremented whenever the mouse moves to another pixel
+
         super().__init__(cfg=cfg, **kwargs)
 
+    @property
+    def uses_tiled_reads(self) -> bool:
+        return self.cfg.tiles
+
+    @property
+    def display_precision(self) -> str:
+        return self.cfg.precision
+
     def init_ui(self):
         super().init_ui()
 
@@ -64,9 +203,43 @@ class Image2D(ViewerElement):
         self.image_item.setBorder('k')  # add a border to the image
 
         self.cbar = ColorBar(imageItem=self.image_item, showHistogram=True, histHeightPercentile=99.0)
+        self.cbar.session_fields = {'widget': self.title}
         self.cbar.setVisible(self.cfg.color_bar.visible)
         self.cbar.axisItem.setVisible(False)
 
+        self._graphics_view.scene().sigMouseClicked.connect(self._select_source)
+        self._graphics_view.scene().sigMouseMoved.connect(self._show_pixel_value)
+        self.container.vb.sigTransformChanged.connect(self._update_source_labels)
+        self.container.vb.sigTransformChanged.connect(self._update_pyramid_level)
+
+        self._window_item = pg.ImageItem()
+        self._window_item.setLookupTable(self._cmap.getLookupTable())
+        self._window_item.setZValue(-1)  # below the loaded data
+        self.cbar.sigLevelsChanged.connect(self._window_item.setLevels)
+
+        # read the image window once the view range stops changing
+        self._window_timer = QtCore.QTimer(self)
+        self._window_timer.setSingleShot(True)
+        self._window_timer.setInterval(50)
+        self._window_timer.timeout.connect(self._update_window)
+        self.container.vb.sigRangeChanged.connect(self._schedule_window_update)
+
+        # windows are read in the background (the file might be in use by the loader thread), the latest request first
+        self._window_pool = QtCore.QThreadPool(self)
+        self._window_pool.setMaxThreadCount(1)
+        self._window_signals = _WindowSignals(self)
+        self._window_signals.read.connect(self._window_read)
+
+        # pixel values that are not cached are read in the background once the mouse stops moving
+        self._pixel_timer = QtCore.QTimer(self)
+        self._pixel_timer.setSingleShot(True)
+        self._pixel_timer.setInterval(50)
+        self._pixel_timer.timeout.connect(self._read_pixel_value)
+        self._pixel_pool = QtCore.QThreadPool(self)
+        self._pixel_pool.setMaxThreadCount(1)
+        self._pixel_signals = _PixelSignals(self)
+        self._pixel_signals.read.connect(self._pixel_value_read)
+
     def populate(self):
         super().populate()
 
@@ -81,63 +254,205 @@ class Image2D(ViewerElement):
         nx, ny = self.data.shape[1], self.data.shape[0]
 
         if axis is CentralAxis.X:
-            self.register_item((pg.PlotCurveItem([0, nx], [ny / 2, ny / 2], pen=pen)))
+            self.acquire_item('central_axis_x', partial(pg.PlotCurveItem, pen=pen)).setData([0, nx], [ny / 2, ny / 2])
         elif axis is CentralAxis.Y:
-            self.register_item((pg.PlotCurveItem([nx / 2, nx / 2], [0, ny], pen=pen)))
+            self.acquire_item('central_axis_y', partial(pg.PlotCurveItem, pen=pen)).setData([nx / 2, nx / 2], [0, ny])
 
     def _add_central_crosshair(self):
         pen = pg.mkPen('w', width=1, style=QtCore.Qt.DashLine)
         x0, y0 = self.data.shape[1] // 2, self.data.shape[0] // 2
         dx, dy = 0.15 * x0, 0.15 * y0
 
-        self.register_item(pg.PlotCurveItem([0, x0 - dx], [y0, y0], pen=pen))
-        self.register_item(pg.PlotCurveItem([x0, x0], [0, y0 - dy], pen=pen))
+        self.acquire_item('crosshair_x', partial(pg.PlotCurveItem, pen=pen)).setData([0, x0 - dx], [y0, y0])
+        self.acquire_item('crosshair_y', partial(pg.PlotCurveItem, pen=pen)).setData([x0, x0], [0, y0 - dy])
 
-    def _add_sources(self, cat: Catalog):
+    @staticmethod
+    def _get_screen_pixel_size(item: pg.GraphicsItem) -> float | None:
+        """Return the size of a screen pixel in the item coordinates (the largest of the two axes)."""
+        lengths = item.pixelLength(QtCore.QPointF(1, 0)), item.pixelLength(QtCore.QPointF(0, 1))
+        if None in lengths:
+            return None
+        return max(lengths)
+
+    def _get_sky_index(self, cat: Catalog) -> SkyIndex:
+        cached = self._sky_indices.get(id(cat))
+        if cached is not None and cached[0] is cat:
+            return cached[1]
+
+        sky_index = SkyIndex(cat.get_col("ra"), cat.get_col("dec"))
+        self._sky_indices.put(id(cat), (cat, sky_index))
+
+        return sky_index
+
+    def _get_source_index(self, cat: Catalog) -> PixelIndex | None:
         try:
-            ra = cat.get_col("ra")
-            dec = cat.get_col("dec")
+            sky_index = self._get_sky_index(cat)
         except KeyError as e:
             logger.error(e)
-            return
+            return None
+
+        key = None
+        if self.data_key is not None:
+            key = (self.data_key, sky_index.uid)
+            source_index = self._source_indices.get(key)
+            if source_index is not None:
+                return source_index
 
         try:
             wcs = get_wcs(self.meta)
         except Exception as e:
             logger.error(f"Failed to create the WCS object: {e} (widget: {self.title})")
-            return
+            return None
 
+        nx, ny = self.data.shape[1], self.data.shape[0]
         try:
-            coord = SkyCoord(ra=ra, dec=dec, unit="deg")
+            # select the sources within the circle enclosing the image and only convert those to pixel coordinates
+            footprint = wcs.pixel_to_world(np.array([(nx - 1) / 2, -0.5, nx - 0.5, -0.5, nx - 0.5]),
+                                           np.array([(ny - 1) / 2, -0.5, -0.5, ny - 0.5, ny - 0.5])).icrs
+            radius = footprint[0].separation(footprint[1:]).deg.max()
+            candidates = sky_index.query_cone(footprint[0].ra.deg, footprint[0].dec.deg, 1.01 * radius)
+
+            coord = SkyCoord(ra=sky_index.ra[candidates], dec=sky_index.dec[candidates], unit="deg")
             x, y = wcs.world_to_pixel(coord)
         except Exception as e:
             logger.error(f"Failed to calculate pixel coordinates of the sources: {e}")
-            return
+            return None
 
-        nx, ny = self.data.shape[1], self.data.shape[0]
         mask = (x >= 0) & (x < nx) & (y >= 0) & (y < ny)
-        x, y = x[mask], y[mask]
-        source_ids = cat.get_col("id")[mask]
+        source_index = PixelIndex(x[mask], y[mask], np.asarray(cat.get_col("id"))[candidates[mask]])
+        if key is not None:
+            self._source_indices.put(key, source_index)
 
-        s = 5
-        for sid, xi, yi in zip(source_ids, x, y):
-            reg_item = QtWidgets.QGraphicsEllipseItem(xi-s/2+0.5, yi-s/2+0.5, s, s)
-            self.register_item(reg_item)
+        return source_index
 
-            text_item = MyTextItem(text=str(sid))
-            self.register_item(text_item)
-            text_item.setPos(xi, yi)
-            text_item.clicked.connect(partial(self.id_selected.emit, str(sid)))
-            text_item.color_changed.connect(partial(self._set_reg_color, reg_item))
-            text_item.setColor("w")
+    def _add_sources(self, cat: Catalog):
+        self._source_index = self._get_source_index(cat)
+        if not self._source_index:
+            return
+
+        self._sources_item = self.acquire_item('sources', partial(pg.ScatterPlotItem, pxMode=False, symbol='o',
+                                                                  brush=None))
+        self._sources_item.setData(x=self._source_index.x + 0.5, y=self._source_index.y + 0.5, size=self.source_size,
+                                   pen=pg.mkPen('w', width=2))
+        self._update_source_labels()
+
+    @QtCore.Slot()
+    def _update_source_labels(self):
+        if self._sources_item is None or self._sources_item.scene() is None:
+            return
+
+        view_rect = self._sources_item.viewRect()
+        pixel_size = self._get_screen_pixel_size(self._sources_item)
+        if view_rect is None or not pixel_size:
+            return
+
+        # only label the sources in the view that are far enough from their neighbours at the current zoom level
+        in_view = self._source_index.query_rect(view_rect.left(), view_rect.top(), view_rect.right(),
+                                                view_rect.bottom())
+        legible = in_view[self._source_index.spacing[in_view] / pixel_size >= self.source_label_spacing]
+        legible = set(legible.tolist())
+
+        for i, label in self._source_labels.items():
+            label.setVisible(i in legible)
+
+        for i in legible - self._source_labels.keys():
+            label = self.acquire_item('source_label', pg.TextItem)
+            label.setText(str(self._source_index.ids[i]), color='w')
+            label.setPos(self._source_index.x[i], self._source_index.y[i])
+            self._source_labels[i] = label
 
     @QtCore.Slot(object)
-    def _set_reg_color(self, reg_item: QtWidgets.QGraphicsItem, color):
-        reg_item.setPen(pg.mkPen(color, width=2))
+    def _select_source(self, event):
+        if self._sources_item is None or self._sources_item.scene() is None:
+            return
+        if event.button() != QtCore.Qt.LeftButton:
+            return
+
+        pos = self._sources_item.mapFromScene(event.scenePos())
+        pixel_size = self._get_screen_pixel_size(self._sources_item) or 0
+        max_distance = max(self.source_size / 2, self.source_click_tolerance * pixel_size)
+
+        i = self._source_index.nearest(pos.x() - 0.5, pos.y() - 0.5, max_distance)
+        if i is None:
+            return
+
+        self._sources_item.points()[i].setPen(pg.mkPen('r', width=2))
+        if i in self._source_labels:
+            self._source_labels[i].setColor('r')
+
+        self.id_selected.emit(str(self._source_index.ids[i]))
+
+    def _get_pixel_reader(self, x: int, y: int) -> TiledImageReader | None:
+        ny, nx = self.data.shape[:2]
+        if 0 <= x < nx and 0 <= y < ny:
+            return self._pixel_reader  # only set if the image is displayed at a reduced precision
+        return self._tiled_reader  # outside the loaded data, the value is read from the full image
+
+    def get_pixel_value(self, x: int, y: int):
+        """Return the exact value of a pixel of the image, or None if the pixel is outside the image or if its value
+        cannot be obtained without reading the file (in which case it is read in the background when hovered over).
+        @param x, y: the pixel coordinates in the loaded data
+        """
+        ny, nx = self.data.shape[:2]
+        if 0 <= x < nx and 0 <= y < ny and self._pixel_reader is None:
+            return self.data[y, x]
+
+        reader = self._get_pixel_reader(x, y)
+        if reader is None:
+            return None
+
+        x0, y0 = self._window_origin
+        return reader.get_cached_pixel(x + x0, y + y0)
+
+    @QtCore.Slot(object)
+    def _show_pixel_value(self, pos: QtCore.QPointF):
+        if self.data is None or not self.container.vb.sceneBoundingRect().contains(pos):
+            self._pixel_pos = None
+            self._graphics_view.setToolTip('')
+            return
+
+        inverted, invertible = self._qtransform.inverted()
+        if not invertible:
+            return
+
+        p = inverted.map(self.container.vb.mapSceneToView(pos))
+        x, y = math.floor(p.x()), math.floor(p.y())
+        if (x, y) == self._pixel_pos:
+            return
+        self._pixel_pos = (x, y)
+        self._pixel_request += 1  # the value requested for the previous pixel is outdated
+
+        value = self.get_pixel_value(x, y)
+        if value is None and self._get_pixel_reader(x, y) is not None:
+            self._pixel_timer.start()
+        self._graphics_view.setToolTip('' if value is None else f"({x}, {y}): {value}")
+
+    @QtCore.Slot()
+    def _read_pixel_value(self):
+        if self.data is None or self._pixel_pos is None:
+            return
+
+        x, y = self._pixel_pos
+        reader = self._get_pixel_reader(x, y)
+        if reader is None:
+            return
+
+        x0, y0 = self._window_origin
+        self._pixel_pool.clear()  # values not being read yet are outdated
+        self._pixel_pool.start(_PixelJob(reader, self._pixel_request, x + x0, y + y0, self._pixel_signals))
+
+    @QtCore.Slot(int, object)
+    def _pixel_value_read(self, request: int, value):
+        if request != self._pixel_request or value is None:
+            return  # the mouse has moved to another pixel, or the value could not be read
+
+        x, y = self._pixel_pos
+        self._graphics_view.setToolTip(f"({x}, {y}): {value}")
 
     def add_content(self, cat: Catalog | None):
-        self.image_item.setImage(self.data, autoLevels=False)
-        self.register_item(self.image_item)
+        self.acquire_item('image', lambda: self.image_item)
+        self._show_pyramid(self.products.pyramid, self.products.histogram_sample)
+        self._smoother = FFTGaussianSmoother(self.data, max_sigma=self.cfg.smoothing_slider.max_value)
 
         if self.cfg.central_axes.x:
             self._add_central_axes(CentralAxis.X)
@@ -150,41 +465,174 @@ class Image2D(ViewerElement):
         if self.cfg.show_sources and cat is not None:
             self._add_sources(cat)
 
-    @property
-    def has_defined_levels(self) -> bool:
-        return np.any(np.isfinite(self.data)) and np.any(np.nonzero(self.data))
+        self._tiled_reader = self.products.tiled_reader
+        self._pixel_reader = self.products.pixel_reader
+        self._window_origin = self.products.window_origin
+        if self._tiled_reader is not None:
+            self.acquire_item('window', lambda: self._window_item).setVisible(False)
+
+    def get_image_stats(self, data: np.ndarray, data_key: tuple | None = None) -> ImageStats:
+        limits_cfg = self.cfg.color_bar.limits
+        zscale = limits_cfg.type == 'zscale'
+
+        key = None
+        if data_key is not None:
+            key = (data_key, limits_cfg.sample_size, limits_cfg.sampling, limits_cfg.seed)
+            stats: ImageStats | None = self._stats_cache.get(key)
+            if stats is not None and (stats.zscale is not None or not zscale):
+                return stats
+
+        stats = compute_image_stats(data, sample_size=limits_cfg.sample_size, method=limits_cfg.sampling,
+                                    seed=limits_cfg.seed, zscale=zscale)
+        if key is not None:
+            self._stats_cache.put(key, stats)
+
+        return stats
+
+    def get_image_pyramid(self, data: np.ndarray, data_key: tuple | None = None) -> ImagePyramid:
+        if not self.cfg.pyramid:
+            return ImagePyramid(data, max_levels=1)
+
+        pyramid = ImagePyramid(data)
+        key = data_key + (self.cfg.precision,) if data_key is not None else None
+        cached_levels = self._pyramid_cache.get(key) if key is not None else None
+        if cached_levels is not None:
+            pyramid.levels.extend(cached_levels)
+            return pyramid
+
+        pyramid.build()
+        if key is not None:
+            self._pyramid_cache.put(key, pyramid.levels[1:])
+
+        return pyramid
+
+    def _get_view_scale(self) -> float | None:
+        """Return the number of image pixels per screen pixel."""
+        if self.image_item.scene() is not None:
+            pixel_size = self._get_screen_pixel_size(self.image_item)
+            if pixel_size:
+                return pixel_size * 2 ** self._pyramid_level
+
+        # the view is not set up yet: assume that the image fits the view box
+        view_rect = self.container.vb.boundingRect()
+        if self._pyramid is None or view_rect.isEmpty():
+            return None
+        ny, nx = self._pyramid.data.shape[:2]
+        return max(nx / view_rect.width(), ny / view_rect.height())
+
+    def _set_image_transform(self):
+        # pixels of the pyramid level are 2^k pixels of the original image
+        scale = 2 ** self._pyramid_level
+        self.image_item.setTransform(QtGui.QTransform.fromScale(scale, scale) * self._qtransform)
+
+    def _show_pyramid(self, pyramid: ImagePyramid, histogram_sample: np.ndarray | None = None):
+        if histogram_sample is not None:
+            self.cbar.set_histogram_sample(histogram_sample)  # set before the image, which triggers a redraw
+
+        self._pyramid = pyramid
+        self._pyramid_level = pyramid.level_for_scale(self._get_view_scale())
+
+        self.image_item.setImage(pyramid.level(self._pyramid_level), autoLevels=False)
+        self._set_image_transform()
+
+    @QtCore.Slot()
+    def _update_pyramid_level(self):
+        if self._pyramid is None or self._pyramid.n_levels == 1:
+            return
 
-    def setup_view(self, cat_entry: Catalog | None):
-        self.set_qtransform(cat_entry)
-        self.set_default_range((0., float(self.data.shape[1])), (0., float(self.data.shape[0])),
-                               apply_qtransform=True)
-
-        # compute default image levels
-        if self.has_defined_levels:
-            limits_cfg = self.cfg.color_bar.limits
-            if limits_cfg.type not in self.allowed_cbar_lims:
-                logger.error(f'Unknown type of colorbar limits: {limits_cfg}.'
-                             f'Supported types: {self.allowed_cbar_lims}')
-            else:
-                if limits_cfg.type == 'minmax':
-                    l1, l2 = np.nanmin(self.data), np.nanmax(self.data)
-                elif limits_cfg.type == 'zscale':
-                    l1, l2 = ZScaleInterval().get_limits(self.data)
-                else:
-                    l1 = limits_cfg.min if limits_cfg.min is not None else np.nanmin(self.data)
-                    l2 = limits_cfg.max if limits_cfg.max is not None else np.nanmax(self.data)
+        level = self._pyramid.level_for_scale(self._get_view_scale())
+        if level != self._pyramid_level:
+            self._show_pyramid(self._pyramid)
+            logger.debug(f"Image pyramid level changed (level: {level}, widget: {self.title})")
 
-                self.set_default_levels((l1, l2))
+    @QtCore.Slot()
+    def _schedule_window_update(self):
+        if self._tiled_reader is not None:
+            self._window_request += 1  # windows requested for the previous view range are outdated
+            self._window_timer.start()
 
-        super().setup_view(cat_entry)
+    @QtCore.Slot()
+    def _update_window(self):
+        if self._tiled_reader is None or self._window_item.scene() is None:
+            return
+
+        inverted, invertible = self._qtransform.inverted()
+        screen_rect = self.container.vb.boundingRect()
+        if not invertible or screen_rect.isEmpty():
+            return
+
+        # the view range in the pixel coordinates of the loaded data
+        view_rect = inverted.mapRect(self.container.vb.viewRect())
+        if QtCore.QRectF(0, 0, self.data.shape[1], self.data.shape[0]).contains(view_rect):
+            self._window_item.setVisible(False)
+            return
+
+        scale = max(view_rect.width() / screen_rect.width(), view_rect.height() / screen_rect.height())
+        step = 2 ** math.floor(math.log2(scale)) if scale >= 2 else 1
+
+        x0, y0 = self._window_origin
+        rect = (view_rect.left() + x0, view_rect.right() + x0, view_rect.top() + y0, view_rect.bottom() + y0)
+
+        self._window_pool.clear()  # windows not being read yet are outdated
+        self._window_pool.start(_WindowJob(self._tiled_reader, self._window_request, rect, step, self._window_signals))
 
-    def set_qtransform(self, cat_entry: Catalog | None):
+    @QtCore.Slot(int, object, object, int)
+    def _window_read(self, request: int, window: np.ndarray | None, origin: tuple[int, int], step: int):
+        if request != self._window_request or self._tiled_reader is None:
+            return  # the view range or the image has changed since the window was requested
+
+        if window is None:
+            self._window_item.setVisible(False)
+            return
+
+        x0, y0 = self._window_origin
+        self._window_item.setImage(window, autoLevels=False, levels=self.cbar.getLevels())
+        self._window_step, self._window_pos = step, (origin[0] - x0, origin[1] - y0)
+        self._set_window_transform()
+        self._window_item.setVisible(True)
+
+    def cancel_window_reads(self):
+        """Discard the requested windows and pixel values and block until the ones being read (if any) are read.
+        """
+        self._window_request += 1
+        self._window_pool.clear()
+        self._window_pool.waitForDone()
+
+        self._pixel_request += 1
+        self._pixel_pool.clear()
+        self._pixel_pool.waitForDone()
+
+    def _set_window_transform(self):
+        step, (x, y) = self._window_step, self._window_pos
+        self._window_item.setTransform(QtGui.QTransform(step, 0, 0, step, x, y) * self._qtransform)
+
+    def get_default_levels(self, stats: ImageStats) -> Image2DLevels | None:
+        if not stats.has_defined_levels:
+            return None
+
+        limits_cfg = self.cfg.color_bar.limits
+        if limits_cfg.type not in self.allowed_cbar_lims:
+            logger.error(f'Unknown type of colorbar limits: {limits_cfg}.'
+                         f'Supported types: {self.allowed_cbar_lims}')
+            return None
+
+        if limits_cfg.type == 'minmax':
+            l1, l2 = stats.min, stats.max
+        elif limits_cfg.type == 'zscale':
+            l1, l2 = stats.zscale
+        else:
+            l1 = limits_cfg.min if limits_cfg.min is not None else stats.min
+            l2 = limits_cfg.max if limits_cfg.max is not None else stats.max
+
+        return Image2DLevels(min=l1, max=l2)
+
+    def create_qtransform(self, meta, cat_entry: Catalog | None) -> QtGui.QTransform:
         qtransform = QtGui.QTransform()
 
-        if self.cfg.wcs_transform and self.meta is not None:
+        if self.cfg.wcs_transform and meta is not None:
             with warnings.catch_warnings():
                 warnings.simplefilter('ignore', FITSFixedWarning)
-                w = WCS(self.meta)
+                w = WCS(meta)
 
             qtransform *= get_qtransform_from_wcs(w)
 
@@ -198,31 +646,78 @@ class Image2D(ViewerElement):
         if rotation_angle:
             qtransform = qtransform.rotate(rotation_angle)
 
-        self._qtransform = qtransform
+        return qtransform
+
+    def prepare_display(self, data: np.ndarray, meta, data_key: tuple | None = None,
+                        cat_entry: Catalog | None = None) -> Image2DProducts:
+        products = Image2DProducts(axes=self.create_axes(), qtransform=self.create_qtransform(meta, cat_entry))
+
+        x1, y1 = products.qtransform.map(0., 0.)
+        x2, y2 = products.qtransform.map(float(data.shape[1]), float(data.shape[0]))
+        products.axes.x.limits, products.axes.y.limits = (x1, x2), (y1, y2)
+
+        products.stats = self.get_image_stats(data, data_key)
+        products.levels = self.get_default_levels(products.stats)
+        products.pyramid = self.get_image_pyramid(data, data_key)
+        products.histogram_sample = sample_histogram(data, sample_size=self.histogram_sample_size)
+
+        return products
+
+    def setup_view(self, cat_entry: Catalog | None):
+        if self.products.levels is not None:
+            self.set_default_levels((self.products.levels.min, self.products.levels.max))
+
+        super().setup_view(cat_entry)
 
     def set_default_levels(self, levels: tuple[float, float]):
         self._default_levels.min = levels[0]
         self._default_levels.max = levels[1]
 
     def set_levels(self, levels: tuple[float, float]):
-        self.cbar.setLevels(levels)
-        self.cbar._updateHistogram()  # the histogram is calculated using the current image levels
+        self.cbar.setLevels(levels)  # the histogram, which spans the levels, is redrawn by the color bar
 
     def apply_qtransform(self, **kwargs):
         super().apply_qtransform(**kwargs)
+        self._set_image_transform()
+        self._set_window_transform()
         self.container.setAspectLocked(lock=True, ratio=self._qtransform.m22() / self._qtransform.m11())
 
     def smooth_data(self, sigma: float):
-        if sigma > 0:
-            gauss_kernel = Gaussian2DKernel(sigma)
+        self._requested_sigma = sigma
 
-            # FFT algorithm is faster for large arrays (n > 500), which is a typical case for astronomy images
-            smoothed_data = convolve_fft(self.data, gauss_kernel, preserve_nan=True)
-            logger.debug(f"Image smoothing applied (sigma: {sigma:.2f}, widget: {self.title})")
-        else:
-            smoothed_data = self.data
+        if sigma <= 0 or self._smoother is None:
+            if self.products is not None:
+                self._show_pyramid(self.products.pyramid, self.products.histogram_sample)
+            return
+
+        smoothed_data = self._smoothed_data.get(sigma)
+        if smoothed_data is not None:
+            self._show_pyramid(*smoothed_data)
+            return
 
-        self.image_item.setImage(smoothed_data, autoLevels=False)
+        # the latest value wins: if the image is being smoothed, the requested sigma is picked up once it's done
+        if self._smoothing_worker is None:
+            self._start_smoothing_worker(sigma)
+
+    def _start_smoothing_worker(self, sigma: float):
+        worker = SmoothingWorker(self._smoother, sigma, pyramid=self.cfg.pyramid,
+                                 histogram_sample_size=self.histogram_sample_size)
+        worker.finished.connect(partial(self._smoothing_finished, worker))
+        self._smoothing_worker = worker
+        worker.start()
+
+    def _smoothing_finished(self, worker: SmoothingWorker):
+        self._smoothing_worker = None
+        worker.wait()
+
+        if self._smoother is None:
+            return
+
+        if worker.smoother is self._smoother and worker.smoothed_data is not None:
+            self._smoothed_data.put(worker.sigma, (worker.smoothed_data, worker.histogram_sample))
+            logger.debug(f"Image smoothing applied (sigma: {worker.sigma:.2f}, widget: {self.title})")
+
+        self.smooth_data(self._requested_sigma)
 
     def reset_levels(self):
         self.set_levels((self._default_levels.min, self._default_levels.max))
@@ -237,6 +732,43 @@ class Image2D(ViewerElement):
         if self.title not in widget_links.get(LinkableItem.COLORBAR, dict()):
             self.reset_levels()
 
+    def _get_memory_objects(self) -> list:
+        return super()._get_memory_objects() + [self._pyramid, self._smoother, self._source_index]
+
+    def _get_caches(self) -> dict[str, LRUCache]:
+        return {'smoothed data': self._smoothed_data}
+
+    @classmethod
+    def class_memory_items(cls, seen: set[int]) -> list[MemoryItem]:
+        """Report the memory held by the caches shared by all image widgets."""
+        caches = {'image statistics': cls._stats_cache, 'image pyramids': cls._pyramid_cache,
+                  'sky indices': cls._sky_indices, 'source indices': cls._source_indices}
+        return [MemoryItem(kind='cache', name=name, nbytes=get_nbytes(cache, seen), last_used=cache.last_used,
+                           release=cache.clear) for name, cache in caches.items()]
+
+    def clear_content(self):
+        super().clear_content()
+
+        self._smoother = None
+        self._smoothed_data.clear()
+        self._pyramid = None
+        self.cbar.set_histogram_sample(None)
+
+        self._tiled_reader = None
+        self._window_request += 1
+        self._window_pool.clear()
+        self._window_item.clear()
+
+        self._pixel_reader = None
+        self._pixel_pos = None
+        self._pixel_request += 1
+        self._pixel_pool.clear()
+        self._graphics_view.setToolTip('')
+
+        self._source_index = None
+        self._sources_item = None
+        self._source_labels = {}
+
     def _enter_zen_mode(self):
         super()._enter_zen_mode()
         self.cbar.setVisible(False)
@@ -1,11 +1,16 @@
+from qtpy import QtCore
+
 import abc
+from functools import partial
 import logging
+from typing import Any, Callable
 
 from .ViewerElement import ViewerElement, SliderItem
 from .Image2D import Image2D
 
 
 __all__ = [
+    "LinkGroup",
     "ItemLinker",
     "XAxisLinker",
     "YAxisLinker",
@@ -16,8 +21,93 @@ __all__ = [
 logger = logging.getLogger(__name__)
 
 
+class LinkGroup:
+    """A group of widgets sharing the value of a linked item (e.g. a slider). A value changed by one member is pushed
+    to the other members immediately, unless a value has already been pushed less than `interval` ms ago, in which
+    case only the latest value is pushed at the end of the interval. The value is never pushed back to its sender,
+    and changes caused by pushing the value are ignored.
+    """
+
+    def __init__(self, titles: list[str], push: Callable[[ViewerElement, Any], None], interval: int = 16):
+        """
+        @param titles: the titles of the widgets in the group, starting with those that the other widgets follow
+        @param push: the function setting the value of a member
+        @param interval: the minimum time between two pushes, in milliseconds
+        """
+        self.titles = titles
+        self.members: dict[str, ViewerElement] = {}  # the members attached to the viewer
+
+        self._push = push
+        self._value = None
+        self._sender: str | None = None
+        self._pending: bool = False
+        self._propagating: bool = False
+
+        self._timer = QtCore.QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._flush)
+
+    @property
+    def anchor(self) -> ViewerElement | None:
+        """The attached member that the other members follow."""
+        for title in self.titles:
+            if title in self.members:
+                return self.members[title]
+        return None
+
+    @property
+    def links(self) -> dict[str, str]:
+        """The titles of the attached members mapped to the title of the anchor (the anchor itself excluded)."""
+        anchor = self.anchor
+        return {title: anchor.title for title in self.members if title != anchor.title} if anchor else {}
+
+    def submit(self, sender: str, value):
+        if self._propagating:
+            return  # the value is being pushed to the members
+
+        self._value, self._sender = value, sender
+
+        if self._timer.isActive():
+            self._pending = True
+            return
+
+        self._propagate()
+        self._timer.start()
+
+    def _flush(self):
+        if self._pending:
+            self._pending = False
+            self._propagate()
+            self._timer.start()
+
+    def _propagate(self):
+        self._propagating = True
+        try:
+            for title, w in list(self.members.items()):
+                if title != self._sender:
+                    self._push(w, self._value)
+        finally:
+            self._propagating = False
+
+    def clear(self):
+        self._timer.stop()
+        self._pending = False
+        self.members = {}
+
+
 class ItemLinker(abc.ABC):
+    """Links an item (an axis, a slider or a color bar) of widgets. Link groups are built once from the widget
+    configurations (widgets linked directly or through other widgets form a group); widgets join their groups when
+    attached to the viewer and leave them when detached.
+    """
+
     allowed_widget_type: type[ViewerElement] = ViewerElement
+    propagation_interval: int = 16  # at most one update of the linked widgets per frame (at 60 FPS)
+
+    def __init__(self):
+        self._groups: dict[str, LinkGroup] = {}  # widget titles mapped to their groups
+        self._slots: dict[str, Callable] = {}
 
     def _validate(self, *args):
         if any(not isinstance(a, self.allowed_widget_type) for a in args):
@@ -28,57 +118,138 @@ class ItemLinker(abc.ABC):
     def _get_link_from_cfg(self, w1: ViewerElement) -> str:
         pass
 
-    @abc.abstractmethod
-    def _link(self, w1: ViewerElement, w2: ViewerElement):
-        pass
-
-    def link(self, w1: ViewerElement, w2: ViewerElement, links: dict):
-        if not self._validate(w1, w2):
-            return
-        if not self._get_link_from_cfg(w1) == w2.title:
+    @property
+    def groups(self) -> list[LinkGroup]:
+        return list({id(g): g for g in self._groups.values()}.values())
+
+    @property
+    def links(self) -> dict[str, str]:
+        """The titles of linked widgets mapped to the titles of the widgets they follow."""
+        links = {}
+        for group in self.groups:
+            links.update(group.links)
+        return links
+
+    def build(self, widgets: dict[str, ViewerElement]):
+        for group in self.groups:
+            group.clear()
+        self._groups, self._slots = {}, {}
+
+        links = {}
+        for title, w in widgets.items():
+            if not self._validate(w):
+                continue
+            link = self._get_link_from_cfg(w)
+            if not link or link not in widgets or not self._validate(widgets[link]):
+                continue
+            if link == title:
+                logger.error(f"Cannot link a widget to itself (widget: {title}, linker: {type(self).__name__})")
+                continue
+            links[title] = link
+
+        def depth(title: str) -> int:
+            # the number of links to follow to reach a widget that is not linked further
+            visited = {title}
+            while title in links and links[title] not in visited:
+                title = links[title]
+                visited.add(title)
+            return len(visited) - 1
+
+        components: dict[str, list[str]] = {}
+        for title in widgets:
+            if title in links or title in links.values():
+                key = min(self._get_component(title, links), key=list(widgets).index)
+                components.setdefault(key, []).append(title)
+
+        for titles in components.values():
+            titles.sort(key=depth)  # stable, so widgets with the same depth keep their order
+            group = LinkGroup(titles, push=self._push, interval=self.propagation_interval)
+            for title in titles:
+                self._groups[title] = group
+            logger.debug(f"Link group created (widgets: {', '.join(titles)}, linker: {type(self).__name__})")
+
+    @staticmethod
+    def _get_component(title: str, links: dict[str, str]) -> set[str]:
+        component, stack = set(), [title]
+        while stack:
+            t = stack.pop()
+            if t in component:
+                continue
+            component.add(t)
+            stack.extend(t2 for t1, t2 in links.items() if t1 == t)
+            stack.extend(t1 for t1, t2 in links.items() if t2 == t)
+        return component
+
+    def attach(self, w: ViewerElement):
+        group = self._groups.get(w.title)
+        if group is None or w.title in group.members:
             return
 
-        if w1.title == w2.title:
-            logger.error(f"Cannot link a widget to itself (widget: {w1.title}, linker: {type(self).__name__})")
+        group.members[w.title] = w
+        self._connect(group, w)
+        logger.debug(f"Widget linked (widget: {w.title}, group: {', '.join(group.members)}, "
+                     f"linker: {type(self).__name__})")
+
+    def detach(self, w: ViewerElement):
+        group = self._groups.get(w.title)
+        if group is None or group.members.get(w.title) is not w:
             return
 
-        self._link(w1, w2)
-        links[w1.title] = w2.title
-        logger.debug(f"Widgets linked (link: {w1.title} --> {w2.title}, linker: {type(self).__name__})")
+        group.members.pop(w.title)
+        self._disconnect(group, w)
+        logger.debug(f"Widget unlinked (widget: {w.title}, linker: {type(self).__name__})")
+
+    def _connect(self, group: LinkGroup, w: ViewerElement):
+        slot = partial(group.submit, w.title)
+        self._get_signal(w).connect(slot)
+        self._slots[w.title] = slot
+
+    def _disconnect(self, group: LinkGroup, w: ViewerElement):
+        self._get_signal(w).disconnect(self._slots.pop(w.title))
+
+    def _get_signal(self, w: ViewerElement):
+        raise NotImplementedError
+
+    def _push(self, w: ViewerElement, value):
+        raise NotImplementedError
+
+
+class AxisLinker(ItemLinker):
+    """Axes of the widgets in a group are linked to the axis of the anchor. View ranges are propagated by pyqtgraph,
+    which already blocks echoes and repaints the linked views once.
+    """
 
     @abc.abstractmethod
-    def _unlink(self, w1: ViewerElement, w2: ViewerElement):
+    def _link_axis(self, w: ViewerElement, anchor: ViewerElement | None):
         pass
 
-    def unlink(self, w1: ViewerElement, w2: ViewerElement, links: dict):
-        if not links.get(w1.title) == w2.title:
-            return
+    def _relink(self, group: LinkGroup):
+        anchor = group.anchor
+        for w in group.members.values():
+            self._link_axis(w, None if w is anchor else anchor)
 
-        self._unlink(w1, w2)
-        links.pop(w1.title)
-        logger.debug(f"Widgets unlinked (link: {w1.title} --> {w2.title}, linker: {type(self).__name__})")
+    def _connect(self, group: LinkGroup, w: ViewerElement):
+        self._relink(group)
 
+    def _disconnect(self, group: LinkGroup, w: ViewerElement):
+        self._link_axis(w, None)
+        self._relink(group)
 
-class XAxisLinker(ItemLinker):
+
+class XAxisLinker(AxisLinker):
     def _get_link_from_cfg(self, w1: ViewerElement) -> str:
         return w1.cfg.x_axis.link_to
 
-    def _link(self, w1: ViewerElement, w2: ViewerElement):
-        w1.container.setXLink(w2.title)
-
-    def _unlink(self, w1: ViewerElement, w2: ViewerElement):
-        w1.container.setXLink(None)
+    def _link_axis(self, w: ViewerElement, anchor: ViewerElement | None):
+        w.container.setXLink(anchor.title if anchor is not None else None)
 
 
-class YAxisLinker(ItemLinker):
+class YAxisLinker(AxisLinker):
     def _get_link_from_cfg(self, w1: ViewerElement) -> str:
         return w1.cfg.y_axis.link_to
 
-    def _link(self, w1: ViewerElement, w2: ViewerElement):
-        w1.container.setYLink(w2.title)
-
-    def _unlink(self, w1: ViewerElement, w2: ViewerElement):
-        w1.container.setYLink(None)
+    def _link_axis(self, w: ViewerElement, anchor: ViewerElement | None):
+        w.container.setYLink(anchor.title if anchor is not None else None)
 
 
 class SliderLinker(ItemLinker):
@@ -89,15 +260,11 @@ class SliderLinker(ItemLinker):
     def _get_link_from_cfg(self, w1: ViewerElement) -> str:
         return w1.sliders[self._slider].link_to
 
-    def _link(self, w1: ViewerElement, w2: ViewerElement):
-        slider1, slider2 = w1.sliders[self._slider], w2.sliders[self._slider]
-        slider1.value_changed[float].connect(slider2.set_value)
-        slider2.value_changed[float].connect(slider1.set_value)
+    def _get_signal(self, w: ViewerElement):
+        return w.sliders[self._slider].value_changed[float]
 
-    def _unlink(self, w1: ViewerElement, w2: ViewerElement):
-        slider1, slider2 = w1.sliders[self._slider], w2.sliders[self._slider]
-        slider1.value_changed[float].disconnect(slider2.set_value)
-        slider2.value_changed[float].disconnect(slider1.set_value)
+    def _push(self, w: ViewerElement, value: float):
+        w.sliders[self._slider].set_value(value)
 
 
 class ColorBarLinker(ItemLinker):
@@ -106,10 +273,8 @@ class ColorBarLinker(ItemLinker):
     def _get_link_from_cfg(self, w1: Image2D) -> str:
         return w1.cfg.color_bar.link_to
 
-    def _link(self, w1: Image2D, w2: Image2D):
-        w1.cbar.sigLevelsChanged[tuple].connect(w2.set_levels)
-        w2.cbar.sigLevelsChanged[tuple].connect(w1.set_levels)
+    def _get_signal(self, w: Image2D):
+        return w.cbar.sigLevelsChanged[tuple]
 
-    def _unlink(self, w1: Image2D, w2: Image2D):
-        w1.cbar.sigLevelsChanged[tuple].disconnect(w2.set_levels)
-        w2.cbar.sigLevelsChanged[tuple].disconnect(w1.set_levels)
+    def _push(self, w: Image2D, value: tuple[float, float]):
+        w.set_levels(value)
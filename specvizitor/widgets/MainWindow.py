@@ -16,9 +16,14 @@ from ..config import Config, Cache, DataWidgets, SpectralLineData
 from ..io.catalog import Catalog
 from ..io.inspection_data import InspectionData
 from ..plugins.plugin_core import PluginCore
+from ..utils.memory import accountant
 from ..utils.params import save_yaml
+from ..utils.profiling import profiler
+from ..utils.session import recorder
+from ..utils.timing import timer
 
 from .DataViewer import DataViewer
+from .Gallery import Gallery
 from .NavigationAction import Direction, NavigationAction
 from .NewFile import NewFile
 from .ObjectInfo import ObjectInfo
@@ -27,6 +32,8 @@ from .InspectionResults import InspectionResults
 from .InspectionFieldEditor import InspectionFieldEditor
 from .Subsets import Subsets
 from .Settings import Settings
+from .MemoryPanel import MemoryPanel
+from .TimingPanel import TimingPanel
 from .ToolBar import ToolBar
 
 logger = logging.getLogger(__name__)
@@ -103,16 +110,28 @@ class MainWindow(QtWidgets.QMainWindow):
         self._object_info: ObjectInfo | None = None
         self._inspection_res: InspectionResults | None = None
         self._subsets: Subsets | None = None
+        self._gallery: Gallery | None = None
+        self._timing_panel: TimingPanel | None = None
+        self._memory_panel: MemoryPanel | None = None
 
         self._quick_search_dock: QtWidgets.QDockWidget | None = None
         self._object_info_dock: QtWidgets.QDockWidget | None = None
         self._inspection_res_dock: QtWidgets.QDockWidget | None = None
         self._subsets_dock: QtWidgets.QDockWidget | None = None
+        self._gallery_dock: QtWidgets.QDockWidget | None = None
+        self._diagnostics_dock: QtWidgets.QDockWidget | None = None
 
         self.init_ui()
         self.populate()
         self.connect()
 
+        # account for the memory held by the data viewer and the gallery, and enforce the memory budget
+        memory_budget = self._config.data_viewer.memory_budget
+        accountant.budget = memory_budget * 2 ** 20 if memory_budget is not None else None
+        for w in (self._data_viewer, self._gallery):
+            accountant.add_provider(w.memory_items)
+        accountant.is_busy = lambda: self._data_viewer.loading
+
         self.restore_window_state()
 
         # restore the dock state (=layout of the data viewer) from cache
@@ -175,6 +194,22 @@ class MainWindow(QtWidgets.QMainWindow):
         self._subsets_dock.setWidget(self._subsets)
         self._subsets_dock.hide()
 
+        self._gallery = Gallery(self._data_viewer.widgets, self._config.data, plugins=self._plugins, parent=self)
+        self._gallery_dock = QtWidgets.QDockWidget('Gallery', self)
+        self._gallery_dock.setObjectName('Gallery')
+        self._gallery_dock.setWidget(self._gallery)
+        self._gallery_dock.hide()
+
+        self._timing_panel = TimingPanel(parent=self)
+        self._memory_panel = MemoryPanel(parent=self)
+        diagnostics = QtWidgets.QTabWidget(self)
+        diagnostics.addTab(self._timing_panel, 'Loading Times')
+        diagnostics.addTab(self._memory_panel, 'Memory')
+        self._diagnostics_dock = QtWidgets.QDockWidget('Diagnostics', self)
+        self._diagnostics_dock.setObjectName('Diagnostics')
+        self._diagnostics_dock.setWidget(diagnostics)
+        self._diagnostics_dock.hide()
+
         self._init_menu()
 
         self.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
@@ -247,7 +282,9 @@ class MainWindow(QtWidgets.QMainWindow):
             self._quick_search_dock.toggleViewAction(),
             self._object_info_dock.toggleViewAction(),
             self._inspection_res_dock.toggleViewAction(),
-            self._subsets_dock.toggleViewAction()
+            self._subsets_dock.toggleViewAction(),
+            self._gallery_dock.toggleViewAction(),
+            self._diagnostics_dock.toggleViewAction()
         ])
         self._dock_menu.addSeparator()
         self._dock_menu.addAction(self._commands_bar.toggleViewAction())
@@ -305,6 +342,20 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self._tools.addSeparator()
 
+        self._record_session = QtWidgets.QAction("Record Session")
+        self._record_session.setCheckable(True)
+        self._record_session.setEnabled(False)
+        self._record_session.toggled.connect(self._record_session_action)
+        self._tools.addAction(self._record_session)
+
+        self._profile_loading = QtWidgets.QAction("Profile Loading")
+        self._profile_loading.setCheckable(True)
+        self._profile_loading.setChecked(profiler.active)
+        self._profile_loading.toggled.connect(self._profile_loading_action)
+        self._tools.addAction(self._profile_loading)
+
+        self._tools.addSeparator()
+
         self._settings = QtWidgets.QAction("Se&ttings...")
         self._settings.triggered.connect(self.settings_action)
         self._tools.addAction(self._settings)
@@ -334,7 +385,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def connect(self):
         # connect the main window to the child widgets
         for w in (self._data_viewer, self._commands_bar, self._quick_search, self._object_info, self._inspection_res,
-                  self._subsets):
+                  self._subsets, self._gallery):
             self.project_loaded.connect(w.load_project)
 
         self.loading_aborted.connect(self._data_viewer.abort_loading)
@@ -343,15 +394,19 @@ class MainWindow(QtWidgets.QMainWindow):
             self.data_requested.connect(w.collect_data)
 
         self.project_closed.connect(self._data_viewer.free_resources)
+        self.project_closed.connect(self._gallery.free_resources)
 
         self.catalogue_updated.connect(self._object_info.update_table_items)
         self.catalogue_updated.connect(self._data_viewer.receive_catalog)
+        self.catalogue_updated.connect(self._gallery.receive_catalog)
         self.inspection_fields_updated.connect(self._inspection_res.update_inspection_fields)
         self.data_source_updated.connect(self._data_viewer.open_images)
+        self.data_source_updated.connect(self._gallery.update_data_sources)
         self.spectral_lines_updated.connect(self._data_viewer.spectral_lines_updated.emit)
         self.visible_columns_updated.connect(self._object_info.update_visible_columns)
         self.dock_layout_updated.connect(self._data_viewer.update_dock_layout)
         self.viewer_configuration_updated.connect(self._data_viewer.update_viewer_configuration)
+        self.viewer_configuration_updated.connect(self._gallery.update_widget_list)
 
         self.screenshot_path_selected.connect(self._data_viewer.take_screenshot)
 
@@ -359,12 +414,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.is_subset_inspection_paused.connect(self._subsets.pause_subset_inspection)
         self.subset_inspection_stopped.connect(self._subsets.stop_subset_inspection)
 
+        self.subset_loaded.connect(self._gallery.load_subset)
+        self.subset_inspection_stopped.connect(self._gallery.stop_subset_inspection)
+
         self.is_zen_mode_activated.connect(self._data_viewer.activate_zen_mode)
 
         # connect the child widgets to the main window
         self._quick_search.id_selected.connect(self.load_by_id)
         self._quick_search.index_selected.connect(self.load_by_index)
 
+        self._gallery.id_selected.connect(self.load_by_id)
+
         self._subsets.inspect_button_clicked.connect(self.inspect_subset_action)
         self._subsets.pause_inspecting_button_clicked.connect(self.pause_subset_inspection)
         self._subsets.stop_inspecting_button_clicked.connect(self.stop_subset_inspection)
@@ -400,6 +460,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self._object_info_dock)
         self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self._inspection_res_dock)
         self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self._subsets_dock)
+        self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self._gallery_dock)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self._diagnostics_dock)
 
     def load_catalogue(self):
         cat = Catalog.read(self._config.catalogue.filename, translate=self._config.catalogue.translate)
@@ -458,7 +520,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """ Update the state of the main window and activate the central widget after loading inspection data.
         """
         for w in (self._export, self._redshift_menu, self._star_object, self._edit_inspection_fields, self._reset_view,
-                  self._reset_dock_layout, self._inspect_subset):
+                  self._reset_dock_layout, self._inspect_subset, self._record_session):
             w.setEnabled(True)
         self.update_navigation_actions(self.rd.review.has_data("starred"))
 
@@ -475,17 +537,22 @@ class MainWindow(QtWidgets.QMainWindow):
         """ Load a new object to the central widget.
         @param j: the index of the object to display
         """
+        self._t_load_object_start = time.perf_counter()
+        timer.begin_load()
+        profiler.begin_load()
+
         if self._object_loaded:
-            self.data_requested.emit()
+            with timer.span('persistence'):
+                self.data_requested.emit()  # save the inspection results of the previous object
         else:
             self.loading_aborted.emit()
 
         self._object_loaded = False
-        self._t_load_object_start = time.perf_counter()
 
         self.rd.j = j
 
-        self._load_object(self._data_viewer)
+        with recorder.event('select', index=j):
+            self._load_object(self._data_viewer)
         self._update_window_title()
 
     def _load_object(self, *widgets):
@@ -501,13 +568,25 @@ class MainWindow(QtWidgets.QMainWindow):
 
     @QtCore.Slot()
     def finalize_loading(self):
-        self._load_object(self._commands_bar, self._inspection_res,self._subsets, self._object_info)
+        with timer.span('update_panels'):
+            self._load_object(self._commands_bar, self._inspection_res,self._subsets, self._object_info)
         self._object_loaded = True
 
-        self._cache.last_object_index = self.rd.j
-        self._cache.save()
+        with timer.span('persistence'):
+            self._cache.last_object_index = self.rd.j
+            self._cache.save()
 
-        logger.info(f"Object loaded (ID: {self.rd.review.get_id(self.rd.j)}, loading time: {time.perf_counter()-self._t_load_object_start:.3f} s)")
+        with timer.span('memory'):
+            accountant.enforce()
+
+        t_load = time.perf_counter() - self._t_load_object_start
+        timer.record('total', t_load)
+        timer.end_load()
+        if profiler.session is not None:
+            profiler.end_load(self.rd.review.get_id(self.rd.j, full=True))
+            self._profile_loading.setChecked(profiler.active)
+
+        logger.info(f"Object loaded (ID: {self.rd.review.get_id(self.rd.j)}, loading time: {t_load:.3f} s)")
 
     @QtCore.Slot(NavigationAction)
     def switch_object(self, action: NavigationAction):
@@ -539,7 +618,8 @@ class MainWindow(QtWidgets.QMainWindow):
                                f"included in the subset: {subset_only})")
                 break
 
-        self.load_object(j_upd)
+        with recorder.event('navigate', direction=action.direction.name.lower(), starred_only=action.starred_only):
+            self.load_object(j_upd)
 
     def _update_index(self, obj_index: int, command: Direction) -> int:
         j_upd = obj_index
@@ -581,12 +661,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setWindowTitle(title)
 
     def _export_action(self):
-        path = qtpy.compat.getsavefilename(self, caption='Export To FITS',
-                                           basedir=str(self.rd.output_path.with_suffix('.fits')),
-                                           filters='FITS Files (*.fits)')[0]
+        formats = {'FITS Files (*.fits)': 'fits',
+                   'Parquet Files (*.parquet)': 'parquet',
+                   'Feather Files (*.feather)': 'feather',
+                   'HDF5 Files (*.h5 *.hdf5)': 'hdf5'}
+
+        path, selected_filter = qtpy.compat.getsavefilename(self, caption='Export Inspection Results',
+                                                            basedir=str(self.rd.output_path.with_suffix('.fits')),
+                                                            filters=';;'.join(formats))
 
         if path:
-            self.rd.review.write(path, 'fits')
+            self.rd.review.write(path, formats.get(selected_filter, 'fits'))
 
     @QtCore.Slot(bool)
     def star_object(self, starred: bool):
@@ -598,6 +683,37 @@ class MainWindow(QtWidgets.QMainWindow):
             if action_cfg.starred_only:
                 action.setEnabled(has_starred)
 
+    @QtCore.Slot(bool)
+    def _profile_loading_action(self, checked: bool):
+        if checked == profiler.active:
+            return
+        if checked:
+            profiler.request(None)
+            logger.info(f"Profiling object loads (profiles are written to {profiler.output_dir})")
+        else:
+            profiler.stop()
+
+    @QtCore.Slot(bool)
+    def _record_session_action(self, checked: bool):
+        if not checked:
+            recorder.stop()
+            return
+
+        header = {
+            'inspection_file': str(self.rd.output_path) if self.rd.output_path is not None else None,
+            'object_index': self.rd.j,
+            'window_size': [self.width(), self.height()],
+            'config': asdict(self._config),
+            'data_widgets': asdict(self._widget_cfg),
+            'spectral_lines': asdict(self._spectral_lines),
+            'dock_layout': self._data_viewer.dock_area.saveState()
+        }
+        try:
+            recorder.start(recorder.default_filename, header=header)
+        except (OSError, TypeError) as e:
+            logger.error(f"Failed to start recording the session: {e}")
+            self._record_session.setChecked(False)
+
     def _restore_viewer_config_action(self):
         path = qtpy.compat.getopenfilename(self, caption='Open Viewer Configuration',
                                            filters='YAML Files (*.yml)')[0]
@@ -781,6 +897,11 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.project_closed.emit()
 
+        for w in (self._data_viewer, self._gallery):
+            accountant.remove_provider(w.memory_items)
+        accountant.is_busy = None
+        recorder.stop()
+
         # save the state and geometry of the main window
         if self._zen_mode_activated:
             self._zen_mode_action()
@@ -0,0 +1,101 @@
+from qtpy import QtWidgets, QtCore
+
+import logging
+
+from ..utils.memory import MemoryAccountant, accountant
+from ..utils.widgets import AbstractWidget
+
+
+__all__ = [
+    "MemoryPanel"
+]
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryPanel(AbstractWidget):
+    """The memory held by the widgets, the loaders and the caches (the size of the data in memory, not including
+    memory-mapped files), compared to the memory budget.
+    """
+
+    COLUMNS = ('Kind', 'Name', 'Size, MB')
+
+    refresh_interval: int = 1000  # in milliseconds
+
+    def __init__(self, memory_accountant: MemoryAccountant = accountant, parent=None):
+        self._accountant = memory_accountant
+
+        self._total: QtWidgets.QLabel | None = None
+        self._release: QtWidgets.QPushButton | None = None
+        self._table: QtWidgets.QTableWidget | None = None
+        self._refresh_timer: QtCore.QTimer | None = None
+
+        super().__init__(parent=parent)
+
+    def init_ui(self):
+        self._total = QtWidgets.QLabel(self)
+
+        self._release = QtWidgets.QPushButton("Release", self)
+        self._release.setToolTip("Release caches and idle files until the memory in use fits the budget")
+        self._release.setFixedWidth(85)
+
+        self._table = QtWidgets.QTableWidget(0, len(self.COLUMNS), self)
+        self._table.setHorizontalHeaderLabels(self.COLUMNS)
+        self._table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        self._table.verticalHeader().setVisible(False)
+        self._table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self._table.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+
+        self._refresh_timer = QtCore.QTimer(self)
+        self._refresh_timer.setInterval(self.refresh_interval)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+        self._release.clicked.connect(self._release_action)
+
+    def set_layout(self):
+        self.setLayout(QtWidgets.QVBoxLayout())
+
+    def populate(self):
+        sub_layout = QtWidgets.QHBoxLayout()
+        sub_layout.addWidget(self._total)
+        sub_layout.addStretch()
+        sub_layout.addWidget(self._release)
+        self.layout().addLayout(sub_layout)
+
+        self.layout().addWidget(self._table)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._refresh_timer.stop()
+
+    @QtCore.Slot()
+    def refresh(self):
+        items = sorted(self._accountant.usage(), key=lambda item: item.nbytes, reverse=True)
+
+        total = f"Total: {sum(item.nbytes for item in items) / 2 ** 20:.1f} MB"
+        if self._accountant.budget is not None:
+            total += f" (budget: {self._accountant.budget / 2 ** 20:.0f} MB)"
+        self._total.setText(total)
+        self._release.setEnabled(self._accountant.budget is not None and not self._accountant.busy)
+
+        self._table.setRowCount(len(items))
+        for row, item in enumerate(items):
+            for col, value in enumerate((item.kind, item.name, f"{item.nbytes / 2 ** 20:.1f}")):
+                table_item = self._table.item(row, col)
+                if table_item is None:
+                    table_item = QtWidgets.QTableWidgetItem()
+                    if col == 2:
+                        table_item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                    self._table.setItem(row, col, table_item)
+                table_item.setText(value)
+                table_item.setToolTip(value if col == 1 else '')
+
+    @QtCore.Slot()
+    def _release_action(self):
+        self._accountant.enforce()
+        self.refresh()
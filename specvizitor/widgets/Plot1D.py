@@ -4,12 +4,15 @@ from astropy.units import Quantity
 import pyqtgraph as pg
 from scipy.ndimage import gaussian_filter1d
 
+from dataclasses import dataclass, field
+from functools import partial
 import logging
 
 from ..config import data_widgets
 from ..io.catalog import Catalog
+from ..utils.lru_cache import LRUCache
 
-from .ViewerElement import ViewerElement
+from .ViewerElement import ViewerElement, DisplayProducts
 
 
 __all__ = ["Plot1D"]
@@ -17,6 +20,11 @@ __all__ = ["Plot1D"]
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class Plot1DProducts(DisplayProducts):
+    plots: dict[str, tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+
+
 class Plot1D(ViewerElement):
     allowed_data_types = (Table,)
 
@@ -24,51 +32,104 @@ class Plot1D(ViewerElement):
         self.cfg = cfg
 
         self.plot_data_items: dict[str, pg.PlotDataItem] = {}
+        self._smoothed_data = LRUCache(maxsize=32)  # smoothed y-data of all plots, keyed by sigma
 
         super().__init__(cfg=cfg, **kwargs)
 
-    def get_plot_data(self, cname: str, ignore_missing=False) -> Quantity | None:
+    def init_ui(self):
+        super().init_ui()
+
+        # only render the visible part of the data, at most a few samples per screen pixel
+        self.container.setClipToView(True)
+        self.container.setDownsampling(auto=True, mode='peak')
+
+    def get_plot_data(self, cname: str, ignore_missing=False, data: Table | None = None,
+                      copy=False) -> Quantity | None:
+        """Get a column of the data table as a Quantity.
+        @param cname: the column name
+        @param ignore_missing: if True, do not warn if the column is not found
+        @param data: the data table (defaults to the widget data)
+        @param copy: if False, return a read-only view of the column; callers that modify the data must request a copy
+        @return: the column data (or None if the column is not found)
+        """
+        if data is None:
+            data = self.data
+
         try:
-            plot_data = self.data[cname].quantity
+            plot_data = data[cname].quantity
         except KeyError:
             if not ignore_missing:
                 logger.warning(f"Column not found: {cname} (widget: {self.title})")
             return None
 
-        return Quantity(plot_data)  # return a copy to prevent any modifications to self.data
+        if copy:
+            return plot_data.copy()
 
-    def add_content(self, cat: Catalog | None):
-        default_pen = pg.getConfigOption('foreground')
+        plot_data = plot_data.view()  # a new view, so that the column itself stays writeable
+        plot_data.flags.writeable = False
+
+        return plot_data
+
+    def prepare_display(self, data: Table, meta, data_key: tuple | None = None,
+                        cat_entry: Catalog | None = None) -> Plot1DProducts:
+        products = Plot1DProducts(axes=self.create_axes())
+        axes = products.axes
+
+        xlim, ylim = None, None
         for label, line_plot in self.cfg.plots.items():
-            x_data, y_data = self.get_plot_data(line_plot.x), self.get_plot_data(line_plot.y)
+            x_data = self.get_plot_data(line_plot.x, data=data)
+            y_data = self.get_plot_data(line_plot.y, data=data)
             if x_data is None or y_data is None:
                 continue
 
-            if not self._axes.x.label:
-                self._axes.x.label = line_plot.x
-            if not self._axes.y.label:
-                self._axes.y.label = line_plot.y
+            if not axes.x.label:
+                axes.x.label = line_plot.x
+            if not axes.y.label:
+                axes.y.label = line_plot.y
+
+            if not axes.x.unit:
+                axes.x.unit = x_data.unit
+            if not axes.y.unit:
+                axes.y.unit = y_data.unit
+
+            x_data = self._apply_axis_data_transform(x_data, scale=axes.x.scale, unit=axes.x.unit)
+            y_data = self._apply_axis_data_transform(y_data, scale=axes.y.scale, unit=axes.y.unit)
+            if isinstance(x_data, Quantity):
+                x_data = x_data.value
+            if isinstance(y_data, Quantity):
+                y_data = y_data.value
+
+            xlim = self.calc_axis_lims(xlim, x_data)
+            ylim = self.calc_axis_lims(ylim, y_data)
+
+            products.plots[label] = (x_data, y_data)
 
-            if not self._axes.x.unit:
-                self._axes.x.unit = x_data.unit
-            if not self._axes.y.unit:
-                self._axes.y.unit = y_data.unit
+        if xlim is not None:
+            axes.x.limits = xlim
+        if ylim is not None:
+            axes.y.limits = ylim
+        axes.y.padding = 0.05
 
-            x_data, y_data = self.apply_xdata_transform(x_data), self.apply_ydata_transform(y_data)
+        return products
+
+    def add_content(self, cat: Catalog | None):
+        default_pen = pg.getConfigOption('foreground')
+        for label, (x_data, y_data) in self.products.plots.items():
+            line_plot = self.cfg.plots[label]
 
             pen = default_pen if line_plot.color is None else line_plot.color
             name = label if not line_plot.hide_label else None
             if name and self.container.legend is None:
                 self.container.addLegend(verSpacing=-10, pen=default_pen)
 
-            plot_data_item = pg.PlotDataItem(x=x_data, y=y_data, pen=pen, name=name)
+            plot_data_item = self.acquire_item(('plot', label), partial(pg.PlotDataItem, pen=pen, name=name))
+            plot_data_item.setData(x=x_data, y=y_data)
             self.plot_data_items[label] = plot_data_item
-            self.register_item(plot_data_item)
 
     @staticmethod
     def calc_axis_lims(lims_current: tuple[float, float] | None, plot_data: np.ndarray):
         plot_data = plot_data[~np.isinf(plot_data)]
-        if all(np.isnan(plot_data)):
+        if np.all(np.isnan(plot_data)):
             return lims_current
         lims_new = (np.nanmin(plot_data), np.nanmax(plot_data))
 
@@ -77,30 +138,25 @@ class Plot1D(ViewerElement):
 
         return lims_new
 
-    def setup_view(self, cat_entry: Catalog | None):
-        xlim, ylim = None, None
-        for label, plot_data_item in self.plot_data_items.items():
-            x_data, y_data = plot_data_item.getData()
-            xlim = self.calc_axis_lims(xlim, x_data)
-            ylim = self.calc_axis_lims(ylim, y_data)
-
-        self.set_default_range(xlim, ylim)
-        self.set_content_padding(ypad=0.05)
-
-        super().setup_view(cat_entry)
-
     def smooth_data(self, sigma: float):
-        for label, plot_data_item in self.plot_data_items.items():
-            x_data, _ = plot_data_item.getData()
-            y_data = self.get_plot_data(self.cfg.plots[label].y)
+        if self.products is None:
+            return
+
+        if sigma <= 0:
+            y_smoothed = {label: y_data for label, (_, y_data) in self.products.plots.items()}
+        else:
+            y_smoothed = self._smoothed_data.get(sigma)
+            if y_smoothed is None:
+                # the y-data has already been converted to the axis units and scaled in `prepare_display`
+                y_smoothed = {label: gaussian_filter1d(y_data, sigma)
+                              for label, (_, y_data) in self.products.plots.items()}
+                self._smoothed_data.put(sigma, y_smoothed)
 
-            if y_data is None:
-                continue
-
-            y_data = self.apply_ydata_transform(y_data)
+        for label, plot_data_item in self.plot_data_items.items():
+            plot_data_item.setData(x=self.products.plots[label][0], y=y_smoothed[label])
 
-            y_data_smoothed = gaussian_filter1d(y_data, sigma) if sigma > 0 else y_data
-            plot_data_item.setData(x=x_data, y=y_data_smoothed)
+    def _get_caches(self) -> dict[str, LRUCache]:
+        return {'smoothed data': self._smoothed_data}
 
     def clear_content(self):
         # TODO: submit issue to the pyqtgraph repo
@@ -108,3 +164,6 @@ class Plot1D(ViewerElement):
         #     self.container.vb.removeItem(self.container.legend)  # removing from the ViewBox, not PlotItem
 
         super().clear_content()
+
+        self.plot_data_items = {}
+        self._smoothed_data.clear()
@@ -1,39 +1,109 @@
-import numpy as np
 from qtpy import QtWidgets, QtCore
 
 import logging
+import math
 
 from ..io.catalog import Catalog
+from ..utils.session import recorder
 from ..utils.widgets import AbstractWidget
 
 __all__ = [
+    'SliderScale',
     'SmartSlider'
 ]
 
 logger = logging.getLogger(__name__)
 
 
+class SliderScale:
+    """An analytic mapping between the (1-based) indices of slider positions and slider values. Values are spaced
+    evenly either in `value` (linear spacing) or in `log(1 + value)` (suited for redshifts, where a constant step
+    corresponds to a constant velocity resolution), so that arbitrarily fine grids take O(1) memory.
+    """
+
+    SPACINGS: tuple[str, ...] = ('linear', 'log1p')
+
+    def __init__(self, min_value: float = 0, max_value: float = 100, step: float = 1, spacing: str = 'linear'):
+        """
+        @param min_value: the first value of the grid
+        @param max_value: the last value of the grid
+        @param step: the grid step, in the coordinate where values are spaced evenly
+        @param spacing: `linear` or `log1p`
+        """
+        if spacing not in self.SPACINGS:
+            logger.error(f"Unknown slider spacing: `{spacing}`. Supported values: {', '.join(self.SPACINGS)}")
+            spacing = 'linear'
+        if spacing == 'log1p' and min_value <= -1:
+            logger.error(f"Cannot use the `log1p` spacing for values below -1 (min value: {min_value})")
+            spacing = 'linear'
+
+        self.spacing = spacing
+
+        self._u_min, self._u_max = self._forward(min_value), self._forward(max_value)
+        self.n = int((self._u_max - self._u_min) / step) + 1
+
+        # as with `np.linspace`, the grid spans the full range of values
+        self._du = (self._u_max - self._u_min) / (self.n - 1) if self.n > 1 else 0
+
+    def _forward(self, value: float) -> float:
+        return math.log1p(value) if self.spacing == 'log1p' else value
+
+    def _inverse(self, u: float) -> float:
+        return math.expm1(u) if self.spacing == 'log1p' else u
+
+    def value(self, i: int) -> float:
+        """Return the value at a given index."""
+        if i >= self.n:
+            return self._inverse(self._u_max)
+        return self._inverse(self._u_min + (i - 1) * self._du)
+
+    def index(self, value: float) -> int:
+        """Return the index of the largest grid value not exceeding `value` (or 1 if `value` is below the grid)."""
+        value = float(value)
+        if math.isnan(value):
+            raise ValueError("Cannot find the index of a NaN value")
+        if self._du == 0 or (self.spacing == 'log1p' and value <= -1):
+            return 1
+
+        x = (self._forward(value) - self._u_min) / self._du
+        if x >= self.n - 1:
+            return self.n
+
+        # absorb rounding errors, so that the index of the value at a given index is the index itself
+        return max(math.floor(x + 1e-9), 0) + 1
+
+
 class SmartSliderBase(QtWidgets.QSlider):
+    """A slider selecting values from a grid (see `SliderScale`). The grid can be finer than the range of integer
+    positions supported by Qt, in which case several grid indices share a slider position: dragging the slider moves
+    between positions, while values set programmatically keep the full resolution of the grid.
+    """
+
     value_changed = QtCore.Signal()
 
-    def __init__(self, min_value=0, max_value=100, step=1, default_value=0,
+    max_positions: int = 2 ** 31 - 2  # positions range from 1 to `max_positions`
+
+    def __init__(self, min_value=0, max_value=100, step=1, default_value=0, spacing='linear',
                  orientation=QtCore.Qt.Orientation.Vertical, parent=None):
 
         super().__init__(orientation, parent)
 
-        self._n = int((max_value - min_value) / step) + 1
-        self._arr = np.linspace(min_value, max_value, self._n)
+        self._scale = SliderScale(min_value, max_value, step, spacing)
+        self._n = self._scale.n
+        self._n_positions = min(self._n, self.max_positions)
 
         self.step = step
         self.default_value = default_value
 
-        self.setRange(1, self._n)
-        self.setSingleStep(1)
-        self.setValue(self.default_index)
-
         self._index = self.default_index
+        self._user_action: bool = False
+
+        self.setRange(1, self._n_positions)
+        self.setSingleStep(1)
+        self.setValue(self._position_from_index(self._index))
 
         self.valueChanged[int].connect(self.value_changed_action)
+        self.actionTriggered.connect(self._action_triggered)
 
     @property
     def default_index(self):
@@ -42,28 +112,60 @@ class SmartSliderBase(QtWidgets.QSlider):
         except (TypeError, ValueError):
             return 1
 
+    def _position_from_index(self, i: int) -> int:
+        if self._n == self._n_positions:
+            return i
+        return 1 + round((i - 1) * (self._n_positions - 1) / (self._n - 1))
+
+    def _index_from_position(self, pos: int) -> int:
+        if self._n == self._n_positions:
+            return pos
+        return 1 + round((pos - 1) * (self._n - 1) / (self._n_positions - 1))
+
     @property
     def index(self):
         return self._index
 
     @index.setter
     def index(self, i: int):
+        i = min(max(int(i), 1), self._n)
+        changed = i != self._index
         self._index = i
-        self.setValue(i)
+
+        pos = self._position_from_index(i)
+        if pos != super().value():
+            self.setValue(pos)
+        elif changed:
+            # the index changed within the same slider position, so Qt would not emit `valueChanged`
+            self.value_changed.emit()
 
     @property
     def value(self):
-        return self._arr[self.index - 1]
+        return self._scale.value(self.index)
 
     def index_from_value(self, value: float):
-        i = self._arr.searchsorted(value, side='right')
-        return i if i > 0 else 1
+        return self._scale.index(value)
 
     def reset(self):
         self.index = self.default_index
 
-    def value_changed_action(self, index: int):
-        self.index = index
+    @property
+    def user_action(self) -> bool:
+        """Whether the slider is being moved by the user (with the mouse or the keyboard)."""
+        return self._user_action
+
+    def _action_triggered(self, action: int):
+        # Qt moves the slider right after emitting `actionTriggered`; the flag is reset once the action is handled
+        self._user_action = True
+        QtCore.QTimer.singleShot(0, self._reset_user_action)
+
+    def _reset_user_action(self):
+        self._user_action = False
+
+    def value_changed_action(self, pos: int):
+        # keep the exact index if the slider was moved to the position of the index (e.g. by the `index` setter)
+        if pos != self._position_from_index(self._index):
+            self._index = self._index_from_position(pos)
         self.value_changed.emit()
 
 
@@ -92,6 +194,8 @@ class SmartSlider(AbstractWidget):
 
         self._slider_kwargs = kwargs
 
+        self.session_fields: dict | None = None  # identifies the slider in recorded sessions (see `SessionRecorder`)
+
         self._slider: SmartSliderBase | None = None
         self._label: QtWidgets.QLabel | None = None
         self._editor: QtWidgets.QLineEdit | None = None
@@ -150,7 +254,14 @@ class SmartSlider(AbstractWidget):
 
     def update_from_slider(self):
         self._update_editor_text()
-        self.value_changed.emit(self.value)
+        self._emit_value(user_input=self._slider.user_action)
+
+    def _emit_value(self, user_input: bool = False):
+        if self.session_fields is None or not user_input:
+            self.value_changed.emit(self.value)
+            return
+        with recorder.event('slider', value=self.value, **self.session_fields):
+            self.value_changed.emit(self.value)
 
     def _update_from_editor(self):
         try:
@@ -160,7 +271,8 @@ class SmartSlider(AbstractWidget):
             self.reset()
         else:
             # the true slider value might stay the same, which would require a manual update of the text editor
-            self.update_from_slider()
+            self._update_editor_text()
+            self._emit_value(user_input=True)
 
     @QtCore.Slot()
     def save_value(self):
@@ -0,0 +1,130 @@
+import qtpy.compat
+from qtpy import QtWidgets, QtCore
+
+import logging
+
+from ..utils.timing import StageStats, StageTimer, timer
+from ..utils.widgets import AbstractWidget
+
+
+__all__ = [
+    "TimingPanel"
+]
+
+logger = logging.getLogger(__name__)
+
+
+class TimingPanel(AbstractWidget):
+    """The time spent in each stage of loading objects (median and 95th percentile over the most recent loads). The
+    stages are timed only while recording is switched on; the recorded spans can be exported as JSON lines.
+    """
+
+    # the stages in the order they are run (plugin hooks are listed after these stages, and the total time last)
+    STAGES = ('persistence', 'debounce', 'resolve_path', 'cutout_wcs', 'open', 'read', 'prepare_display', 'set_data',
+              'clear_content', 'add_content', 'setup_view', 'reset_view', 'update_panels', 'memory')
+    COLUMNS = ('Stage', 'Loads', 'Last, ms', 'p50, ms', 'p95, ms')
+
+    refresh_interval: int = 500  # in milliseconds
+
+    def __init__(self, stage_timer: StageTimer = timer, parent=None):
+        self._timer = stage_timer
+
+        self._record: QtWidgets.QCheckBox | None = None
+        self._clear: QtWidgets.QPushButton | None = None
+        self._export: QtWidgets.QPushButton | None = None
+        self._table: QtWidgets.QTableWidget | None = None
+        self._refresh_timer: QtCore.QTimer | None = None
+
+        super().__init__(parent=parent)
+
+    def init_ui(self):
+        self._record = QtWidgets.QCheckBox("Record", self)
+        self._record.setToolTip("Time the stages of loading objects")
+        self._record.setChecked(self._timer.enabled)
+
+        self._clear = QtWidgets.QPushButton("Clear", self)
+        self._export = QtWidgets.QPushButton("Export...", self)
+        for w in (self._clear, self._export):
+            w.setFixedWidth(85)
+
+        self._table = QtWidgets.QTableWidget(0, len(self.COLUMNS), self)
+        self._table.setHorizontalHeaderLabels(self.COLUMNS)
+        self._table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        self._table.verticalHeader().setVisible(False)
+        self._table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self._table.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+
+        self._refresh_timer = QtCore.QTimer(self)
+        self._refresh_timer.setInterval(self.refresh_interval)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+        self._record.toggled.connect(self._set_recording)
+        self._clear.clicked.connect(self._clear_action)
+        self._export.clicked.connect(self._export_action)
+
+    def set_layout(self):
+        self.setLayout(QtWidgets.QVBoxLayout())
+
+    def populate(self):
+        sub_layout = QtWidgets.QHBoxLayout()
+        sub_layout.addWidget(self._record)
+        sub_layout.addStretch()
+        sub_layout.addWidget(self._clear)
+        sub_layout.addWidget(self._export)
+        self.layout().addLayout(sub_layout)
+
+        self.layout().addWidget(self._table)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._refresh_timer.stop()
+
+    @QtCore.Slot(bool)
+    def _set_recording(self, enabled: bool):
+        self._timer.enabled = enabled
+        logger.info(f"Stage timing {'enabled' if enabled else 'disabled'}")
+
+    def _sort_key(self, s: StageStats):
+        if s.stage == 'total':
+            return 2, 0, s.stage
+        if s.stage in self.STAGES:
+            return 0, self.STAGES.index(s.stage), s.stage
+        return 1, 0, s.stage
+
+    @QtCore.Slot()
+    def refresh(self):
+        stats = sorted(self._timer.stats(), key=self._sort_key)
+
+        self._table.setRowCount(len(stats))
+        for row, s in enumerate(stats):
+            values = (s.stage, str(s.count)) + tuple(f"{1000 * t:.1f}" for t in (s.last, s.p50, s.p95))
+            for col, value in enumerate(values):
+                item = self._table.item(row, col)
+                if item is None:
+                    item = QtWidgets.QTableWidgetItem()
+                    if col > 0:
+                        item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                    self._table.setItem(row, col, item)
+                item.setText(value)
+
+    @QtCore.Slot()
+    def _clear_action(self):
+        self._timer.clear()
+        self.refresh()
+
+    @QtCore.Slot()
+    def _export_action(self):
+        path = qtpy.compat.getsavefilename(self, caption='Export Timings', basedir='timings.jsonl',
+                                           filters='JSON Lines (*.jsonl)')[0]
+        if not path:
+            return
+
+        try:
+            self._timer.export(path)
+        except OSError as e:
+            logger.error(f"Failed to export the timings: {e}")
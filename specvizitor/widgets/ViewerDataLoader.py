@@ -1,30 +1,64 @@
 from astropy.coordinates import SkyCoord
+from astropy.wcs import WCS
 from qtpy import QtCore
 
+from dataclasses import dataclass
 import logging
 import pathlib
+import threading
 import time
+from types import MappingProxyType
+from typing import Any, Mapping
 
-from ..config import config
+from ..config import config, data_widgets
 from ..io.catalog import Catalog
 from ..io.inspection_data import InspectionData
-from ..io.viewer_data import ViewerData, get_wcs, LocalPath
+from ..io.viewer_data import ViewerData, DataPath, get_wcs, LocalPath
+from ..plugins.plugin_core import PluginCore
+from ..utils.profiling import profiler
+from ..utils.timing import timer
 
-from .ViewerElement import ViewerElement
+from .ViewerElement import ViewerElement, DisplayProducts
 
 
 __all__ = [
-    "ViewerDataLoader"
+    "WidgetData",
+    "ObjectBundle",
+    "ViewerDataLoader",
+    "DataLocator"
 ]
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class WidgetData:
+    """The data loaded to a widget (see `ViewerElement.set_data`)."""
+    data: Any = None
+    meta: Any = None
+    data_path: DataPath | None = None
+    data_key: tuple | None = None
+    products: DisplayProducts | None = None
+
+
+@dataclass(frozen=True)
+class ObjectBundle:
+    """The data of an object loaded to all widgets, delivered to the GUI thread at once. The generation identifies the
+    loading request, so that the results of superseded requests can be discarded.
+    """
+    generation: int
+    j: int
+    review: InspectionData
+    cat_entry: Catalog | None
+    widget_data: Mapping[str, WidgetData]
+
+
 class ViewerDataLoader(QtCore.QThread):
-    data_loaded = QtCore.Signal(object, object, object)
+    bundle_loaded = QtCore.Signal(object)
 
     def __init__(self, widgets: dict[str, ViewerElement], j: int, review: InspectionData, viewer_data: ViewerData,
-                 data_sources: config.DataSources, cat_entry: Catalog | None, t_grace=0.1):
+                 data_sources: config.DataSources, cat_entry: Catalog | None, plugins: list[PluginCore] | None = None,
+                 t_grace=0.1, generation: int = 0):
         super().__init__(parent=None)
 
         self.widgets: dict[str, ViewerElement] = widgets
@@ -34,113 +68,247 @@ class ViewerDataLoader(QtCore.QThread):
         self.data_sources: config.DataSources = data_sources
         self.cat_entry: Catalog | None = cat_entry
         self.viewer_data = viewer_data
+        self.locator = DataLocator(viewer_data, data_sources)
+        self.plugins: list[PluginCore] = plugins if plugins is not None else []
 
         self.t_grace = t_grace
+        self.generation = generation
+        self.load_id = timer.load_id  # the spans of the loader thread are attributed to the load that created it
+        self.profile_session = profiler.session
         
         self._runs = True
+        self._opened: set[str] = set()  # the files opened for the widgets by this loader
+
+        self._lock = threading.Lock()
+        self._loaded: bool = False  # whether the data has been loaded (i.e. `_opened` is final)
+        self._discarded: list[ObjectBundle] = []  # the bundles to discard once the data has been loaded
 
     def run(self):
+        timer.bind(self.load_id)
+        # the profile is complete before the bundle is emitted, so that it can be written when loading is finalized
+        with profiler.profile_thread(self.profile_session):
+            bundle = self._load_bundle()
+        if bundle is not None:
+            self.bundle_loaded.emit(bundle)
+
+    def _load_bundle(self) -> ObjectBundle | None:
         i = 0
         n = 30
         dt = self.t_grace / n
-        while self._runs and i < n:
-            time.sleep(dt)
-            i += 1
-
-        if i < n:
-            return
-
-        widgets = list(self.widgets.values())
+        with timer.span('debounce'):
+            while self._runs and i < n:
+                time.sleep(dt)
+                i += 1
+
+        widget_data = {}
+        if i == n:
+            for title, w0 in self.widgets.items():
+                if not self._runs:
+                    break
+                with timer.attribute(title):
+                    res = self._load_data(w0)
+                widget_data[title] = WidgetData(*res) if res is not None else WidgetData()
+
+        with self._lock:
+            self._loaded = True
+            discarded, self._discarded = self._discarded, []
+        for bundle in discarded:
+            self._close_files(bundle.widget_data, keep=self._opened)
+
+        if not self._runs:
+            self._close_files(widget_data)
+            return None
 
-        i = 0
-        n = len(widgets)
-        while self._runs and i < n:
-            w0 = widgets[i]
-            res = self._load_data(w0)
-            if res is None:
-                res = (None, None, None)
-            self.data_loaded.connect(w0.set_data)
-            self.data_loaded.emit(*res)
-            self.data_loaded.disconnect(w0.set_data)
-            i += 1
+        return ObjectBundle(generation=self.generation, j=self.j, review=self.review, cat_entry=self.cat_entry,
+                            widget_data=MappingProxyType(widget_data))
 
     @QtCore.Slot()
     def abort(self):
         self._runs = False
+
+    def discard(self, bundle: ObjectBundle):
+        """Close the files opened for the data of a bundle that will not be delivered to the widgets (a bundle loaded
+        by this loader or by a previous one). The files in use by the widgets or opened by this loader are kept open.
+        If this loader is still loading, the files are closed once it has finished, as it might be reading them.
+        """
+        if bundle.generation == self.generation:
+            self._close_files(bundle.widget_data)  # the bundle has already been loaded
+            return
+
+        with self._lock:
+            if not self._loaded:
+                self._discarded.append(bundle)
+                return
+        self._close_files(bundle.widget_data, keep=self._opened)
     
     def _load_data(self, w0: ViewerElement):
         if w0.data is not None:
             self._free_resources(w0)
         
-        data_path = self._get_data_path(w0)
-        if data_path is None:
+        location = self.locator.locate(w0.title, w0.cfg, self.review.get_id(self.j), self.cat_entry)
+        if location is None:
             return None
+        data_path, loader_params = location
+        self._opened.add(str(data_path))
+
+        data, meta = self.viewer_data.load(str(data_path),
+                                           loader=w0.cfg.data.loader,
+                                           allowed_dtypes=w0.allowed_data_types,
+                                           **loader_params)
+        data_key = self.viewer_data.get_data_key(str(data_path), **loader_params)
+
+        if data is None:
+            return data, meta, data_path, data_key, None
 
         try:
-            data_path.resolve(self.review.get_id(self.j), self.cat_entry)
+            data = self._transform_data(w0, data, meta)
+            with timer.span('prepare_display'):
+                display_data = w0.prepare_data(data)
+                products = w0.prepare_display(display_data, meta, data_key=data_key, cat_entry=self.cat_entry)
         except Exception as e:
-            logger.error(f"Failed to resolve the filename: {e} (widget: {w0.title})")
+            logger.error(f"Failed to prepare the data for display: {e} (widget: {w0.title})")
             return None
 
+        # the original data is not kept by the widget, but the exact values of single pixels can be read from the file
+        exact_pixels = display_data is not data
+        if w0.uses_tiled_reads or exact_pixels:
+            self._add_tiled_reader(w0, str(data_path), loader_params, products, tiles=w0.uses_tiled_reads,
+                                   exact_pixels=exact_pixels)
+
+        return display_data, meta, data_path, data_key, products
+
+    def _transform_data(self, w0: ViewerElement, data, meta):
+        for plugin in self.plugins:
+            with timer.span(f'{plugin.name}.transform_data'):
+                data = plugin.transform_data(w0, data, meta, cat_entry=self.cat_entry)
+        return data
+
+    def _add_tiled_reader(self, w0: ViewerElement, filename: str, loader_params: dict, products: DisplayProducts,
+                          tiles: bool = True, exact_pixels: bool = False):
+        reader = self.viewer_data.get_tiled_reader(filename, precision=w0.display_precision, **loader_params)
+        if reader is None:
+            if tiles:
+                logger.warning(f"Windowed reads are not supported by the loader (widget: {w0.title})")
+            return
+
         try:
-            data_path.validate()
-        except FileNotFoundError:
-            logger.error(f"`{w0.title}` not found (filename: {data_path.name})")
-            return None
+            products.window_origin = reader.get_origin(**loader_params)
         except Exception as e:
-            logger.error(f"{e} (widget: {w0.title})")
-            return None
-
-        loader_params = self._get_loader_params(w0)
-        if loader_params is None:
-            return None
+            logger.error(f"Failed to locate the data in the full image: {e} (widget: {w0.title})")
+            return
 
-        data, meta = self.viewer_data.load(str(data_path),
-                                           loader=w0.cfg.data.loader,
-                                           allowed_dtypes=w0.allowed_data_types,
-                                           **loader_params)
+        products.tiled_reader = reader if tiles else None
+        products.pixel_reader = reader if exact_pixels else None
 
-        return data, meta, data_path
+    def _close_files(self, widget_data: Mapping[str, WidgetData], keep: set[str] = frozenset()):
+        # the data will not be delivered to the widgets: close the files opened for it (shared images are kept open)
+        in_use = {str(w0.data_path) for w0 in self.widgets.values() if w0.data_path is not None}
+        for title, d in widget_data.items():
+            if d.data_path is None or self.widgets[title].cfg.data.source:
+                continue
+            filename = str(d.data_path)
+            if filename not in in_use and filename not in keep:
+                self.viewer_data.close(filename)
 
     def _free_resources(self, w0: ViewerElement):
+        if str(w0.data_path) in self._opened:
+            return  # the file is shared with a widget whose data has just been loaded (e.g. when reloading an object)
+
         if not w0.cfg.data.source:
             self.viewer_data.close(str(w0.data_path))
             return
 
         self.viewer_data.reopen(str(w0.data_path))
 
-    def _get_data_path(self, w0: ViewerElement) -> LocalPath | None:
-        if not w0.cfg.data.source:
-            if not w0.cfg.data.filename:
-                logger.error(f"Filename not specified (widget: {w0.title})")
+
+class DataLocator:
+    """Locates the data of a widget for a given object: resolves the filename and the loader parameters (for widgets
+    showing cutouts of a shared image, the position of the cutout).
+    """
+
+    def __init__(self, viewer_data: ViewerData, data_sources: config.DataSources):
+        self.viewer_data = viewer_data
+        self.data_sources = data_sources
+
+        # the WCS of the shared images with the headers they were created from; WCS objects are not thread-safe
+        self._wcs: dict[str, tuple[Any, WCS]] = {}
+        self._wcs_lock = threading.Lock()
+
+    def locate(self, title: str, cfg: data_widgets.ViewerElement, obj_id: str | int,
+               cat_entry: Catalog | None) -> tuple[DataPath, dict] | None:
+        """Return the path to the data of a widget and the loader parameters, or None if the data cannot be located.
+        @param title: the title of the widget
+        @param cfg: the widget configuration
+        @param obj_id: the ID of the object
+        @param cat_entry: the catalogue entry of the object
+        """
+        with timer.span('resolve_path'):
+            data_path = self._resolve(title, cfg, obj_id, cat_entry)
+        if data_path is None:
+            return None
+
+        loader_params = self._get_loader_params(title, cfg, cat_entry)
+        if loader_params is None:
+            return None
+
+        return data_path, loader_params
+
+    def _resolve(self, title: str, cfg: data_widgets.ViewerElement, obj_id: str | int,
+                 cat_entry: Catalog | None) -> DataPath | None:
+        data_path = self._get_data_path(title, cfg)
+        if data_path is None:
+            return None
+
+        try:
+            data_path.resolve(obj_id, cat_entry)
+        except Exception as e:
+            logger.error(f"Failed to resolve the filename: {e} (widget: {title})")
+            return None
+
+        try:
+            data_path.validate()
+        except FileNotFoundError:
+            logger.error(f"`{title}` not found (filename: {data_path.name})")
+            return None
+        except Exception as e:
+            logger.error(f"{e} (widget: {title})")
+            return None
+
+        return data_path
+
+    def _get_data_path(self, title: str, cfg: data_widgets.ViewerElement) -> LocalPath | None:
+        if not cfg.data.source:
+            if not cfg.data.filename:
+                logger.error(f"Filename not specified (widget: {title})")
                 return None
-            return LocalPath(str(pathlib.Path(self.data_sources.dir) / w0.cfg.data.filename))
+            return LocalPath(str(pathlib.Path(self.data_sources.dir) / cfg.data.filename))
 
         # for now assume that a non-empty data source == image
-        image = self.data_sources.images.get(w0.cfg.data.source)
+        image = self.data_sources.images.get(cfg.data.source)
         if not image:
-            logger.error(f"Shared image not found (label: {w0.cfg.data.source}, widget: {w0.title})")
+            logger.error(f"Shared image not found (label: {cfg.data.source}, widget: {title})")
             return None
 
         return LocalPath(image.filename)
 
-    def _get_loader_params(self, w0: ViewerElement) -> dict | None:
-        params = w0.cfg.data.loader_params
+    def _get_loader_params(self, title: str, cfg: data_widgets.ViewerElement, cat_entry: Catalog | None) -> dict | None:
+        params = dict(cfg.data.loader_params)  # a copy, as the configuration can be shared between threads
 
-        if not w0.cfg.data.source:
+        if not cfg.data.source:
             return params
 
-        if self.cat_entry is None:
-            logger.error(f"Failed to create an image cutout: Catalog entry not loaded (widget: {w0.title})")
+        if cat_entry is None:
+            logger.error(f"Failed to create an image cutout: Catalog entry not loaded (widget: {title})")
             return None
 
-        image = self.data_sources.images.get(w0.cfg.data.source)
+        image = self.data_sources.images.get(cfg.data.source)
         if not image:
-            logger.error(f"Shared image not found (label: {w0.cfg.data.source}, widget: {w0.title})")
+            logger.error(f"Shared image not found (label: {cfg.data.source}, widget: {title})")
             return None
 
         wcs_source = image.wcs_source if image.wcs_source else image.filename
-        cutout_params = self._get_cutout_params(wcs_source)
+        with timer.span('cutout_wcs'):
+            cutout_params = self._get_cutout_params(wcs_source, cat_entry)
         if cutout_params is None:
             return None
 
@@ -148,12 +316,12 @@ class ViewerDataLoader(QtCore.QThread):
 
         return params
 
-    def _get_cutout_params(self, wcs_source: str) -> dict | None:
+    def _get_cutout_params(self, wcs_source: str, cat_entry: Catalog) -> dict | None:
         params = dict(create_cutout=True)
 
         try:
-            ra = self.cat_entry.get_col("ra")
-            dec = self.cat_entry.get_col("dec")
+            ra = cat_entry.get_col("ra")
+            dec = cat_entry.get_col("dec")
         except KeyError as e:
             logger.error(e)
             return None
@@ -162,18 +330,23 @@ class ViewerDataLoader(QtCore.QThread):
         if meta is None:
             return None
 
-        try:
-            wcs = get_wcs(meta)
-        except Exception as e:
-            logger.error(f"Failed to create the WCS object: {e} (image: {wcs_source})")
-            return None
-
-        try:
-            coord = SkyCoord(ra=ra, dec=dec, unit="deg")
-            x0, y0 = wcs.world_to_pixel(coord)
-        except Exception as e:
-            logger.error(f"Failed to calculate pixel coordinates of the cutout's center: {e} (image: {wcs_source})")
-            return None
+        with self._wcs_lock:
+            cached_meta, wcs = self._wcs.get(wcs_source, (None, None))
+            if cached_meta is not meta:
+                try:
+                    wcs = get_wcs(meta)
+                except Exception as e:
+                    logger.error(f"Failed to create the WCS object: {e} (image: {wcs_source})")
+                    return None
+                self._wcs[wcs_source] = (meta, wcs)
+
+            try:
+                coord = SkyCoord(ra=ra, dec=dec, unit="deg")
+                x0, y0 = wcs.world_to_pixel(coord)
+            except Exception as e:
+                logger.error(f"Failed to calculate pixel coordinates of the cutout's center: {e} "
+                             f"(image: {wcs_source})")
+                return None
 
         params.update(x0=x0, y0=y0)
 
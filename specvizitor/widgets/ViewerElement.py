@@ -6,7 +6,7 @@ from qtpy import QtGui, QtCore, QtWidgets
 import pyqtgraph as pg
 
 import abc
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields, replace
 from enum import Enum, auto
 from functools import partial
 import logging
@@ -15,8 +15,13 @@ from ..config import config, data_widgets
 from ..config import SpectralLineData
 from ..io.catalog import Catalog
 from ..io.inspection_data import InspectionData, REDSHIFT_FILL_VALUE
+from ..io.tiles import TiledImageReader
 from ..io.viewer_data import DataPath
-from ..utils.widgets import AbstractWidget, MyViewBox
+from ..utils.lru_cache import LRUCache
+from ..utils.memory import MemoryItem, get_nbytes
+from ..utils.precision import to_display_precision
+from ..utils.timing import timer
+from ..utils.widgets import AbstractWidget, ItemPool, MyViewBox, SpectralLinesItem
 
 from .SmartSlider import SmartSlider
 
@@ -63,6 +68,20 @@ class Axes:
     y: Axis = field(default_factory=Axis)
 
 
+@dataclass
+class DisplayProducts:
+    """Display-ready products computed in the loader thread: axis units, labels and default limits, and the
+    transformation from the data to the view coordinates. Widgets that read windows of the full image beyond the
+    loaded data also get a tiled reader and the position of the data in the full image. If the data is displayed at
+    a reduced precision, `pixel_reader` reads the values of single pixels at the precision of the file.
+    """
+    axes: Axes = field(default_factory=Axes)
+    qtransform: QtGui.QTransform = field(default_factory=QtGui.QTransform)
+    tiled_reader: TiledImageReader | None = None
+    pixel_reader: TiledImageReader | None = None
+    window_origin: tuple[int, int] = (0, 0)
+
+
 class PlotTransformBase:
     def __init__(self, widget_title: str):
         self.widget_title = widget_title
@@ -102,7 +121,8 @@ class UnitTransform(PlotTransformBase):
     def apply(self, plot_data: Quantity | np.ndarray) -> Quantity:
         if isinstance(plot_data, Quantity):
             try:
-                plot_data = plot_data.value * plot_data.unit.to(self.unit)
+                factor = plot_data.unit.to(self.unit)
+                plot_data = plot_data.value if factor == 1 else plot_data.value * factor
             except UnitConversionError as e:
                 logger.error(f'{e}. Axis unit will be ignored (widget: {self.widget_title})')
         else:
@@ -139,8 +159,10 @@ class ViewerElement(AbstractWidget):
         self.appearance = appearance
 
         self.data_path: DataPath | None = None
+        self.data_key: tuple | None = None
         self.data = None
         self.meta: dict | Header | None = None
+        self.products: DisplayProducts | None = None
 
         self._object_loaded: bool = False
 
@@ -154,9 +176,12 @@ class ViewerElement(AbstractWidget):
         # graphics items
         self.container: pg.PlotItem | None = None
         self._registered_items: list[pg.GraphicsItem] = []
+        self._item_pool: ItemPool | None = None  # items kept in the container across object switches
 
         self._spectral_lines = spectral_lines
-        self._spectral_line_artists: dict[str, tuple[pg.InfiniteLine, pg.TextItem]] = {}
+        self._spectral_lines_item: SpectralLinesItem | None = None
+        self._line_positions_key: tuple | None = None  # the x-axis unit and scale of the cached line positions
+        self._line_positions_rest: np.ndarray | None = None  # rest-frame line positions in the x-axis coordinates
 
         self.sliders: dict[SliderItem, SmartSlider] = {}
         self._invoked_sliders: set[SliderItem] = set()
@@ -184,12 +209,10 @@ class ViewerElement(AbstractWidget):
         return self._apply_axis_data_transform(plot_data, scale=self._axes.y.scale, unit=self._axes.y.unit)
 
     def _create_line_artists(self):
-        if self._spectral_line_artists:
-            for line_artist in self._spectral_line_artists.values():
-                line_artist[0].deleteLater()
-                line_artist[1].deleteLater()
-
-        self._spectral_line_artists = {}
+        if self._spectral_lines_item is not None:
+            if self._spectral_lines_item.scene() is not None:
+                self.container.removeItem(self._spectral_lines_item)
+            self._spectral_lines_item.deleteLater()
 
         line_color = self.cfg.spectral_lines.color
         if line_color is None:
@@ -199,20 +222,16 @@ class ViewerElement(AbstractWidget):
                 line_color = (175.68072, 220.68924, 46.59488)
         line_pen = pg.mkPen(color=line_color, width=1)
 
-        for line_name, lambda0 in self._spectral_lines.wavelengths.items():
-            line = pg.InfiniteLine(pen=line_pen)
-            line.setZValue(10)
+        self._spectral_lines_item = SpectralLinesItem(pen=line_pen, color=line_color)
+        self._spectral_lines_item.set_lines(list(self._spectral_lines.wavelengths.keys()))
+        self._spectral_lines_item.setZValue(10)
+        self._spectral_lines_item.setVisible(self.isEnabled())
 
-            label = pg.TextItem(text=line_name, color=line_color, anchor=(0, 1), angle=-90)
-            label.setZValue(11)
-
-            self._spectral_line_artists[line_name] = (line, label)
+        self._line_positions_key, self._line_positions_rest = None, None
 
     def _add_line_artists(self):
         if self.cfg.spectral_lines.visible:
-            for line_name, line_artist in self._spectral_line_artists.items():
-                self.container.addItem(line_artist[0], ignoreBounds=True)
-                self.container.addItem(line_artist[1])
+            self.container.addItem(self._spectral_lines_item, ignoreBounds=True)
 
     def init_ui(self):
         self._graphics_view = pg.GraphicsView(parent=self)
@@ -224,6 +243,7 @@ class ViewerElement(AbstractWidget):
         self.set_axes_visibility()
         self.container.hideButtons()
         self.container.setMouseEnabled(True, True)
+        self._item_pool = ItemPool(self.container)
 
         self._create_line_artists()
         self._add_line_artists()
@@ -246,6 +266,7 @@ class ViewerElement(AbstractWidget):
         self.redshift_slider.value_changed[float].connect(self.redshift_changed_action)
 
         for sname, s in self.sliders.items():
+            s.session_fields = {'widget': self.title, 'slider': sname.name.lower()}
             s.value_changed[float].connect(partial(self._register_slider_invocation, sname))
 
     def set_geometry(self, spacing: int, margins: int | tuple[int, int, int, int]):
@@ -274,11 +295,14 @@ class ViewerElement(AbstractWidget):
                 sub_layout.addWidget(s)
         self.layout().addLayout(sub_layout, 2, 1, 1, 1)
 
-    def init_view(self):
+    def create_axes(self) -> Axes:
         x_unit = u.Unit(self.cfg.x_axis.unit) if self.cfg.x_axis.unit else None
         y_unit = u.Unit(self.cfg.y_axis.unit) if self.cfg.y_axis.unit else None
-        self._axes = Axes(x=Axis(unit=x_unit, scale=self.cfg.x_axis.scale, label=self.cfg.x_axis.label),
-                          y=Axis(unit=y_unit, scale=self.cfg.y_axis.scale, label=self.cfg.y_axis.label))
+        return Axes(x=Axis(unit=x_unit, scale=self.cfg.x_axis.scale, label=self.cfg.x_axis.label),
+                    y=Axis(unit=y_unit, scale=self.cfg.y_axis.scale, label=self.cfg.y_axis.label))
+
+    def init_view(self):
+        self._axes = self.create_axes()
         self._qtransform = QtGui.QTransform()
 
     def set_axes_visibility(self):
@@ -297,9 +321,8 @@ class ViewerElement(AbstractWidget):
 
     def setEnabled(self, a0: bool = True):
         super().setEnabled(a0)
-        for line_artist in self._spectral_line_artists.values():
-            line_artist[0].setVisible(a0)
-            line_artist[1].setVisible(a0)
+        if self._spectral_lines_item is not None:
+            self._spectral_lines_item.setVisible(a0)
         for s in self.sliders.values():
             s.setEnabled(a0)
 
@@ -308,27 +331,85 @@ class ViewerElement(AbstractWidget):
         if self._object_loaded:
             self._destroy_object()
 
-    @QtCore.Slot(object, object, object)
-    def set_data(self, data, meta: dict | Header | None, data_path: DataPath | None):
+    @QtCore.Slot(object, object, object, object, object)
+    def set_data(self, data, meta: dict | Header | None, data_path: DataPath | None, data_key: tuple | None = None,
+                 products: DisplayProducts | None = None):
         if data is not None and data_path is None:
             logger.error(f"Failed to set the widget data: data path not provided (widget: {self.title})")
             return
 
-        self.data, self.meta, self.data_path = data, meta, data_path
+        self.data, self.meta, self.data_path, self.data_key = data, meta, data_path, data_key
+        self.products = products
         if self.data is None:
-            self.meta, self.data_path = None, None
+            self.meta, self.data_path, self.data_key, self.products = None, None, None, None
+
+    @property
+    def uses_tiled_reads(self) -> bool:
+        """Whether the widget reads windows of the full image beyond the loaded data (e.g. when zooming out of a
+        cutout).
+        """
+        return False
+
+    @property
+    def display_precision(self) -> str:
+        """The precision of the displayed data (see `to_display_precision`)."""
+        return 'native'
+
+    def prepare_data(self, data):
+        """Convert the loaded data to the form in which it is kept by the widget, e.g. downcast images to the display
+        precision. This method is called from the loader thread and therefore must not modify the state of the widget.
+        """
+        if isinstance(data, np.ndarray):
+            return to_display_precision(data, self.display_precision)
+        return data
+
+    def prepare_display(self, data, meta: dict | Header | None, data_key: tuple | None = None,
+                        cat_entry: Catalog | None = None) -> DisplayProducts:
+        """Compute display-ready products from the data. This method is called from the loader thread and therefore
+        must not modify the state of the widget.
+        """
+        return DisplayProducts(axes=self.create_axes())
+
+    def _get_memory_objects(self) -> list:
+        """Return the objects holding the memory of the widget, other than its caches."""
+        products = [] if self.products is None else \
+            [getattr(self.products, f.name) for f in fields(self.products) if f.name != 'tiled_reader']
+        return [self.data] + products
+
+    def _get_caches(self) -> dict[str, LRUCache]:
+        """Return the caches of the widget, which are cleared to release memory."""
+        return {}
+
+    def memory_items(self, seen: set[int]) -> list[MemoryItem]:
+        """Report the memory held by the widget and by its caches.
+        @param seen: the IDs of objects that have already been counted (see `get_nbytes`)
+        """
+        items = [MemoryItem(kind='widget', name=self.title, nbytes=get_nbytes(self._get_memory_objects(), seen))]
+        for name, cache in self._get_caches().items():
+            items.append(MemoryItem(kind='cache', name=f'{name} ({self.title})', nbytes=get_nbytes(cache, seen),
+                                    last_used=cache.last_used, release=cache.clear))
+        return items
 
     @QtCore.Slot(int, InspectionData, object, object)
     def load_object(self, j: int, review: InspectionData, cat_entry: Catalog | None, cat: Catalog | None):
         if self._object_loaded:
-            self._destroy_object()
+            with timer.span('clear_content', widget=self.title):
+                self._destroy_object()
 
         if self.data is None:
             return
 
-        self.add_content(cat)
-        self.setup_view(cat_entry)
-        self.setup_slider_view(j, review, cat_entry)
+        if self.products is None:
+            self.products = self.prepare_display(self.data, self.meta, data_key=self.data_key, cat_entry=cat_entry)
+        # copy the products so that they remain intact if the view is modified after loading
+        self._axes = Axes(x=replace(self.products.axes.x), y=replace(self.products.axes.y))
+        self._qtransform = QtGui.QTransform(self.products.qtransform)
+
+        with timer.span('add_content', widget=self.title):
+            self.add_content(cat)
+        with timer.span('setup_view', widget=self.title):
+            self.setup_view(cat_entry)
+            self.setup_slider_view(j, review, cat_entry)
         self.setEnabled(True)
 
         self._object_loaded = True
@@ -352,6 +433,16 @@ class ViewerElement(AbstractWidget):
         self.container.addItem(item, **kwargs)
         self._registered_items.append(item)
 
+    def acquire_item(self, key, factory, **kwargs) -> pg.GraphicsItem | QtWidgets.QGraphicsItem:
+        """Return a graphics item from the widget's item pool (see `ItemPool.acquire`). Like registered items, pooled
+        items are transformed to the view coordinates; however, they are hidden rather than removed from the view
+        when the object is switched, and reused for the next object.
+        """
+        item = self._item_pool.acquire(key, factory, **kwargs)
+        item.setTransform(self._qtransform)
+        self._registered_items.append(item)
+        return item
+
     def setup_view(self, cat_entry: Catalog | None):
         xlim = (self.cfg.x_axis.limits.min, self.cfg.x_axis.limits.max)
         ylim = (self.cfg.y_axis.limits.min, self.cfg.y_axis.limits.max)
@@ -411,7 +502,13 @@ class ViewerElement(AbstractWidget):
     def smooth_data(self, sigma: float):
         pass
 
-    def set_spectral_line_positions(self, redshift: float = 0):
+    def _get_rest_line_positions(self) -> np.ndarray | None:
+        # the unit conversion and scaling are only recalculated when the x-axis unit or scale change
+        key = (self._axes.x.unit, self._axes.x.scale)
+        if key == self._line_positions_key:
+            return self._line_positions_rest
+        self._line_positions_key, self._line_positions_rest = key, None
+
         # check unit compatibility
         line_unit = u.Unit(self._spectral_lines.wave_unit)
         if self._axes.x.unit:
@@ -420,21 +517,27 @@ class ViewerElement(AbstractWidget):
             except UnitConversionError as e:
                 if self.cfg.spectral_lines.visible:
                     logger.error(f'Failed to calculate positions of spectral lines: {e} (widget: {self.title})')
-                return
-
-        scale0 = 1 + redshift
-        y_min, y_max = self._axes.y.limits
-        label_height = y_max - (y_max - y_min) * 0.03
+                return None
 
-        line_waves = np.array([self._spectral_lines.wavelengths[line_name]
-                               for line_name in self._spectral_line_artists.keys()]) * scale0
-        line_waves = self.apply_xdata_transform(line_waves * u.Unit('AA'))
+        line_waves = np.array(list(self._spectral_lines.wavelengths.values()), dtype=float) * line_unit
+        line_waves = self.apply_xdata_transform(line_waves)
         if isinstance(line_waves, Quantity):
             line_waves = line_waves.value
 
-        for line_wave, line_artist in zip(line_waves, self._spectral_line_artists.values()):
-            line_artist[0].setPos(line_wave)
-            line_artist[1].setPos(QtCore.QPointF(line_wave, label_height))
+        self._line_positions_rest = line_waves
+        return line_waves
+
+    def set_spectral_line_positions(self, redshift: float = 0):
+        line_positions = self._get_rest_line_positions()
+        if line_positions is None:
+            return
+
+        if self._axes.x.scale == 'log':
+            line_positions = line_positions + np.log10(1 + redshift)
+        else:
+            line_positions = line_positions * (1 + redshift)
+
+        self._spectral_lines_item.set_positions(line_positions)
 
     def redshift_changed_action(self, redshift: float):
         self.set_spectral_line_positions(redshift)
@@ -466,7 +569,9 @@ class ViewerElement(AbstractWidget):
     def remove_registered_items(self):
         while self._registered_items:
             item = self._registered_items.pop()
-            self.container.removeItem(item)
+            if not self._item_pool.is_pooled(item):
+                self.container.removeItem(item)
+        self._item_pool.release_all()
 
     def clear_content(self):
         self.remove_registered_items()
@@ -0,0 +1,59 @@
+import os
+
+from astropy.io import fits
+from astropy.table import Table
+from astropy.wcs import WCS
+import numpy as np
+from qtpy import QtCore, QtWidgets
+
+from specvizitor.config import SpectralLineData, config, data_widgets
+from specvizitor.io.catalog import Catalog
+from specvizitor.io.viewer_data import ViewerData
+from specvizitor.utils.thumbnails import ThumbnailCache, hash_config
+from specvizitor.widgets import ViewerDataLoader as viewer_data_loader
+from specvizitor.widgets.Gallery import ThumbnailRenderer, ThumbnailRequest
+from specvizitor.widgets.Image2D import Image2D
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_render_shared_image(monkeypatch, tmp_path):
+    wcs = WCS(naxis=2)
+    wcs.wcs.ctype = ['RA---TAN', 'DEC--TAN']
+    wcs.wcs.crval = [150, 2]
+    wcs.wcs.crpix = [100, 100]
+    wcs.wcs.cdelt = [-1e-4, 1e-4]
+    filename = str(tmp_path / 'mosaic.fits')
+    fits.PrimaryHDU(np.random.default_rng(0).normal(size=(200, 200)), header=wcs.to_header()).writeto(filename)
+
+    data_sources = config.DataSources(images={'mosaic': config.Image(filename=filename)})
+    cat = Catalog(Table({'id': [1, 2, 3], 'ra': [150, 150.001, 149.999], 'dec': [2, 2.001, 1.999]}), indices=['id'])
+
+    cfg = data_widgets.Image(data=data_widgets.DataElement(source='mosaic', loader_params={'cutout_size': 20}))
+    widget = Image2D(cfg=cfg, title='cutout', appearance=config.Appearance(), spectral_lines=SpectralLineData())
+
+    opened, wcs_created = [], []
+    open_file, get_wcs = ViewerData.open, viewer_data_loader.get_wcs
+    monkeypatch.setattr(ViewerData, 'open', lambda self, *args, **kwargs: opened.append(args[0]) or
+                        open_file(self, *args, **kwargs))
+    monkeypatch.setattr(viewer_data_loader, 'get_wcs', lambda meta: wcs_created.append(meta) or get_wcs(meta))
+
+    renderer = ThumbnailRenderer(data_sources, ThumbnailCache(tmp_path / 'thumbnails'))
+    for obj_id in (1, 2, 3):
+        request = ThumbnailRequest(generation=0, obj_id=obj_id, cat_entry=cat.get_cat_entry(obj_id), widget=widget,
+                                   cfg_hash=hash_config(cfg), size=40)
+        image = renderer.render(request)
+        assert image is not None and image.width() == 40
+
+    # the mosaic is opened and its WCS is created once for all thumbnails
+    assert opened == [filename]
+    assert len(wcs_created) == 1
+
+    renderer.close_images()
+    assert not renderer.memory_items(set())
+
+    widget.deleteLater()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
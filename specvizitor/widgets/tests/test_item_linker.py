@@ -0,0 +1,37 @@
+import os
+from types import SimpleNamespace
+
+from qtpy import QtWidgets
+from qtpy.QtTest import QTest
+
+from specvizitor.widgets.ItemLinker import LinkGroup
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_link_group():
+    pushed = {title: [] for title in ('a', 'b', 'c')}
+
+    def push(w, value):
+        pushed[w.title].append(value)
+        group.submit(w.title, value)  # the value changed by pushing it is echoed back to the group
+
+    group = LinkGroup(['a', 'b', 'c'], push=push, interval=50)
+    group.members = {title: SimpleNamespace(title=title) for title in pushed}
+
+    for value in range(5):  # several changes within one frame
+        group.submit('a', value)
+    assert pushed == {'a': [], 'b': [0], 'c': [0]}
+
+    # the changes made since the first push are coalesced into a single push of the latest value
+    QTest.qWait(100)
+    assert pushed == {'a': [], 'b': [0, 4], 'c': [0, 4]}
+
+    QTest.qWait(100)
+    group.submit('b', 5)
+    assert pushed == {'a': [5], 'b': [0, 4], 'c': [0, 4, 5]}
+
+    group.clear()
@@ -0,0 +1,39 @@
+import os
+
+import pyqtgraph as pg
+from qtpy import QtWidgets
+
+from specvizitor.utils.widgets import ItemPool
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_item_pool():
+    plot_item = pg.PlotItem()
+    legend = plot_item.addLegend()
+    pool = ItemPool(plot_item)
+
+    def legend_names():
+        return [label.text for _, label in legend.items]
+
+    flux = pool.acquire(('plot', 'flux'), lambda: pg.PlotDataItem([0, 1], [0, 1], name='flux'))
+    model = pool.acquire(('plot', 'model'), lambda: pg.PlotDataItem([0, 1], [1, 0], name='model'))
+    assert len(pool) == 2 and pool.is_pooled(flux)
+    assert flux.isVisible() and legend_names() == ['flux', 'model']
+
+    # released items are kept in the plot, but hidden and removed from the legend
+    pool.release_all()
+    assert not flux.isVisible() and not model.isVisible()
+    assert flux in plot_item.items and legend_names() == []
+
+    # acquired items are reused and added back to the legend
+    assert pool.acquire(('plot', 'flux'), lambda: pg.PlotDataItem(name='flux')) is flux
+    assert len(pool) == 2
+    assert flux.isVisible() and not model.isVisible()
+    assert legend_names() == ['flux']
+
+    pool.clear()
+    assert len(pool) == 0 and flux not in plot_item.items
@@ -0,0 +1,59 @@
+import os
+import tracemalloc
+
+import numpy as np
+from qtpy import QtWidgets
+
+from specvizitor.config.data_widgets import Slider
+from specvizitor.widgets.SmartSlider import SliderScale, SmartSlider, SmartSliderBase
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_slider_scale():
+    scale = SliderScale(0, 10, 3)
+    expected = np.linspace(0, 10, 4)
+    assert scale.n == 4
+    assert np.allclose([scale.value(i) for i in range(1, 5)], expected)
+
+    for value in (-1, 0, 2.9, 3.4, 7, 10, 11):
+        assert scale.index(value) == max(expected.searchsorted(value, side='right'), 1)
+
+    scale = SliderScale(0, 10, 1e-6)
+    for i in (1, 2, 1234567, 3000001, scale.n):
+        assert scale.index(scale.value(i)) == i
+
+    scale = SliderScale(0, 10, 1e-5, spacing='log1p')
+    assert scale.value(1) == 0
+    assert np.isclose(scale.value(scale.n), 10)
+    assert np.isclose(np.log1p(scale.value(1001)) - np.log1p(scale.value(1000)), 1e-5, rtol=1e-3)
+    for i in (1, 1000, scale.n):
+        assert scale.index(scale.value(i)) == i
+
+
+def test_fine_slider():
+    slider = SmartSliderBase(0, 10, 1e-10, default_value=2.5)  # more indices than Qt slider positions
+    assert slider.maximum() == slider.max_positions
+    assert np.isclose(slider.value, 2.5)
+
+    slider.index = slider.index_from_value(2.5 + 1e-10)
+    assert np.isclose(slider.value, 2.5 + 1e-10, rtol=0, atol=1e-12)
+
+    slider.setValue(slider.maximum())
+    assert slider.value == 10
+
+
+def test_slider_memory():
+    cfg = Slider(max_value=10, step=1e-6)
+    kwargs = {k: getattr(cfg, k) for k in ('min_value', 'max_value', 'step', 'default_value', 'spacing')}
+
+    tracemalloc.start()
+    sliders = [SmartSlider(**kwargs) for _ in range(20)]  # the redshift sliders of a 20-widget layout
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(sliders) == 20
+    assert peak < 1024 ** 2
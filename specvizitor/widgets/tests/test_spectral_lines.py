@@ -0,0 +1,64 @@
+import os
+
+import astropy.units as u
+import numpy as np
+import pytest
+from qtpy import QtCore, QtGui, QtWidgets
+
+from specvizitor.config import SpectralLineData, config, data_widgets
+from specvizitor.utils.widgets import SpectralLinesItem
+from specvizitor.widgets.Plot1D import Plot1D
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+LINES = SpectralLineData(wavelengths={'Hb': 4862.68, 'OIII_4959': 4960.30, 'OIII': 5008.24, 'Ha': 6564.61})
+
+
+def transform_lines(widget: Plot1D, redshift: float) -> np.ndarray:
+    # the line positions calculated from scratch, as done before they were cached
+    waves = np.array(list(LINES.wavelengths.values())) * u.Unit(LINES.wave_unit) * (1 + redshift)
+    return u.Quantity(widget.apply_xdata_transform(waves)).value
+
+
+@pytest.mark.parametrize('scale', ['linear', 'log'])
+def test_line_positions(scale):
+    cfg = data_widgets.Plot1D(x_axis=data_widgets.Axis(unit='micron', scale=scale))
+    widget = Plot1D(cfg=cfg, title='spectrum', appearance=config.Appearance(), spectral_lines=LINES)
+
+    for redshift in (0, 1.5, 7.123456):
+        widget.set_spectral_line_positions(redshift)
+        assert np.allclose(widget._spectral_lines_item._positions, transform_lines(widget, redshift), rtol=1e-12)
+
+    # the cached positions are recalculated when the unit of the x-axis changes
+    widget._axes.x.unit = u.nm
+    widget.set_spectral_line_positions(1.5)
+    assert np.allclose(widget._spectral_lines_item._positions, transform_lines(widget, 1.5), rtol=1e-12)
+
+    widget.deleteLater()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def test_line_labels():
+    item = SpectralLinesItem()
+    item.set_lines(list(LINES.wavelengths.keys()), np.array(list(LINES.wavelengths.values())))
+
+    # only the lines inside the view range are drawn
+    visible = item._visible_lines(QtCore.QRectF(4900, 0, 200, 1))
+    assert [item._names[i] for i in visible] == ['OIII_4959', 'OIII']
+
+    visible = item._visible_lines(QtCore.QRectF(4000, 0, 3000, 1))
+    assert len(visible) == 4
+
+    # at 0.1 pixels per angstrom, the [OIII] doublet is ~5 pixels wide, and only the first label is drawn
+    tr = QtGui.QTransform.fromScale(0.1, 1)
+    labels = item._label_positions(tr, visible, min_spacing=8)
+    assert [item._names[i] for _, i in labels] == ['Hb', 'OIII_4959', 'Ha']
+    assert np.allclose([x for x, _ in labels], [486.268, 496.030, 656.461])
+
+    # zooming in separates the labels
+    tr = QtGui.QTransform.fromScale(1, 1)
+    labels = item._label_positions(tr, visible, min_spacing=8)
+    assert [item._names[i] for _, i in labels] == ['Hb', 'OIII_4959', 'OIII', 'Ha']
@@ -0,0 +1,67 @@
+import os
+
+from astropy.io import fits
+import numpy as np
+from qtpy import QtCore, QtWidgets
+
+from specvizitor.config import SpectralLineData, config, data_widgets
+from specvizitor.io.inspection_data import InspectionData
+from specvizitor.io.viewer_data import ViewerData
+from specvizitor.widgets.Image2D import Image2D
+from specvizitor.widgets.ViewerDataLoader import ViewerDataLoader
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_discard_bundle(tmp_path):
+    filenames = [str(tmp_path / f'image_{i}.fits') for i in (1, 2)]
+    for filename in filenames:
+        fits.PrimaryHDU(np.zeros((20, 20))).writeto(filename)
+
+    cfg = data_widgets.Image(data=data_widgets.DataElement(filename='image_{id}.fits'))
+    widget = Image2D(cfg=cfg, title='image', appearance=config.Appearance(), spectral_lines=SpectralLineData())
+    review = InspectionData.create([1, 2])
+    viewer_data = ViewerData()
+    data_sources = config.DataSources(dir=str(tmp_path))
+
+    def create_loader(j: int, generation: int) -> tuple[ViewerDataLoader, list]:
+        loader = ViewerDataLoader({'image': widget}, j, review, viewer_data, data_sources, None, t_grace=0,
+                                  generation=generation)
+        bundles = []
+        loader.bundle_loaded.connect(bundles.append, QtCore.Qt.DirectConnection)
+        return loader, bundles
+
+    def is_open(filename: str) -> bool:
+        return viewer_data._loaders.get(filename) is not None
+
+    # loading is aborted after the bundle is emitted
+    loader, bundles = create_loader(0, generation=1)
+    loader.start()
+    loader.wait()
+    assert is_open(filenames[0])
+    loader.discard(bundles[0])
+    assert not is_open(filenames[0])
+
+    # the bundle is outdated by the time it is delivered: the next loader might still be reading the files
+    loader, bundles = create_loader(0, generation=1)
+    loader.start()
+    loader.wait()
+    next_loader, next_bundles = create_loader(1, generation=2)
+    next_loader.discard(bundles[0])
+    assert is_open(filenames[0])
+
+    next_loader.start()
+    next_loader.wait()
+    assert not is_open(filenames[0]) and is_open(filenames[1])
+
+    # the files of the bundle delivered to the widget are kept open
+    d = next_bundles[0].widget_data['image']
+    widget.set_data(d.data, d.meta, d.data_path, d.data_key, d.products)
+    next_loader.discard(next_bundles[0])
+    assert is_open(filenames[1])
+
+    widget.deleteLater()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)